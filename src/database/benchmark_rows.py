@@ -0,0 +1,119 @@
+"""
+Micro-benchmark: list and serialize stored jobs as dicts vs. row objects.
+
+Usage:
+    python src/database/benchmark_rows.py [rows]
+"""
+
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.multi_profile_db import DatabaseManager
+from database.rows import JobRow, rows_to_json
+from database.storage import JOB_LIST_COLUMNS, decode_job
+
+ROUNDS = 5
+
+
+def _sample_jobs(count):
+    """Generate stored-job-like matches"""
+    skills = ['python', 'sql', 'kafka', 'aws', 'docker', 'kubernetes', 'spark', 'airflow']
+    return [
+        {
+            'job_hash': f'{i:032x}',
+            'title': f'Data Engineer {i}',
+            'company': f'Company {i % 300}',
+            'location': ['Berlin', 'Munich', 'Hamburg', 'Remote'][i % 4],
+            'url': f'https://example.com/jobs/{i}',
+            'description': 'We are looking for a data engineer. ' * 20,
+            'salary': '60,000 - 80,000 EUR',
+            'salary_min': 60000,
+            'salary_max': 80000,
+            'posted_date': '2026-10-01T09:00:00',
+            'source': ['indeed', 'stepstone', 'linkedin'][i % 3],
+            'required_skills': skills[:i % len(skills) + 1],
+            'alternate_urls': [f'https://example.org/jobs/{i}'],
+            'match_score': round(50 + i % 50 + 0.5, 1),
+            'ai_similarity': 0.71,
+            'keyword_match': 0.42,
+            'urgency_score': i % 10,
+            'keywords_matched': skills[i % 3:i % 3 + 3],
+            'ats_score': 64.0
+        }
+        for i in range(count)
+    ]
+
+
+def _list_dicts(conn, query, profile_id):
+    """Previous read path: sqlite3.Row -> dict, JSON columns decoded eagerly"""
+    conn.row_factory = sqlite3.Row
+    jobs = [decode_job(row) for row in conn.execute(query, (profile_id,))]
+    conn.row_factory = None
+    return json.dumps(jobs)
+
+
+def _list_rows(conn, query, profile_id):
+    """Current read path: JobRow over fetched tuples, JSON columns copied verbatim"""
+    return rows_to_json(JobRow.from_cursor(conn.execute(query, (profile_id,))))
+
+
+def _measure(list_jobs, conn, query, profile_id):
+    """Best wall time and peak traced allocation over ROUNDS runs"""
+    best_time = best_peak = None
+    for _ in range(ROUNDS):
+        tracemalloc.start()
+        list_jobs(conn, query, profile_id)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        list_jobs(conn, query, profile_id)
+        elapsed = time.perf_counter() - start
+
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+        best_peak = peak if best_peak is None else min(best_peak, peak)
+    return best_time, best_peak
+
+
+def benchmark(count=10000):
+    """
+    List count jobs of one profile and serialize them as an API response.
+
+    Args:
+        count: Number of stored jobs
+
+    Returns:
+        Dictionary of (seconds, peak bytes) per read path
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(Path(tmp) / 'jobs.db')
+        profile_id = db_manager.create_profile('Benchmark', 'bench@example.com')
+        db_manager.save_jobs(profile_id, _sample_jobs(count))
+
+        conn = sqlite3.connect(db_manager.db_path)
+        query = f"SELECT {', '.join(JOB_LIST_COLUMNS)} FROM profile_jobs WHERE profile_id = ?"
+        assert json.loads(_list_dicts(conn, query, profile_id)) == json.loads(_list_rows(conn, query, profile_id))
+
+        results = {
+            'dict + json.loads': _measure(_list_dicts, conn, query, profile_id),
+            'JobRow + to_json': _measure(_list_rows, conn, query, profile_id)
+        }
+        conn.close()
+        db_manager.close()
+
+    print(f"Listing {count} jobs (best of {ROUNDS}):")
+    for name, (elapsed, peak) in results.items():
+        print(f"  {name:<20} {elapsed * 1000:8.1f} ms {peak / 1e6:8.1f} MB peak")
+    return results
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,74 @@
+"""
+Data version counters that let API responses be revalidated without a query.
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Version key of data spanning all profiles (dashboard totals)
+ANY_DATA = None
+
+
+class DataVersions:
+    """
+    Version counters per key (a profile id, or e.g. the profile list), bumped by writes.
+
+    Tokens start with an id unique to this instance, so a restarted
+    process never reissues a token a client may still hold. With
+    refresh_interval set, tokens also change that often; the PostgreSQL
+    backend uses this to pick up writes made by other replicas.
+    """
+
+    def __init__(self, refresh_interval=None):
+        """
+        Initialize data versions.
+
+        Args:
+            refresh_interval: Seconds after which every token changes (None = only on writes)
+        """
+        self.refresh_interval = refresh_interval
+        self._instance = uuid.uuid4().hex[:8]
+        self._epoch = 0  # bumped by writes that may touch any profile
+        self._counters = {}  # key -> count
+        self._changed_at = {ANY_DATA: time.time()}  # key -> time of last bump
+        self._lock = threading.Lock()
+
+    def bump(self, *keys):
+        """
+        Record a write.
+
+        Args:
+            *keys: Keys whose data changed (none = any profile's data may have changed)
+        """
+        now = time.time()
+        with self._lock:
+            if not keys:
+                self._epoch += 1
+                self._changed_at = {ANY_DATA: now}
+            for key in keys:
+                self._counters[key] = self._counters.get(key, 0) + 1
+                self._changed_at[key] = now
+            self._counters[ANY_DATA] = self._counters.get(ANY_DATA, 0) + 1
+            self._changed_at[ANY_DATA] = now
+
+    def get(self, key=ANY_DATA):
+        """
+        Get the current version of a key.
+
+        Args:
+            key: Version key (ANY_DATA = changes on every write)
+
+        Returns:
+            Tuple of (opaque version token, last change as a UTC datetime)
+        """
+        with self._lock:
+            token = f'{self._instance}.{self._epoch}.{self._counters.get(key, 0)}'
+            changed_at = self._changed_at.get(key, self._changed_at[ANY_DATA])
+
+        if self.refresh_interval:
+            period = int(time.time() // self.refresh_interval)
+            token += f'.{period}'
+            changed_at = max(changed_at, period * self.refresh_interval)
+        return token, datetime.fromtimestamp(int(changed_at), timezone.utc)
@@ -0,0 +1,200 @@
+"""
+Compact append-only embedding store with memory-mapped loading.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Iterable, Tuple
+import numpy as np
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SUPPORTED_DTYPES = {'float16': '<f2', 'int8': 'i1'}
+
+
+class EmbeddingStore:
+    """
+    Store embedding vectors as float16 or int8 (with per-vector scale).
+
+    Layout on disk (for a base path like 'data/embeddings'):
+        embeddings.json  - metadata (dtype, dimension)
+        embeddings.vec   - fixed-size records [scale: float32, vector: dim x dtype]
+        embeddings.keys  - one key per line; line number = record number
+
+    Records are only ever appended, so the vector file can be memory-mapped
+    read-only and shared zero-copy; a re-added key points at its newest record.
+    """
+
+    def __init__(self, path='data/embeddings', dtype='float16', dim=None):
+        """
+        Initialize embedding store.
+
+        Args:
+            path: Base path for the store files (without extension)
+            dtype: Storage type, 'float16' or 'int8'
+            dim: Stored dimension; longer vectors are truncated and
+                 re-normalized (None = keep the first vector's size)
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+        base = Path(path)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        self.meta_path = base.with_suffix('.json')
+        self.vec_path = base.with_suffix('.vec')
+        self.keys_path = base.with_suffix('.keys')
+
+        self.dtype = dtype
+        self.dim = dim
+        self._index: Dict[str, int] = {}
+        self._count = 0
+        self._mmap = None
+        self._lock = threading.RLock()
+
+        self._load()
+
+    def _record_dtype(self):
+        """Get numpy record type for one stored vector."""
+        return np.dtype([('scale', '<f4'), ('vector', SUPPORTED_DTYPES[self.dtype], (self.dim,))])
+
+    def _load(self):
+        """Load metadata and key index, repairing a torn last append."""
+        if self.meta_path.exists():
+            meta = json.loads(self.meta_path.read_text())
+            self.dtype = meta['dtype']
+            self.dim = meta['dim']
+
+        if self.dim is None or not self.vec_path.exists():
+            return
+
+        keys = self.keys_path.read_text().splitlines() if self.keys_path.exists() else []
+        record_size = self._record_dtype().itemsize
+        rows = min(len(keys), self.vec_path.stat().st_size // record_size)
+
+        # A crash between the two appends leaves one file ahead; cut it back
+        if self.vec_path.stat().st_size != rows * record_size:
+            with open(self.vec_path, 'r+b') as f:
+                f.truncate(rows * record_size)
+        if len(keys) != rows:
+            keys = keys[:rows]
+            self.keys_path.write_text(''.join(f"{key}\n" for key in keys))
+
+        self._index = {key: row for row, key in enumerate(keys)}
+        self._count = rows
+        logger.info(f"✓ Embedding store loaded: {len(self._index)} vectors "
+                   f"({self.dtype}, dim {self.dim})")
+
+    def _write_meta(self):
+        """Persist metadata on first write."""
+        self.meta_path.write_text(json.dumps({'dtype': self.dtype, 'dim': self.dim}))
+
+    def _quantize(self, vectors: np.ndarray) -> np.ndarray:
+        """Convert float vectors to storage records."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[1] < self.dim:
+            raise ValueError(f"Embedding has {vectors.shape[1]} dimensions, store needs {self.dim}")
+
+        if vectors.shape[1] > self.dim:
+            # Truncate and re-normalize (Matryoshka-style dimension reduction)
+            vectors = vectors[:, :self.dim]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+
+        records = np.zeros(len(vectors), dtype=self._record_dtype())
+        if self.dtype == 'int8':
+            scale = np.abs(vectors).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            records['vector'] = np.clip(np.rint(vectors / scale[:, None]), -127, 127)
+            records['scale'] = scale
+        else:
+            records['vector'] = vectors
+            records['scale'] = 1.0
+        return records
+
+    def _dequantize(self, records: np.ndarray) -> np.ndarray:
+        """Convert storage records back to float32 vectors."""
+        return records['vector'].astype(np.float32) * records['scale'][:, None]
+
+    def add_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> int:
+        """
+        Append vectors to the store.
+
+        Args:
+            items: (key, vector) pairs
+
+        Returns:
+            Number of vectors written
+        """
+        items = [(key, vector) for key, vector in items if vector is not None]
+        if not items:
+            return 0
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = len(items[0][1])
+            if not self.meta_path.exists():
+                self._write_meta()
+
+            records = self._quantize(np.stack([vector for _, vector in items]))
+
+            # Vectors first: keys beyond the vector file are dropped on load
+            with open(self.vec_path, 'ab') as f:
+                f.write(records.tobytes())
+            with open(self.keys_path, 'a') as f:
+                f.write(''.join(f"{key}\n" for key, _ in items))
+
+            for key, _ in items:
+                self._index[key] = self._count
+                self._count += 1
+
+        return len(items)
+
+    def add(self, key: str, vector: np.ndarray):
+        """Append a single vector to the store."""
+        self.add_many([(key, vector)])
+
+    def records(self) -> np.ndarray:
+        """
+        Get all stored records as a read-only memory map (zero-copy).
+
+        Returns:
+            Structured array with 'scale' and 'vector' fields
+        """
+        with self._lock:
+            if self._count == 0:
+                return np.zeros(0, dtype=self._record_dtype()) if self.dim else np.zeros(0)
+            if self._mmap is None or len(self._mmap) < self._count:
+                self._mmap = np.memmap(self.vec_path, dtype=self._record_dtype(),
+                                       mode='r', shape=(self._count,))
+            return self._mmap
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get a float32 vector by key, or None if missing."""
+        vectors = self.get_many([key])
+        return vectors[0] if vectors is not None else None
+
+    def get_many(self, keys: List[str]) -> Optional[np.ndarray]:
+        """
+        Get float32 vectors for keys.
+
+        Returns:
+            Matrix with one row per key, or None if any key is missing
+        """
+        with self._lock:
+            rows = [self._index.get(key) for key in keys]
+            if any(row is None for row in rows):
+                return None
+            return self._dequantize(self.records()[rows])
+
+    def keys(self) -> List[str]:
+        """Get all stored keys."""
+        with self._lock:
+            return list(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -0,0 +1,84 @@
+"""
+Migrate a job database to the current schema and compact it.
+
+Usage:
+    python src/database/migrate.py [data/jobs.db]
+"""
+
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.multi_profile_db import DatabaseManager
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def backup(db_path):
+    """
+    Copy a database (including committed WAL content) next to it.
+
+    Args:
+        db_path: SQLite database path
+
+    Returns:
+        Backup file path
+    """
+    db_path = Path(db_path)
+    backup_path = db_path.with_name(f"{db_path.stem}-{datetime.now():%Y%m%d-%H%M%S}.bak{db_path.suffix}")
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(backup_path)
+    source.backup(target)
+    target.close()
+    source.close()
+    logger.info(f"✓ Backed up {db_path} to {backup_path}")
+    return backup_path
+
+
+def migrate(db_path='data/jobs.db'):
+    """
+    Back up a database, bring it up to the current schema, then VACUUM it.
+
+    Opening the database runs the migrations (e.g. splitting the legacy
+    jobs table into postings and profile_matches, which the app refuses
+    to do itself) and trains the first description dictionary;
+    descriptions still stored as plain text are then compressed, and
+    VACUUM hands the freed space back to the file system and enables
+    incremental vacuuming for later maintenance runs.
+
+    Args:
+        db_path: SQLite database path
+
+    Returns:
+        Tuple of (size before, size after) in bytes
+    """
+    db_path = Path(db_path)
+    if not db_path.exists():
+        raise FileNotFoundError(f"Database not found at {db_path}")
+
+    backup(db_path)
+    size_before = db_path.stat().st_size
+    db_manager = DatabaseManager(db_path, migrate_legacy=True)
+    compressed = db_manager.compress_descriptions()
+    db_manager.close()
+    if compressed:
+        logger.info(f"✓ Compressed {compressed} descriptions")
+
+    # VACUUM also switches older databases to incremental auto-vacuum
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    conn.close()
+
+    size_after = db_path.stat().st_size
+    logger.info(f"✓ {db_path}: {size_before / 1e6:.1f} MB → {size_after / 1e6:.1f} MB")
+    return size_before, size_after
+
+
+if __name__ == '__main__':
+    migrate(sys.argv[1] if len(sys.argv) > 1 else 'data/jobs.db')
@@ -3,26 +3,121 @@ Enhanced Database Manager with Multi-Profile Support
 """
 
 import sqlite3
+from collections import Counter
 from pathlib import Path
-from datetime import datetime, timedelta
 import json
-import hashlib
 from typing import List, Dict, Optional
+from database.storage import (
+    JobStorage, POSTING_COLUMNS, MATCH_COLUMNS, SCORE_ORDER_COLUMNS, JOB_LIST_COLUMNS, SEARCH_FIELDS,
+    FINAL_RUN_STATUSES, RUN_STATS_SOURCE, STATS_DAYS, PROFILE_CACHE_SIZE, PROFILE_CACHE_MAX_AGE, ALL_PROFILES,
+    search_terms, posted_since, summarize_stats, archive_records
+)
+from database.data_versions import DataVersions
+from database.rows import JobRow, ProfileRow
+from database.text_codec import TextCodec, HEADER, NO_DICTIONARY, train_dictionary
+from database.write_queue import WriteQueue
+from utils.job_hash import generate_job_hash
+from utils.logger import setup_logger
+from utils.lru_cache import LRUCache
 
-class DatabaseManager:
-    """Manage multi-profile job database operations."""
+logger = setup_logger(__name__)
+
+FTS_COLUMNS = ('title', 'company', 'location', 'description')
+# bm25 column weights, in FTS_COLUMNS order (title hits rank highest)
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+
+# Postings needed before a description dictionary is trained, and how many are sampled
+DICTIONARY_MIN_SAMPLES = 200
+DICTIONARY_SAMPLE_SIZE = 2000
+
+# Tables with a retention period: table -> (row key, age column). Matches
+# only expire once their posting is no longer scraped either (otherwise the
+# next save would re-insert them as new), and postings once no match
+# references them
+RETENTION_TABLES = {
+    'profile_matches': ('id', 'created_at'),
+    'postings': ('id', 'last_seen_at'),
+    'run_history': ('id', 'started_at'),
+    'llm_analyses': ('rowid', 'created_at'),
+    'daily_stats': ('profile_id, day, source', 'day')
+}
+# Tables whose rows belong to a profile (left behind by deletes while foreign keys were off)
+PROFILE_TABLES = ('profile_matches', 'run_history', 'daily_stats')
+
+class DatabaseManager(JobStorage):
+    """
+    Manage multi-profile job database operations in SQLite.
+    
+    Reads open their own connections; writes go through a WriteQueue whose
+    thread owns the only write connection and commits them in batches.
+    Descriptions are stored zlib-compressed (see TextCodec) and
+    decompressed in Python by the reads that return them; the schema needs
+    no application SQL functions, so other SQLite tools can open the file.
+    """
     
-    def __init__(self, db_path='data/jobs.db'):
-        """Initialize database manager"""
+    def __init__(self, db_path='data/jobs.db', migrate_legacy=False):
+        """Initialize database manager (migrate_legacy drops the legacy jobs table; see migrate.py)"""
         self.db_path = Path(db_path)
+        self.migrate_legacy = migrate_legacy
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.codec = TextCodec()
+        self.profile_cache = LRUCache(PROFILE_CACHE_SIZE, max_age=PROFILE_CACHE_MAX_AGE)
+        self.versions = DataVersions()
         self._initialize_database()
+        self._load_dictionaries()
+        self._sync_search_index()
+        self.writer = WriteQueue(self._connect)
+        
+        # First dictionary is trained once enough descriptions are stored
+        if self.codec.current_id == NO_DICTIONARY:
+            self.train_description_dictionary()
+    
+    def close(self):
+        """Commit pending writes and stop the writer thread"""
+        self.writer.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with foreign keys enforced"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+    
+    def _unpack_text(self, value):
+        """Decompress a stored text, loading dictionaries trained by other processes"""
+        try:
+            return self.codec.decompress(value)
+        except KeyError:
+            self._load_dictionaries()
+            return self.codec.decompress(value)
+    
+    def _load_dictionaries(self):
+        """Register all stored description dictionaries with the codec"""
+        conn = sqlite3.connect(self.db_path)
+        for dictionary_id, dictionary in conn.execute('SELECT id, zdict FROM text_dictionaries'):
+            self.codec.add_dictionary(dictionary_id, dictionary)
+        conn.close()
     
     def _initialize_database(self):
         """Create database tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
+        # Splitting the legacy jobs table drops it, so only migrate.py does it (after a backup)
+        if self._table_exists(cursor, 'jobs') and not self.migrate_legacy:
+            conn.close()
+            logger.error(f"❌ {self.db_path} still has the legacy jobs table")
+            raise RuntimeError(
+                f"{self.db_path} has a legacy jobs table; back it up and migrate it with "
+                f"'python src/database/migrate.py {self.db_path}' first"
+            )
+        
+        # Freed pages are returned by incremental_vacuum() (only takes effect
+        # on new databases; migrate.py converts existing ones)
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        
+        # WAL lets reads proceed while the writer thread commits
+        cursor.execute('PRAGMA journal_mode = WAL')
+        
         # Profiles table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS profiles (
@@ -38,30 +133,90 @@ class DatabaseManager:
             )
         ''')
         
-        # Jobs table (with profile_id)
+        # Postings: scraped content, stored once per job hash
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS jobs (
+            CREATE TABLE IF NOT EXISTS postings (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                profile_id INTEGER NOT NULL,
-                job_hash TEXT NOT NULL,
+                job_hash TEXT NOT NULL UNIQUE,
                 title TEXT NOT NULL,
                 company TEXT NOT NULL,
                 location TEXT,
                 url TEXT NOT NULL,
-                description TEXT,
+                description BLOB,
                 salary TEXT,
+                salary_min REAL,
+                salary_max REAL,
                 posted_date TEXT,
                 source TEXT NOT NULL,
-                match_score REAL,
+                required_skills TEXT,
+                alternate_urls TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Profile matches: per-profile scores and notification state
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS profile_matches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                profile_id INTEGER NOT NULL,
+                posting_id INTEGER NOT NULL,
+                match_score REAL NOT NULL DEFAULT 0,
                 ai_similarity REAL,
                 keyword_match REAL,
-                urgency_score REAL,
+                urgency_score REAL NOT NULL DEFAULT 0,
                 keywords_matched TEXT,
+                ats_score REAL,
+                llm_score REAL,
+                llm_urgency TEXT,
+                llm_reason TEXT,
+                skills_similarity REAL,
+                experience_similarity REAL,
+                education_similarity REAL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 notified BOOLEAN DEFAULT 0,
                 notification_sent_at TIMESTAMP,
                 FOREIGN KEY (profile_id) REFERENCES profiles(id) ON DELETE CASCADE,
-                UNIQUE(profile_id, job_hash)
+                FOREIGN KEY (posting_id) REFERENCES postings(id),
+                UNIQUE(profile_id, posting_id)
+            )
+        ''')
+        
+        # Preset dictionaries for compressed descriptions (newest id compresses)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS text_dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                zdict BLOB NOT NULL,
+                sample_count INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Jobs as seen by a profile (match id is the job id used by the API;
+        # description is the stored, compressed value); recreated so older
+        # databases drop their unpack_text() version
+        cursor.execute('DROP VIEW IF EXISTS profile_jobs')
+        cursor.execute(f'''
+            CREATE VIEW profile_jobs AS
+            SELECT m.id AS id, m.profile_id, m.posting_id, p.job_hash,
+                   {', '.join(f'p.{c}' for c in POSTING_COLUMNS if c != 'job_hash')},
+                   {', '.join(f'm.{c}' for c in MATCH_COLUMNS)},
+                   m.created_at, m.notified, m.notification_sent_at
+            FROM profile_matches m
+            JOIN postings p ON p.id = m.posting_id
+        ''')
+        
+        # LLM deep analysis cache (per job, resume content and model)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_analyses (
+                job_hash TEXT NOT NULL,
+                resume_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                score REAL NOT NULL,
+                urgency TEXT,
+                reason TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (job_hash, resume_hash, model)
             )
         ''')
         
@@ -80,297 +235,787 @@ class DatabaseManager:
             )
         ''')
         
-        # Indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_profile_jobs ON jobs(profile_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_hash ON jobs(job_hash)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_created_at ON jobs(created_at)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_match_score ON jobs(match_score)')
+        # Indexes (composite ones match the listing order, so no sort step)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_match_ranking
+            ON profile_matches(profile_id, match_score DESC, urgency_score DESC, created_at DESC, id DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_match_unnotified
+            ON profile_matches(profile_id, match_score DESC, urgency_score DESC, created_at DESC)
+            WHERE notified = 0
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_match_posting ON profile_matches(posting_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_match_created_at ON profile_matches(created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_posting_salary ON postings(salary_max)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_posting_posted_date ON postings(posted_date)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_run_history ON run_history(profile_id)')
         
+        self._create_search_index(cursor)
+        
+        # Older databases allow NULL scores, which would drop rows from keyset pages
+        cursor.execute('PRAGMA table_info(profile_matches)')
+        if any(row[1] in SCORE_ORDER_COLUMNS and not row[3] for row in cursor.fetchall()):
+            cursor.execute(f'''
+                UPDATE profile_matches
+                SET {', '.join(f'{c} = COALESCE({c}, 0)' for c in SCORE_ORDER_COLUMNS)}
+                WHERE {' OR '.join(f'{c} IS NULL' for c in SCORE_ORDER_COLUMNS)}
+            ''')
+        
+        # Databases from before the postings/matches split
+        if self._table_exists(cursor, 'jobs'):
+            self._migrate_jobs_table(cursor)
+        
+        self._create_stats_rollup(cursor)
+        
         conn.commit()
         conn.close()
     
-    # ==================== PROFILE MANAGEMENT ====================
+    def _create_search_index(self, cursor):
+        """Create the FTS5 index over postings (fed by the writer, see _index_postings)"""
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'postings_fts'")
+        row = cursor.fetchone()
+        # Older indexes read external content, through unpack_text() since compression
+        if row and 'content=' in row[0]:
+            for trigger in ('postings_fts_insert', 'postings_fts_delete', 'postings_fts_update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute('DROP VIEW IF EXISTS posting_texts')
+            cursor.execute('DROP TABLE postings_fts')
+        
+        # The index keeps its own plain-text copy, so snippet() needs no decompression
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5(
+                {', '.join(FTS_COLUMNS)},
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS postings_fts_delete AFTER DELETE ON postings BEGIN
+                DELETE FROM postings_fts WHERE rowid = old.id;
+            END
+        ''')
     
-    def create_profile(self, name: str, email: str, gemini_key: str = None, 
-                      job_preferences: dict = None) -> int:
-        """Create a new profile"""
-        conn = sqlite3.connect(self.db_path)
+    def _index_postings(self, cursor, postings: List[tuple]):
+        """Add (id, title, company, location, plain description) rows missing from the search index"""
+        cursor.executemany(f'''
+            INSERT INTO postings_fts (rowid, {', '.join(FTS_COLUMNS)})
+            SELECT ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM postings_fts WHERE rowid = ?)
+        ''', [(*posting, posting[0]) for posting in postings])
+    
+    def _sync_search_index(self, batch_size: int = 500):
+        """Index postings stored without the writer (older databases, legacy migration)"""
+        conn = self._connect()
         cursor = conn.cursor()
+        indexed = 0
+        while True:
+            cursor.execute('''
+                SELECT id, title, company, location, description FROM postings
+                WHERE id NOT IN (SELECT rowid FROM postings_fts)
+                LIMIT ?
+            ''', (batch_size,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            self._index_postings(cursor, [
+                (*row[:4], self._unpack_text(row[4])) for row in rows
+            ])
+            conn.commit()
+            indexed += len(rows)
+        conn.close()
+        if indexed:
+            logger.info(f"✓ Indexed {indexed} postings for search")
+    
+    def _create_stats_rollup(self, cursor):
+        """Create the per profile/day/source stats rollup, backfilled from existing rows"""
+        exists = self._table_exists(cursor, 'daily_stats')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS daily_stats (
+                profile_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                source TEXT NOT NULL,
+                jobs_saved INTEGER NOT NULL DEFAULT 0,
+                runs INTEGER NOT NULL DEFAULT 0,
+                runs_succeeded INTEGER NOT NULL DEFAULT 0,
+                jobs_found INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (profile_id, day, source)
+            ) WITHOUT ROWID
+        ''')
+        if exists:
+            return
         
         cursor.execute('''
-            INSERT INTO profiles (name, email, gemini_key, job_preferences)
-            VALUES (?, ?, ?, ?)
-        ''', (name, email, gemini_key, json.dumps(job_preferences or {})))
+            INSERT INTO daily_stats (profile_id, day, source, jobs_saved)
+            SELECT m.profile_id, date(m.created_at), COALESCE(p.source, ''), COUNT(*)
+            FROM profile_matches m JOIN postings p ON p.id = m.posting_id
+            GROUP BY 1, 2, 3
+        ''')
+        cursor.execute(f'''
+            INSERT INTO daily_stats (profile_id, day, source, runs, runs_succeeded, jobs_found)
+            SELECT profile_id, date(COALESCE(completed_at, started_at)), ?, COUNT(*),
+                   SUM(status = 'success'),
+                   SUM(CASE WHEN status = 'success' THEN COALESCE(jobs_found, 0) ELSE 0 END)
+            FROM run_history
+            WHERE status IN ({', '.join('?' * len(FINAL_RUN_STATUSES))})
+            GROUP BY 1, 2
+            ON CONFLICT(profile_id, day, source) DO UPDATE SET
+                runs = excluded.runs,
+                runs_succeeded = excluded.runs_succeeded,
+                jobs_found = excluded.jobs_found
+        ''', (RUN_STATS_SOURCE, *FINAL_RUN_STATUSES))
+    
+    def _table_exists(self, cursor, table: str) -> bool:
+        """Check whether a table exists"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone() is not None
+    
+    def _migrate_jobs_table(self, cursor):
+        """
+        Split the legacy per-profile jobs table into postings and profile_matches.
         
-        profile_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        Each job hash keeps the copy with the longest description; match
+        rows keep their job ids, so stored links and API ids stay valid.
+        Runs inside the caller's transaction.
+        """
+        # Columns added to jobs over time, so old databases can be copied as-is
+        self._ensure_columns(cursor, 'jobs', {
+            'required_skills': 'TEXT',
+            'ats_score': 'REAL',
+            'alternate_urls': 'TEXT',
+            'llm_score': 'REAL',
+            'llm_urgency': 'TEXT',
+            'llm_reason': 'TEXT',
+            'skills_similarity': 'REAL',
+            'experience_similarity': 'REAL',
+            'education_similarity': 'REAL',
+            'salary_min': 'REAL',
+            'salary_max': 'REAL'
+        })
         
-        return profile_id
+        cursor.execute('SELECT COUNT(*) FROM jobs')
+        legacy_rows = cursor.fetchone()[0]
+        
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO postings ({', '.join(POSTING_COLUMNS)}, created_at)
+            SELECT {', '.join(POSTING_COLUMNS)}, created_at
+            FROM jobs j
+            WHERE j.id = (
+                SELECT j2.id FROM jobs j2 WHERE j2.job_hash = j.job_hash
+                ORDER BY LENGTH(j2.description) DESC, j2.id
+                LIMIT 1
+            )
+        ''')
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO profile_matches (
+                id, profile_id, posting_id, {', '.join(MATCH_COLUMNS)},
+                created_at, notified, notification_sent_at
+            )
+            SELECT j.id, j.profile_id, p.id, {', '.join(
+                f'COALESCE(j.{c}, 0)' if c in SCORE_ORDER_COLUMNS else f'j.{c}' for c in MATCH_COLUMNS
+            )},
+                   j.created_at, j.notified, j.notification_sent_at
+            FROM jobs j
+            JOIN postings p ON p.job_hash = j.job_hash
+            WHERE j.profile_id IN (SELECT id FROM profiles)
+        ''')
+        cursor.execute('DROP TABLE jobs')
+        
+        cursor.execute('SELECT COUNT(*) FROM postings')
+        logger.info(f"✓ Migrated {legacy_rows} job rows into {cursor.fetchone()[0]} postings")
     
-    def get_profile(self, profile_id: int) -> Optional[Dict]:
-        """Get profile by ID"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def _ensure_columns(self, cursor, table: str, columns: Dict[str, str]):
+        """Add missing columns to an existing table"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row[1] for row in cursor.fetchall()}
         
-        cursor.execute('SELECT * FROM profiles WHERE id = ?', (profile_id,))
-        row = cursor.fetchone()
-        conn.close()
+        for name, column_type in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}')
+    
+    # ==================== PROFILE MANAGEMENT ====================
+    
+    def create_profile(self, name: str, email: str, gemini_key: str = None, 
+                      job_preferences: dict = None) -> int:
+        """Create a new profile"""
+        def write(cursor):
+            cursor.execute('''
+                INSERT INTO profiles (name, email, gemini_key, job_preferences)
+                VALUES (?, ?, ?, ?)
+            ''', (name, email, gemini_key, json.dumps(job_preferences or {})))
+            
+            return cursor.lastrowid
         
-        if row:
-            profile = dict(row)
-            profile['job_preferences'] = json.loads(profile['job_preferences'] or '{}')
+        profile_id = self.writer.submit(write).result()
+        self.profile_cache.invalidate(ALL_PROFILES)
+        self.versions.bump(ALL_PROFILES)
+        return profile_id
+    
+    def get_profile(self, profile_id: int) -> Optional[Dict]:
+        """Get profile by ID (cached until the profile changes)"""
+        def load():
+            conn = self._connect()
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT * FROM profiles WHERE id = ?', (profile_id,))
+            profile = ProfileRow.one_from_cursor(cursor)
+            conn.close()
+            
             return profile
-        return None
+        
+        return self.profile_cache.get_or_load(profile_id, load)
     
     def get_all_profiles(self) -> List[Dict]:
-        """Get all profiles"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM profiles ORDER BY created_at DESC')
-        rows = cursor.fetchall()
-        conn.close()
-        
-        profiles = []
-        for row in rows:
-            profile = dict(row)
-            profile['job_preferences'] = json.loads(profile['job_preferences'] or '{}')
-            profiles.append(profile)
+        """Get all profiles (cached until a profile changes)"""
+        def load():
+            conn = self._connect()
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT * FROM profiles ORDER BY created_at DESC')
+            profiles = ProfileRow.from_cursor(cursor)
+            conn.close()
+            
+            return profiles
         
-        return profiles
+        return self.profile_cache.get_or_load(ALL_PROFILES, load)
     
     def update_profile(self, profile_id: int, name: str = None, email: str = None,
                       gemini_key: str = None, job_preferences: dict = None):
         """Update profile fields"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        updates = []
-        params = []
-        
-        if name is not None:
-            updates.append('name = ?')
-            params.append(name)
-        if email is not None:
-            updates.append('email = ?')
-            params.append(email)
-        if gemini_key is not None:
-            updates.append('gemini_key = ?')
-            params.append(gemini_key)
-        if job_preferences is not None:
-            updates.append('job_preferences = ?')
-            params.append(json.dumps(job_preferences))
-        
-        if updates:
-            updates.append('updated_at = CURRENT_TIMESTAMP')
-            params.append(profile_id)
+        def write(cursor):
+            updates = []
+            params = []
             
-            cursor.execute(f'''
-                UPDATE profiles SET {', '.join(updates)}
-                WHERE id = ?
-            ''', params)
+            if name is not None:
+                updates.append('name = ?')
+                params.append(name)
+            if email is not None:
+                updates.append('email = ?')
+                params.append(email)
+            if gemini_key is not None:
+                updates.append('gemini_key = ?')
+                params.append(gemini_key)
+            if job_preferences is not None:
+                updates.append('job_preferences = ?')
+                params.append(json.dumps(job_preferences))
+            
+            if updates:
+                updates.append('updated_at = CURRENT_TIMESTAMP')
+                params.append(profile_id)
+                
+                cursor.execute(f'''
+                    UPDATE profiles SET {', '.join(updates)}
+                    WHERE id = ?
+                ''', params)
         
-        conn.commit()
-        conn.close()
+        self.writer.submit(write).result()
+        self.profile_cache.invalidate(profile_id, ALL_PROFILES)
+        self.versions.bump(profile_id, ALL_PROFILES)
     
     def update_profile_resume(self, profile_id: int, resume_path: str):
         """Update profile resume path"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE profiles SET resume_path = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (resume_path, profile_id))
+        def write(cursor):
+            cursor.execute('''
+                UPDATE profiles SET resume_path = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (resume_path, profile_id))
         
-        conn.commit()
-        conn.close()
+        self.writer.submit(write).result()
+        self.profile_cache.invalidate(profile_id, ALL_PROFILES)
+        self.versions.bump(profile_id, ALL_PROFILES)
     
     def delete_profile(self, profile_id: int):
         """Delete a profile (cascade deletes jobs and history)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM profiles WHERE id = ?', (profile_id,))
+        def write(cursor):
+            cursor.execute('DELETE FROM profiles WHERE id = ?', (profile_id,))
+            cursor.execute('DELETE FROM daily_stats WHERE profile_id = ?', (profile_id,))
         
-        conn.commit()
-        conn.close()
+        self.writer.submit(write).result()
+        self.profile_cache.invalidate(profile_id, ALL_PROFILES)
+        self.versions.bump(profile_id, ALL_PROFILES)
     
     def toggle_profile(self, profile_id: int, enabled: bool):
         """Enable/disable a profile"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE profiles SET enabled = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (enabled, profile_id))
+        def write(cursor):
+            cursor.execute('''
+                UPDATE profiles SET enabled = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (enabled, profile_id))
         
-        conn.commit()
-        conn.close()
+        self.writer.submit(write).result()
+        self.profile_cache.invalidate(profile_id, ALL_PROFILES)
+        self.versions.bump(profile_id, ALL_PROFILES)
     
     # ==================== JOB MANAGEMENT ====================
     
     def save_jobs(self, profile_id: int, jobs: List[Dict]) -> int:
-        """Save jobs for a profile"""
-        conn = sqlite3.connect(self.db_path)
+        """Save jobs for a profile (posting content is written once per job hash)"""
+        def write(cursor):
+            saved_per_source = Counter()
+            for job in jobs:
+                job_hash = self._generate_job_hash(job)
+                posting = {
+                    **{column: job.get(column) for column in POSTING_COLUMNS},
+                    'job_hash': job_hash,
+                    'description': self.codec.compress(job.get('description')),
+                    'required_skills': json.dumps(job.get('required_skills', [])),
+                    'alternate_urls': json.dumps(job.get('alternate_urls', []))
+                }
+                
+                # Known postings get their last-seen time bumped and keep their
+                # extracted requirements unless none were stored yet
+                cursor.execute(f'''
+                    INSERT INTO postings ({', '.join(POSTING_COLUMNS)})
+                    VALUES ({', '.join('?' * len(POSTING_COLUMNS))})
+                    ON CONFLICT(job_hash) DO UPDATE SET
+                        last_seen_at = CURRENT_TIMESTAMP,
+                        required_skills = CASE WHEN postings.required_skills IN ('', '[]')
+                            OR postings.required_skills IS NULL
+                            THEN excluded.required_skills ELSE postings.required_skills END
+                    RETURNING id
+                ''', [posting[column] for column in POSTING_COLUMNS])
+                posting_id = cursor.fetchone()[0]
+                self._index_postings(cursor, [(
+                    posting_id, job.get('title'), job.get('company'), job.get('location'),
+                    job.get('description')
+                )])
+                
+                match = {column: job.get(column) for column in MATCH_COLUMNS}
+                match['keywords_matched'] = json.dumps(job.get('keywords_matched', []))
+                for column in SCORE_ORDER_COLUMNS:
+                    match[column] = match[column] or 0
+                
+                cursor.execute(f'''
+                    INSERT OR IGNORE INTO profile_matches (profile_id, posting_id, {', '.join(MATCH_COLUMNS)})
+                    VALUES (?, ?, {', '.join('?' * len(MATCH_COLUMNS))})
+                ''', [profile_id, posting_id, *(match[column] for column in MATCH_COLUMNS)])
+                # Already matched for this profile: rowcount is 0
+                saved_per_source[job.get('source') or ''] += cursor.rowcount
+            
+            # Stats rollup is updated in the same transaction as the matches
+            cursor.executemany('''
+                INSERT INTO daily_stats (profile_id, day, source, jobs_saved)
+                VALUES (?, date('now'), ?, ?)
+                ON CONFLICT(profile_id, day, source) DO UPDATE SET
+                    jobs_saved = jobs_saved + excluded.jobs_saved
+            ''', [(profile_id, source, count) for source, count in saved_per_source.items() if count])
+            return sum(saved_per_source.values())
+        
+        saved = self.writer.submit(write).result()
+        self.versions.bump(profile_id)
+        return saved
+    
+    def get_profile_jobs(self, profile_id: int, limit: int = 50,
+                         min_score: float = None, min_salary: float = None,
+                         max_age_days: int = None, after: tuple = None) -> List[Dict]:
+        """
+        Get jobs for a profile, optionally filtered by score, salary and posting age.
+        
+        Pages are keyset-based: pass the decoded cursor of the last job of
+        the previous page as `after`, so deep pages cost the same as the first.
+        """
+        conn = self._connect()
         cursor = conn.cursor()
         
-        saved_count = 0
-        for job in jobs:
-            job_hash = self._generate_job_hash(job)
-            
-            try:
-                cursor.execute('''
-                    INSERT INTO jobs (
-                        profile_id, job_hash, title, company, location, url,
-                        description, salary, posted_date, source, match_score,
-                        ai_similarity, keyword_match, urgency_score, keywords_matched
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    profile_id, job_hash, job['title'], job['company'],
-                    job.get('location'), job['url'], job.get('description'),
-                    job.get('salary'), job.get('posted_date'), job['source'],
-                    job.get('match_score'), job.get('ai_similarity'),
-                    job.get('keyword_match'), job.get('urgency_score'),
-                    json.dumps(job.get('keywords_matched', []))
-                ))
-                saved_count += 1
-            except sqlite3.IntegrityError:
-                # Job already exists for this profile
-                pass
+        since = posted_since(max_age_days)
         
-        conn.commit()
+        keyset = ''
+        params = [profile_id, min_score, min_score, min_salary, min_salary,
+                  since, since]
+        if after is not None:
+            keyset = 'AND (match_score, urgency_score, created_at, id) < (?, ?, ?, ?)'
+            params.extend(after)
+        params.append(limit)
+        
+        cursor.execute(f'''
+            SELECT {', '.join(JOB_LIST_COLUMNS)} FROM profile_jobs
+            WHERE profile_id = ? AND (? IS NULL OR match_score >= ?)
+              AND (? IS NULL OR salary_max >= ?)
+              AND (? IS NULL OR posted_date >= ?)
+              {keyset}
+            ORDER BY match_score DESC, urgency_score DESC, created_at DESC, id DESC
+            LIMIT ?
+        ''', params)
+        
+        jobs = JobRow.from_cursor(cursor)
         conn.close()
         
-        return saved_count
+        return jobs
     
-    def get_profile_jobs(self, profile_id: int, limit: int = 50) -> List[Dict]:
-        """Get jobs for a profile"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+    @staticmethod
+    def build_search_query(text: str, column: str = None) -> Optional[str]:
+        """
+        Turn free text into a safe FTS5 query (all terms must match).
+        
+        Terms are quoted so punctuation can't break the query syntax; a
+        trailing * keeps prefix matching ("kube*").
+        
+        Args:
+            text: User search text
+            column: Optional FTS column to restrict the terms to
+            
+        Returns:
+            FTS5 MATCH expression, or None if the text has no terms
+        """
+        terms = [
+            '"{}"'.format(term.replace('"', '""')) + ('*' if prefix else '')
+            for term, prefix in search_terms(text)
+        ]
+        if not terms:
+            return None
+        query = ' '.join(terms)
+        return f'{column} : ({query})' if column else query
+    
+    def search_profile_jobs(self, profile_id: int, text: str = None, fields: Dict[str, str] = None,
+                            limit: int = 20, offset: int = 0, min_score: float = None,
+                            min_salary: float = None, max_age_days: int = None,
+                            source: str = None) -> List[Dict]:
+        """Full-text search over a profile's jobs, best bm25 rank first (see JobStorage)"""
+        clauses = [self.build_search_query(text)]
+        clauses.extend(
+            self.build_search_query(value, column)
+            for column, value in (fields or {}).items() if column in SEARCH_FIELDS
+        )
+        clauses = [clause for clause in clauses if clause]
+        if not clauses:
+            raise ValueError('Search terms required')
+        query = ' AND '.join(clauses)
+        
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT * FROM jobs
-            WHERE profile_id = ?
-            ORDER BY match_score DESC, created_at DESC
-            LIMIT ?
-        ''', (profile_id, limit))
+        since = posted_since(max_age_days)
         
-        rows = cursor.fetchall()
-        conn.close()
+        description_column = FTS_COLUMNS.index('description')
+        cursor.execute(f'''
+            SELECT {', '.join(f'j.{c}' for c in JOB_LIST_COLUMNS)},
+                   bm25(postings_fts, {', '.join(map(str, FTS_WEIGHTS))}) AS rank,
+                   snippet(postings_fts, {description_column}, '<mark>', '</mark>', '…', 24) AS snippet
+            FROM postings_fts
+            JOIN profile_jobs j ON j.posting_id = postings_fts.rowid
+            WHERE postings_fts MATCH ? AND j.profile_id = ?
+              AND (? IS NULL OR j.match_score >= ?)
+              AND (? IS NULL OR j.salary_max >= ?)
+              AND (? IS NULL OR j.posted_date >= ?)
+              AND (? IS NULL OR j.source = ?)
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+        ''', (query, profile_id, min_score, min_score, min_salary, min_salary,
+              since, since, source, source, limit, offset))
         
-        jobs = []
-        for row in rows:
-            job = dict(row)
-            job['keywords_matched'] = json.loads(job['keywords_matched'] or '[]')
-            jobs.append(job)
+        jobs = JobRow.from_cursor(cursor)
+        conn.close()
         
         return jobs
     
     def get_unnotified_jobs(self, profile_id: int, limit: int = 10) -> List[Dict]:
         """Get unnotified jobs for a profile"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT * FROM jobs
+            SELECT * FROM profile_jobs
             WHERE profile_id = ? AND notified = 0
             ORDER BY match_score DESC, urgency_score DESC, created_at DESC
             LIMIT ?
         ''', (profile_id, limit))
         
-        rows = cursor.fetchall()
+        jobs = [self._unpack_job(job) for job in JobRow.from_cursor(cursor)]
         conn.close()
         
-        jobs = []
-        for row in rows:
-            job = dict(row)
-            job['keywords_matched'] = json.loads(job['keywords_matched'] or '[]')
-            jobs.append(job)
-        
         return jobs
     
     def mark_jobs_notified(self, job_ids: List[int]):
         """Mark jobs as notified"""
-        conn = sqlite3.connect(self.db_path)
+        def write(cursor):
+            placeholders = ','.join('?' * len(job_ids))
+            cursor.execute(f'''
+                UPDATE profile_matches
+                SET notified = 1, notification_sent_at = CURRENT_TIMESTAMP
+                WHERE id IN ({placeholders})
+                RETURNING profile_id
+            ''', job_ids)
+            return {row[0] for row in cursor.fetchall()}
+        
+        self.versions.bump(*self.writer.submit(write).result())
+    
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """Get a stored job by ID"""
+        conn = self._connect()
         cursor = conn.cursor()
         
-        placeholders = ','.join('?' * len(job_ids))
+        cursor.execute('SELECT * FROM profile_jobs WHERE id = ?', (job_id,))
+        job = JobRow.one_from_cursor(cursor)
+        conn.close()
+        
+        return self._unpack_job(job) if job else None
+    
+    def _unpack_job(self, job: JobRow) -> JobRow:
+        """Decompress the description of a job row"""
+        return job.replace(description=self._unpack_text(job['description']))
+    
+    def get_jobs_by_hashes(self, job_hashes: List[str]) -> Dict[str, Dict]:
+        """Get one stored summary row per job hash"""
+        if not job_hashes:
+            return {}
+        
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        placeholders = ','.join('?' * len(job_hashes))
         cursor.execute(f'''
-            UPDATE jobs
-            SET notified = 1, notification_sent_at = CURRENT_TIMESTAMP
-            WHERE id IN ({placeholders})
-        ''', job_ids)
+            SELECT MIN(m.id) AS id, p.job_hash, p.title, p.company, p.location, p.url, p.source
+            FROM postings p
+            JOIN profile_matches m ON m.posting_id = p.id
+            WHERE p.job_hash IN ({placeholders})
+            GROUP BY p.id
+        ''', job_hashes)
         
-        conn.commit()
+        rows = cursor.fetchall()
         conn.close()
+        
+        return {row['job_hash']: dict(row) for row in rows}
     
-    def _generate_job_hash(self, job: Dict) -> str:
-        """Generate unique hash for a job"""
-        unique_string = f"{job['title']}|{job['company']}|{job.get('location', '')}"
-        return hashlib.md5(unique_string.encode()).hexdigest()
-    
-    # ==================== RUN HISTORY ====================
+    def get_required_skills(self, job_hashes: List[str]) -> Dict[str, List[str]]:
+        """Get stored required skills per job hash (postings without any are left out)"""
+        if not job_hashes:
+            return {}
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        placeholders = ','.join('?' * len(job_hashes))
+        cursor.execute(f'''
+            SELECT job_hash, required_skills FROM postings
+            WHERE job_hash IN ({placeholders}) AND required_skills NOT IN ('', '[]')
+        ''', job_hashes)
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return {job_hash: json.loads(skills) for job_hash, skills in rows}
     
-    def create_run_record(self, profile_id: int, status: str = 'running') -> int:
-        """Create a run history record"""
-        conn = sqlite3.connect(self.db_path)
+    def get_job_scores(self, profile_id: int) -> List[tuple]:
+        """Get stored component scores for a profile's jobs (see JobMatcher.rescore)"""
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
-            INSERT INTO run_history (profile_id, status)
-            VALUES (?, ?)
-        ''', (profile_id, status))
+            SELECT id, COALESCE(ai_similarity, 0), COALESCE(keyword_match, 0),
+                   COALESCE(urgency_score, 0), llm_score, skills_similarity,
+                   experience_similarity, education_similarity
+            FROM profile_matches
+            WHERE profile_id = ?
+        ''', (profile_id,))
         
-        run_id = cursor.lastrowid
-        conn.commit()
+        rows = cursor.fetchall()
         conn.close()
         
-        return run_id
+        return rows
     
-    def update_run_record(self, run_id: int, status: str = None,
-                         jobs_found: int = None, jobs_scraped: int = None,
-                         error_message: str = None):
-        """Update a run history record"""
-        conn = sqlite3.connect(self.db_path)
+    def update_match_scores(self, profile_id: int, scores: List[tuple]) -> int:
+        """Update a profile's match scores from (job_id, match_score) pairs"""
+        def write(cursor):
+            cursor.executemany(
+                'UPDATE profile_matches SET match_score = ? WHERE id = ? AND profile_id = ?',
+                [(score, job_id, profile_id) for job_id, score in scores]
+            )
+            return cursor.rowcount
+        
+        updated = self.writer.submit(write).result()
+        self.versions.bump(profile_id)
+        return updated
+    
+    # ==================== DESCRIPTION COMPRESSION ====================
+    
+    def train_description_dictionary(self, sample_size: int = DICTIONARY_SAMPLE_SIZE,
+                                     min_samples: int = DICTIONARY_MIN_SAMPLES) -> Optional[int]:
+        """
+        Train a compression dictionary on the newest stored descriptions.
+        
+        Postings saved afterwards are compressed with it; run
+        compress_descriptions() to rewrite older ones.
+        
+        Returns:
+            New dictionary id, or None if there are fewer than min_samples descriptions
+        """
+        conn = self._connect()
         cursor = conn.cursor()
+        cursor.execute('''
+            SELECT description FROM postings
+            WHERE description IS NOT NULL
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (sample_size,))
+        samples = [self._unpack_text(row[0]) for row in cursor.fetchall()]
+        conn.close()
         
-        updates = ['completed_at = CURRENT_TIMESTAMP']
-        params = []
+        if len(samples) < min_samples:
+            return None
+        dictionary = train_dictionary(samples)
+        if not dictionary:
+            return None
+        
+        def write(cursor):
+            cursor.execute('INSERT INTO text_dictionaries (zdict, sample_count) VALUES (?, ?)',
+                           (dictionary, len(samples)))
+            return cursor.lastrowid
+        
+        dictionary_id = self.writer.submit(write).result()
+        self.codec.add_dictionary(dictionary_id, dictionary)
+        logger.info(f"✓ Trained description dictionary {dictionary_id} "
+                    f"({len(dictionary) / 1024:.0f} KB from {len(samples)} postings)")
+        return dictionary_id
+    
+    def compress_descriptions(self, batch_size: int = 500) -> int:
+        """
+        Rewrite descriptions stored as plain text or with an older dictionary.
+        
+        Returns:
+            Number of postings rewritten
+        """
+        current = HEADER.pack(self.codec.current_id)
+        rewritten = 0
+        last_id = 0
+        while True:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, description FROM postings
+                WHERE id > ? AND description IS NOT NULL
+                  AND (typeof(description) = 'text' OR substr(description, 1, 2) != ?)
+                ORDER BY id
+                LIMIT ?
+            ''', (last_id, current, batch_size))
+            rows = cursor.fetchall()
+            conn.close()
+            if not rows:
+                return rewritten
         
-        if status is not None:
-            updates.append('status = ?')
-            params.append(status)
-        if jobs_found is not None:
-            updates.append('jobs_found = ?')
-            params.append(jobs_found)
-        if jobs_scraped is not None:
-            updates.append('jobs_scraped = ?')
-            params.append(jobs_scraped)
-        if error_message is not None:
-            updates.append('error_message = ?')
-            params.append(error_message)
-        
-        params.append(run_id)
+            def write(cursor, rows=rows):
+                cursor.executemany(
+                    'UPDATE postings SET description = ? WHERE id = ?',
+                    [(self.codec.compress(self._unpack_text(value)), posting_id) for posting_id, value in rows]
+                )
+                return cursor.rowcount
         
+            rewritten += self.writer.submit(write).result()
+            last_id = rows[-1][0]
+
+    # ==================== LLM ANALYSIS CACHE ====================
+    
+    def get_llm_analyses(self, resume_hash: str, model: str,
+                        job_hashes: List[str]) -> Dict[str, Dict]:
+        """Get cached LLM analyses for jobs, keyed by job hash"""
+        if not job_hashes:
+            return {}
+        
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        placeholders = ','.join('?' * len(job_hashes))
         cursor.execute(f'''
-            UPDATE run_history SET {', '.join(updates)}
-            WHERE id = ?
-        ''', params)
+            SELECT job_hash, score, urgency, reason FROM llm_analyses
+            WHERE resume_hash = ? AND model = ? AND job_hash IN ({placeholders})
+        ''', [resume_hash, model, *job_hashes])
         
-        conn.commit()
+        rows = cursor.fetchall()
         conn.close()
+        
+        return {
+            row['job_hash']: {'score': row['score'], 'urgency': row['urgency'], 'reason': row['reason']}
+            for row in rows
+        }
+    
+    def save_llm_analyses(self, resume_hash: str, model: str, analyses: Dict[str, Dict]):
+        """Cache LLM analyses keyed by job hash"""
+        def write(cursor):
+            cursor.executemany('''
+                INSERT OR REPLACE INTO llm_analyses (job_hash, resume_hash, model, score, urgency, reason)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (job_hash, resume_hash, model, a['score'], a.get('urgency'), a.get('reason'))
+                for job_hash, a in analyses.items()
+            ])
+        
+        return self.writer.submit(write).result()
+    
+    def _generate_job_hash(self, job: Dict) -> str:
+        """Generate unique hash for a job"""
+        return job.get('job_hash') or generate_job_hash(job)
+    
+    # ==================== RUN HISTORY ====================
+    
+    def create_run_record(self, profile_id: int, status: str = 'running') -> int:
+        """Create a run history record"""
+        def write(cursor):
+            cursor.execute('''
+                INSERT INTO run_history (profile_id, status)
+                VALUES (?, ?)
+            ''', (profile_id, status))
+            
+            return cursor.lastrowid
+        
+        run_id = self.writer.submit(write).result()
+        self.versions.bump(profile_id)
+        return run_id
+    
+    def update_run_record(self, run_id: int, status: str = None,
+                         jobs_found: int = None, jobs_scraped: int = None,
+                         error_message: str = None):
+        """Update a run history record"""
+        def write(cursor):
+            updates = ['completed_at = CURRENT_TIMESTAMP']
+            params = []
+            
+            if status is not None:
+                updates.append('status = ?')
+                params.append(status)
+            if jobs_found is not None:
+                updates.append('jobs_found = ?')
+                params.append(jobs_found)
+            if jobs_scraped is not None:
+                updates.append('jobs_scraped = ?')
+                params.append(jobs_scraped)
+            if error_message is not None:
+                updates.append('error_message = ?')
+                params.append(error_message)
+            
+            params.append(run_id)
+            
+            cursor.execute('SELECT status FROM run_history WHERE id = ?', (run_id,))
+            row = cursor.fetchone()
+            was_final = row is not None and row[0] in FINAL_RUN_STATUSES
+            
+            cursor.execute(f'''
+                UPDATE run_history SET {', '.join(updates)}
+                WHERE id = ?
+                RETURNING profile_id, status, jobs_found
+            ''', params)
+            run = cursor.fetchone()
+            
+            # Count each run in the stats rollup once, when it finishes
+            if run is not None and run[1] in FINAL_RUN_STATUSES and not was_final:
+                succeeded = run[1] == 'success'
+                cursor.execute('''
+                    INSERT INTO daily_stats (profile_id, day, source, runs, runs_succeeded, jobs_found)
+                    VALUES (?, date('now'), ?, 1, ?, ?)
+                    ON CONFLICT(profile_id, day, source) DO UPDATE SET
+                        runs = runs + 1,
+                        runs_succeeded = runs_succeeded + excluded.runs_succeeded,
+                        jobs_found = jobs_found + excluded.jobs_found
+                ''', (run[0], RUN_STATS_SOURCE, int(succeeded), (run[2] or 0) if succeeded else 0))
+            
+            return run[0] if run is not None else None
+        
+        profile_id = self.writer.submit(write).result()
+        if profile_id is not None:
+            self.versions.bump(profile_id)
     
     def get_run_history(self, profile_id: int, limit: int = 10) -> List[Dict]:
         """Get run history for a profile"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -388,48 +1033,174 @@ class DatabaseManager:
     
     # ==================== DASHBOARD STATS ====================
     
-    def get_dashboard_stats(self) -> Dict:
-        """Get overall dashboard statistics"""
-        conn = sqlite3.connect(self.db_path)
+    def get_dashboard_stats(self, profile_id: int = None) -> Dict:
+        """Get dashboard statistics for the last STATS_DAYS days from the stats rollup"""
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Total profiles
         cursor.execute('SELECT COUNT(*) FROM profiles WHERE enabled = 1')
         total_profiles = cursor.fetchone()[0]
         
-        # Total jobs (last 7 days)
-        cursor.execute('''
-            SELECT COUNT(*) FROM jobs
-            WHERE created_at >= datetime('now', '-7 days')
-        ''')
-        jobs_last_7_days = cursor.fetchone()[0]
+        # At most profiles x days x sources rows, independent of table sizes
+        query = f'''
+            SELECT day, source, SUM(jobs_saved), SUM(runs), SUM(runs_succeeded), SUM(jobs_found)
+            FROM daily_stats
+            WHERE day > date('now', '-{STATS_DAYS} days')
+        '''
+        params = []
+        if profile_id is not None:
+            query += ' AND profile_id = ?'
+            params.append(profile_id)
+        query += ' GROUP BY day, source ORDER BY day'
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
         
-        # Success rate (last 10 runs)
-        cursor.execute('''
-            SELECT 
-                COUNT(CASE WHEN status = 'success' THEN 1 END) * 100.0 / COUNT(*) as success_rate
-            FROM (
-                SELECT status FROM run_history
-                ORDER BY started_at DESC
-                LIMIT 10
-            )
-        ''')
-        result = cursor.fetchone()
-        success_rate = result[0] if result[0] is not None else 0
+        return summarize_stats(total_profiles, rows)
+    
+    # ==================== MAINTENANCE ====================
+    
+    def run_maintenance(self, retention_days: int = 30, retention: Dict[str, int] = None,
+                        archive_dir: str = None, batch_size: int = 500) -> Dict:
+        """
+        Expire rows past retention, purge orphans and return free pages to the file system.
         
-        # Average jobs per run
-        cursor.execute('''
-            SELECT AVG(jobs_found) FROM run_history
-            WHERE status = 'success' AND started_at >= datetime('now', '-7 days')
-        ''')
-        result = cursor.fetchone()
-        avg_jobs_per_run = result[0] if result[0] is not None else 0
+        Every step runs as a series of small write batches, so saves from
+        running searches are never blocked for long.
         
-        conn.close()
+        Args:
+            retention_days: Days to keep rows of tables missing from retention
+            retention: Days to keep rows per RETENTION_TABLES table
+            archive_dir: Directory expired rows are archived to (None = no archive)
+            batch_size: Rows per write batch
         
-        return {
-            'total_profiles': total_profiles,
-            'jobs_last_7_days': jobs_last_7_days,
-            'success_rate': round(success_rate, 1),
-            'avg_jobs_per_run': round(avg_jobs_per_run, 1)
+        Returns:
+            Dictionary of expired rows per table, orphans purged and pages freed
+        """
+        retention = retention or {}
+        # Orphans first, so postings only they referenced can expire in this run
+        orphans = self.purge_orphans(batch_size)
+        expired = {
+            table: self.expire_rows(table, retention.get(table, retention_days), archive_dir, batch_size)
+            for table in RETENTION_TABLES
         }
+        pages_freed = self.incremental_vacuum()
+        if orphans or any(expired.values()):
+            self.versions.bump()
+        
+        logger.info(f"🧹 Maintenance: expired {sum(expired.values())} rows "
+                    f"({', '.join(f'{t}: {n}' for t, n in expired.items() if n) or 'none'}), "
+                    f"purged {orphans} orphans, freed {pages_freed} pages")
+        return {'expired': expired, 'orphans': orphans, 'pages_freed': pages_freed}
+    
+    def expire_rows(self, table: str, days: int, archive_dir: str = None,
+                    batch_size: int = 500) -> int:
+        """
+        Delete rows of a RETENTION_TABLES table older than days, oldest first.
+        
+        Each batch is appended to <archive_dir>/<table>-<date>.jsonl.gz by
+        the write that deletes it, from the rows the DELETE returned: a
+        failed archive rolls the delete back, and a crash before the commit
+        archives rows twice, never loses them.
+        
+        Returns:
+            Number of rows deleted
+        """
+        key, age_column = RETENTION_TABLES[table]
+        condition = f"{age_column} < datetime('now', ?)"
+        if table == 'profile_matches':
+            condition += ''' AND NOT EXISTS (
+                SELECT 1 FROM postings p
+                WHERE p.id = profile_matches.posting_id AND p.last_seen_at >= datetime('now', ?)
+            )'''
+        elif table == 'postings':
+            condition += ' AND NOT EXISTS (SELECT 1 FROM profile_matches m WHERE m.posting_id = postings.id)'
+        ages = [f'{-days} days'] * condition.count('?')
+        
+        def write(cursor):
+            cursor.execute(f'''
+                DELETE FROM {table} WHERE ({key}) IN (
+                    SELECT {key} FROM {table}
+                    WHERE {condition}
+                    ORDER BY {age_column}
+                    LIMIT ?
+                )
+                RETURNING *
+            ''', (*ages, batch_size))
+            names = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+            if archive_dir and rows:
+                self._archive_rows(table, names, rows, archive_dir)
+            return len(rows)
+        
+        deleted = 0
+        while True:
+            count = self.writer.submit(write).result()
+            deleted += count
+            if count < batch_size:
+                return deleted
+    
+    def _archive_rows(self, table: str, names: List[str], rows: List[tuple], archive_dir: str):
+        """Append rows to the table's archive, with posting descriptions decompressed"""
+        records = [dict(zip(names, row)) for row in rows]
+        if table == 'postings':
+            for record in records:
+                record['description'] = self._unpack_text(record['description'])
+        archive_records(archive_dir, table, records)
+    
+    def purge_orphans(self, batch_size: int = 500) -> int:
+        """
+        Delete PROFILE_TABLES rows whose profile no longer exists.
+        
+        Returns:
+            Number of rows deleted
+        """
+        def write(cursor, table, key):
+            cursor.execute(f'''
+                DELETE FROM {table} WHERE ({key}) IN (
+                    SELECT {key} FROM {table}
+                    WHERE profile_id NOT IN (SELECT id FROM profiles)
+                    LIMIT ?
+                )
+            ''', (batch_size,))
+            return cursor.rowcount
+        
+        purged = 0
+        for table in PROFILE_TABLES:
+            while True:
+                count = self.writer.submit(write, table, RETENTION_TABLES[table][0]).result()
+                purged += count
+                if count < batch_size:
+                    break
+        return purged
+    
+    def incremental_vacuum(self, pages_per_step: int = 1000) -> int:
+        """
+        Return free pages to the file system a few at a time.
+        
+        Needs auto_vacuum = INCREMENTAL (new databases; migrate.py converts
+        old ones); otherwise nothing is freed.
+        
+        Returns:
+            Number of pages freed
+        """
+        conn = self._connect()
+        auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+        conn.close()
+        if auto_vacuum != 2:
+            return 0
+        
+        def write(cursor):
+            free_pages = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+            # Each step of the pragma frees one page, and sqlite3 steps it only once
+            for _ in range(min(free_pages, pages_per_step)):
+                cursor.execute('PRAGMA incremental_vacuum')
+            return free_pages - cursor.execute('PRAGMA freelist_count').fetchone()[0]
+        
+        freed = 0
+        while True:
+            count = self.writer.submit(write).result()
+            freed += count
+            if count < pages_per_step:
+                return freed
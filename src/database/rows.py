@@ -0,0 +1,138 @@
+"""
+Compact read-only row objects with lazily decoded JSON columns.
+"""
+
+import json
+from collections.abc import Mapping
+from typing import Dict, List, Optional
+
+
+class RowLayout:
+    """Column positions of one result set, shared by all of its rows."""
+
+    __slots__ = ('index', 'plain', 'json')
+
+    def __init__(self, names, json_columns: Dict[str, str]):
+        """
+        Initialize row layout.
+
+        Args:
+            names: Column names in result order
+            json_columns: JSON column name -> JSON text used when NULL
+        """
+        self.index = {name: i for i, name in enumerate(names)}
+        self.plain = tuple((name, i) for i, name in enumerate(names) if name not in json_columns)
+        self.json = tuple(
+            (name, i, json_columns[name]) for i, name in enumerate(names) if name in json_columns
+        )
+
+
+class Row(Mapping):
+    """
+    One result row, read like a dict.
+
+    Values stay in the fetched tuple; JSON columns are parsed on first
+    access, and to_json() copies their stored text into the output
+    without parsing it at all.
+    """
+
+    __slots__ = ('_layout', '_values', '_decoded')
+
+    # JSON column name -> JSON text used when the column is NULL
+    json_columns: Dict[str, str] = {}
+
+    def __init__(self, layout: RowLayout, values: tuple):
+        self._layout = layout
+        self._values = values
+        self._decoded = None
+
+    @classmethod
+    def from_cursor(cls, cursor) -> List['Row']:
+        """
+        Fetch all remaining rows of an executed cursor.
+
+        Args:
+            cursor: DB-API cursor returning plain tuples
+
+        Returns:
+            List of rows sharing one layout
+        """
+        layout = RowLayout([column[0] for column in cursor.description], cls.json_columns)
+        return [cls(layout, values) for values in cursor.fetchall()]
+
+    @classmethod
+    def one_from_cursor(cls, cursor) -> Optional['Row']:
+        """Fetch the next row of an executed cursor, or None"""
+        values = cursor.fetchone()
+        if values is None:
+            return None
+        return cls(RowLayout([column[0] for column in cursor.description], cls.json_columns), values)
+
+    def __getitem__(self, key):
+        value = self._values[self._layout.index[key]]
+        default = self.json_columns.get(key)
+        if default is None:
+            return value
+
+        if self._decoded is None:
+            self._decoded = {}
+        if key not in self._decoded:
+            self._decoded[key] = json.loads(value or default)
+        return self._decoded[key]
+
+    def __iter__(self):
+        return iter(self._layout.index)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def replace(self, **values) -> 'Row':
+        """Get a copy with some column values replaced"""
+        row = list(self._values)
+        for name, value in values.items():
+            row[self._layout.index[name]] = value
+        return type(self)(self._layout, tuple(row))
+
+    def to_dict(self) -> Dict:
+        """Get a plain dict copy (JSON columns decoded)"""
+        return dict(self)
+
+    def to_json(self) -> str:
+        """Serialize to a JSON object, embedding unparsed JSON columns verbatim"""
+        values = self._values
+        text = json.dumps({name: values[i] for name, i in self._layout.plain}, separators=(',', ':'))
+        if not self._layout.json:
+            return text
+
+        parts = []
+        for name, i, default in self._layout.json:
+            if self._decoded is not None and name in self._decoded:
+                parts.append(f'"{name}":{json.dumps(self._decoded[name])}')
+            else:
+                parts.append(f'"{name}":{values[i] or default}')
+        separator = ',' if len(text) > 2 else ''
+        return text[:-1] + separator + ','.join(parts) + '}'
+
+
+class JobRow(Row):
+    """Stored job (profile_jobs view)."""
+
+    __slots__ = ()
+    json_columns = {'keywords_matched': '[]', 'required_skills': '[]', 'alternate_urls': '[]'}
+
+
+class ProfileRow(Row):
+    """Stored profile."""
+
+    __slots__ = ()
+    json_columns = {'job_preferences': '{}'}
+
+
+def rows_to_json(rows) -> str:
+    """Serialize a list of rows (or plain dicts) to a JSON array"""
+    return '[' + ','.join(
+        row.to_json() if isinstance(row, Row) else json.dumps(row, default=str) for row in rows
+    ) + ']'
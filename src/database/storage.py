@@ -0,0 +1,349 @@
+"""
+Storage interface shared by the SQLite and PostgreSQL backends.
+"""
+
+import base64
+import gzip
+import json
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Optional
+
+# Listing order for a profile's jobs; keyset cursors hold these column values
+JOB_ORDER_COLUMNS = ('match_score', 'urgency_score', 'created_at', 'id')
+# Order columns stored NOT NULL DEFAULT 0 (a NULL would drop rows from keyset pages)
+SCORE_ORDER_COLUMNS = ('match_score', 'urgency_score')
+
+# Columns stored once per posting vs. once per (profile, posting) match
+POSTING_COLUMNS = (
+    'job_hash', 'title', 'company', 'location', 'url', 'description', 'salary',
+    'salary_min', 'salary_max', 'posted_date', 'source', 'required_skills', 'alternate_urls'
+)
+MATCH_COLUMNS = (
+    'match_score', 'ai_similarity', 'keyword_match', 'urgency_score', 'keywords_matched',
+    'ats_score', 'llm_score', 'llm_urgency', 'llm_reason', 'skills_similarity',
+    'experience_similarity', 'education_similarity'
+)
+JSON_JOB_COLUMNS = ('keywords_matched', 'required_skills', 'alternate_urls')
+# Columns returned by job lists; the description is only loaded by get_job
+JOB_LIST_COLUMNS = (
+    'id', 'profile_id', 'posting_id',
+    *(column for column in POSTING_COLUMNS if column != 'description'),
+    *MATCH_COLUMNS, 'created_at', 'notified', 'notification_sent_at'
+)
+
+# Full-text search: fields a search can be restricted to, and how terms are split
+SEARCH_FIELDS = ('title', 'company', 'location')
+SEARCH_TERM_PATTERN = re.compile(r'[\w+#.-]+\*?')
+
+# Run outcomes counted in the stats rollup; runs span all sources, so their
+# counters live in rows with source = RUN_STATS_SOURCE
+FINAL_RUN_STATUSES = ('success', 'failed')
+RUN_STATS_SOURCE = ''
+STATS_DAYS = 7
+
+# Profile cache bounds; the max age bounds staleness when another process
+# (e.g. a second replica) changes a profile
+PROFILE_CACHE_SIZE = 256
+PROFILE_CACHE_MAX_AGE = 60  # seconds
+ALL_PROFILES = 'all'  # cache key of the get_all_profiles() list
+
+
+def search_terms(text: str) -> List[tuple]:
+    """
+    Split free search text into terms.
+
+    Args:
+        text: User search text
+
+    Returns:
+        List of (term, is_prefix) tuples; a trailing * marks a prefix term
+    """
+    terms = []
+    for term in SEARCH_TERM_PATTERN.findall(text or ''):
+        prefix = term.endswith('*')
+        term = term.rstrip('*')
+        if term:
+            terms.append((term, prefix))
+    return terms
+
+
+def decode_job(row) -> Dict:
+    """Convert a stored job row to a dict with its JSON columns decoded"""
+    job = dict(row)
+    for column in JSON_JOB_COLUMNS:
+        if column in job:
+            job[column] = json.loads(job[column] or '[]')
+    return job
+
+
+def posted_since(max_age_days: int = None) -> Optional[str]:
+    """Get the oldest ISO posting date allowed by a max age filter"""
+    if max_age_days is None:
+        return None
+    return (datetime.now() - timedelta(days=max_age_days)).isoformat(timespec='seconds')
+
+
+def archive_records(archive_dir: str, table: str, records: List[Dict]):
+    """Append records to the table's gzipped JSONL archive for today"""
+    path = Path(archive_dir) / f"{table}-{datetime.now():%Y-%m-%d}.jsonl.gz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, 'at', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + '\n')
+
+
+def summarize_stats(total_profiles: int, rows) -> Dict:
+    """
+    Build dashboard statistics from stats rollup rows.
+
+    Args:
+        total_profiles: Number of enabled profiles
+        rows: (day, source, jobs_saved, runs, runs_succeeded, jobs_found) rows
+
+    Returns:
+        Dashboard stats dictionary
+    """
+    by_source = Counter()
+    by_day = {}
+    runs = runs_succeeded = jobs_found = 0
+    for day, source, jobs_saved, day_runs, day_succeeded, day_found in rows:
+        day = str(day)
+        totals = by_day.setdefault(day, {'day': day, 'jobs_saved': 0, 'runs': 0, 'runs_succeeded': 0})
+        totals['jobs_saved'] += jobs_saved
+        totals['runs'] += day_runs
+        totals['runs_succeeded'] += day_succeeded
+        if jobs_saved:
+            by_source[source or 'unknown'] += jobs_saved
+        runs += day_runs
+        runs_succeeded += day_succeeded
+        jobs_found += day_found
+
+    return {
+        'total_profiles': total_profiles,
+        'jobs_last_7_days': sum(by_source.values()),
+        'success_rate': round(runs_succeeded * 100.0 / runs, 1) if runs else 0,
+        'avg_jobs_per_run': round(jobs_found / runs_succeeded, 1) if runs_succeeded else 0,
+        'by_source': dict(by_source.most_common()),
+        'by_day': list(by_day.values())
+    }
+
+
+class JobStorage(ABC):
+    """
+    Profiles, matched jobs, LLM analyses and run history.
+
+    Implemented by the SQLite DatabaseManager and PostgresDatabaseManager;
+    use create_storage() to get the one configured for this process.
+    Profiles are served from profile_cache (an LRUCache), which profile
+    writes invalidate; writes also bump versions (DataVersions), from
+    which the web app derives ETags.
+    """
+
+    # ==================== PROFILE MANAGEMENT ====================
+
+    @abstractmethod
+    def create_profile(self, name: str, email: str, gemini_key: str = None,
+                      job_preferences: dict = None) -> int:
+        """Create a new profile"""
+        pass
+
+    @abstractmethod
+    def get_profile(self, profile_id: int) -> Optional[Dict]:
+        """Get profile by ID"""
+        pass
+
+    @abstractmethod
+    def get_all_profiles(self) -> List[Dict]:
+        """Get all profiles"""
+        pass
+
+    @abstractmethod
+    def update_profile(self, profile_id: int, name: str = None, email: str = None,
+                      gemini_key: str = None, job_preferences: dict = None):
+        """Update profile fields"""
+        pass
+
+    @abstractmethod
+    def update_profile_resume(self, profile_id: int, resume_path: str):
+        """Update profile resume path"""
+        pass
+
+    @abstractmethod
+    def delete_profile(self, profile_id: int):
+        """Delete a profile (cascade deletes jobs and history)"""
+        pass
+
+    @abstractmethod
+    def toggle_profile(self, profile_id: int, enabled: bool):
+        """Enable/disable a profile"""
+        pass
+
+    # ==================== JOB MANAGEMENT ====================
+
+    @abstractmethod
+    def save_jobs(self, profile_id: int, jobs: List[Dict]) -> int:
+        """Save jobs for a profile and return how many were new for it"""
+        pass
+
+    @staticmethod
+    def encode_cursor(job: Dict) -> str:
+        """Encode a job's listing-order values as an opaque page cursor"""
+        values = json.dumps([job[column] for column in JOB_ORDER_COLUMNS])
+        return base64.urlsafe_b64encode(values.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        """Decode a page cursor (raises ValueError if malformed)"""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {e}")
+        if not isinstance(values, list) or len(values) != len(JOB_ORDER_COLUMNS):
+            raise ValueError("Invalid cursor")
+        # Cursors issued before scores were NOT NULL may hold nulls
+        return tuple(
+            0 if value is None and column in SCORE_ORDER_COLUMNS else value
+            for column, value in zip(JOB_ORDER_COLUMNS, values)
+        )
+
+    @abstractmethod
+    def get_profile_jobs(self, profile_id: int, limit: int = 50,
+                         min_score: float = None, min_salary: float = None,
+                         max_age_days: int = None, after: tuple = None) -> List[Dict]:
+        """Get a page of a profile's jobs in listing order (after = decoded cursor, no description)"""
+        pass
+
+    @abstractmethod
+    def search_profile_jobs(self, profile_id: int, text: str = None, fields: Dict[str, str] = None,
+                            limit: int = 20, offset: int = 0, min_score: float = None,
+                            min_salary: float = None, max_age_days: int = None,
+                            source: str = None) -> List[Dict]:
+        """
+        Full-text search over a profile's jobs, best match first.
+
+        Args:
+            profile_id: Profile ID
+            text: Terms to find in any field
+            fields: Terms to find in one field, keyed by a SEARCH_FIELDS name
+            limit: Page size
+            offset: Rows to skip
+            min_score, min_salary, max_age_days, source: Optional filters
+
+        Returns:
+            Jobs (JOB_LIST_COLUMNS) with 'rank' (lower is better) and a
+            highlighted description 'snippet'
+
+        Raises:
+            ValueError: If there are no search terms
+        """
+        pass
+
+    @abstractmethod
+    def get_unnotified_jobs(self, profile_id: int, limit: int = 10) -> List[Dict]:
+        """Get jobs that haven't been notified yet"""
+        pass
+
+    @abstractmethod
+    def mark_jobs_notified(self, job_ids: List[int]):
+        """Mark jobs as notified"""
+        pass
+
+    @abstractmethod
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """Get a stored job by ID, including its full description"""
+        pass
+
+    @abstractmethod
+    def get_jobs_by_hashes(self, job_hashes: List[str]) -> Dict[str, Dict]:
+        """Get one stored summary row per job hash"""
+        pass
+
+    @abstractmethod
+    def get_required_skills(self, job_hashes: List[str]) -> Dict[str, List[str]]:
+        """Get stored required skills per job hash (postings without any are left out)"""
+        pass
+
+    @abstractmethod
+    def get_job_scores(self, profile_id: int) -> List[tuple]:
+        """Get stored component scores for a profile's jobs (see JobMatcher.rescore)"""
+        pass
+
+    @abstractmethod
+    def update_match_scores(self, profile_id: int, scores: List[tuple]) -> int:
+        """Update a profile's match scores from (job_id, match_score) pairs"""
+        pass
+
+    # ==================== LLM ANALYSIS CACHE ====================
+
+    @abstractmethod
+    def get_llm_analyses(self, resume_hash: str, model: str,
+                        job_hashes: List[str]) -> Dict[str, Dict]:
+        """Get cached LLM analyses for jobs, keyed by job hash"""
+        pass
+
+    @abstractmethod
+    def save_llm_analyses(self, resume_hash: str, model: str, analyses: Dict[str, Dict]):
+        """Cache LLM analyses keyed by job hash"""
+        pass
+
+    # ==================== RUN HISTORY ====================
+
+    @abstractmethod
+    def create_run_record(self, profile_id: int, status: str = 'running') -> int:
+        """Create a run history record"""
+        pass
+
+    @abstractmethod
+    def update_run_record(self, run_id: int, status: str = None,
+                         jobs_found: int = None, jobs_scraped: int = None,
+                         error_message: str = None):
+        """Update a run history record"""
+        pass
+
+    @abstractmethod
+    def get_run_history(self, profile_id: int, limit: int = 10) -> List[Dict]:
+        """Get run history for a profile"""
+        pass
+
+    # ==================== DASHBOARD STATS ====================
+
+    @abstractmethod
+    def get_dashboard_stats(self, profile_id: int = None) -> Dict:
+        """Get dashboard statistics for the last STATS_DAYS days (see summarize_stats)"""
+        pass
+
+    @abstractmethod
+    def run_maintenance(self, retention_days: int = 30, retention: Dict[str, int] = None,
+                        archive_dir: str = None, batch_size: int = 500) -> Dict:
+        """Expire rows past retention, archiving them, and purge orphans (see the backends)"""
+        pass
+    
+    def close(self):
+        """Release connections and background threads"""
+        pass
+
+
+def create_storage(url: str = None, **kwargs) -> JobStorage:
+    """
+    Open the storage backend for a database URL.
+
+    Args:
+        url: 'postgresql://...' for PostgreSQL; a SQLite file path or
+             'sqlite:///path' otherwise (None = data/jobs.db)
+        **kwargs: Backend options (e.g. pool sizes for PostgreSQL)
+
+    Returns:
+        JobStorage instance
+    """
+    if url and url.startswith(('postgres://', 'postgresql://')):
+        from database.postgres_db import PostgresDatabaseManager
+        return PostgresDatabaseManager(url, **kwargs)
+
+    from database.multi_profile_db import DatabaseManager
+    if url and url.startswith('sqlite:///'):
+        url = url[len('sqlite:///'):]
+    return DatabaseManager(url or 'data/jobs.db', **kwargs)
@@ -0,0 +1,138 @@
+"""
+zlib compression of long texts with trained preset dictionaries.
+"""
+
+import struct
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+# zlib only looks back 32 KB, so a preset dictionary larger than that is wasted
+MAX_DICTIONARY_SIZE = 32 * 1024
+COMPRESSION_LEVEL = 6
+# Compressed values start with the id of their dictionary (0 = none)
+HEADER = struct.Struct('>H')
+NO_DICTIONARY = 0
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """
+    Build a zlib preset dictionary from sample texts.
+
+    Lines and sentences that recur across samples (company boilerplate,
+    benefit lists, "m/w/d" headers) are picked by total bytes saved, then
+    frequent words fill the remaining space. The most valuable strings go
+    last, where zlib reaches them with the shortest distances.
+
+    Args:
+        samples: Sample texts (e.g. stored job descriptions)
+        size: Dictionary size limit in bytes
+
+    Returns:
+        Dictionary bytes (empty if the samples share nothing)
+    """
+    fragments = Counter()
+    words = Counter()
+    for text in samples:
+        if not text:
+            continue
+        # Document frequency: a fragment repeated inside one text is already cheap
+        parts = {part.strip() for line in text.splitlines() for part in line.split('. ')}
+        fragments.update(part for part in parts if len(part) >= 16)
+        words.update({word for word in text.split() if len(word) >= 4})
+
+    candidates = [
+        (count * len(fragment), fragment.encode('utf-8'))
+        for fragment, count in fragments.items() if count >= 2
+    ]
+    candidates.sort(reverse=True)
+
+    chosen, used = [], 0
+    for _, fragment in candidates:
+        if used + len(fragment) + 1 > size:
+            continue
+        chosen.append(fragment)
+        used += len(fragment) + 1
+
+    for word, count in words.most_common():
+        if count < 2:
+            break
+        word = word.encode('utf-8')
+        if used + len(word) + 1 > size:
+            break
+        chosen.append(word)
+        used += len(word) + 1
+
+    return b'\n'.join(reversed(chosen))
+
+
+class TextCodec:
+    """
+    Compress texts with the newest preset dictionary, decompress with any.
+
+    Each compressed value carries the id of the dictionary it was written
+    with, so training a new dictionary never invalidates stored data.
+    """
+
+    def __init__(self, dictionaries: Optional[Dict[int, bytes]] = None):
+        """
+        Initialize text codec.
+
+        Args:
+            dictionaries: Dict of dictionary id -> dictionary bytes
+        """
+        self._dictionaries = dict(dictionaries or {})
+        self._lock = threading.Lock()
+
+    @property
+    def current_id(self) -> int:
+        """Id of the dictionary new values are compressed with"""
+        return max(self._dictionaries, default=NO_DICTIONARY)
+
+    def add_dictionary(self, dictionary_id: int, dictionary: bytes):
+        """Register a dictionary (the highest id is used for new values)"""
+        with self._lock:
+            self._dictionaries[dictionary_id] = dictionary
+
+    def compress(self, text: Optional[str]) -> Optional[bytes]:
+        """
+        Compress a text.
+
+        Args:
+            text: Text (None stays None)
+
+        Returns:
+            Dictionary id header followed by the zlib stream
+        """
+        if text is None:
+            return None
+        dictionary_id = self.current_id
+        if dictionary_id == NO_DICTIONARY:
+            compressor = zlib.compressobj(COMPRESSION_LEVEL)
+        else:
+            compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=self._dictionaries[dictionary_id])
+        data = compressor.compress(text.encode('utf-8')) + compressor.flush()
+        return HEADER.pack(dictionary_id) + data
+
+    def decompress(self, value):
+        """
+        Decompress a stored value.
+
+        Args:
+            value: Compressed bytes, or a plain str stored before compression
+
+        Returns:
+            Text (plain str and None are returned unchanged)
+
+        Raises:
+            KeyError: If the value's dictionary is not registered
+        """
+        if not isinstance(value, bytes):
+            return value
+        (dictionary_id,) = HEADER.unpack_from(value)
+        if dictionary_id == NO_DICTIONARY:
+            decompressor = zlib.decompressobj()
+        else:
+            decompressor = zlib.decompressobj(zdict=self._dictionaries[dictionary_id])
+        return (decompressor.decompress(value[HEADER.size:]) + decompressor.flush()).decode('utf-8')
@@ -0,0 +1,163 @@
+"""
+Single-writer queue that groups SQLite writes into batched transactions.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# A batch is committed when it holds this many writes or this much time has
+# passed since its first write arrived
+MAX_BATCH_SIZE = 200
+MAX_BATCH_DELAY = 0.01  # seconds
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Run database writes on one thread that owns the write connection.
+
+    Callers submit functions taking a cursor and get a Future back. The
+    writer drains the queue into batches, runs each write in its own
+    savepoint (a failing write is rolled back alone) and commits the batch
+    once, so concurrent writers never contend for the database lock and
+    pay one fsync per batch instead of one per write.
+    """
+
+    def __init__(self, connect, max_batch_size=MAX_BATCH_SIZE, max_batch_delay=MAX_BATCH_DELAY):
+        """
+        Initialize write queue and start the writer thread.
+
+        Args:
+            connect: Function returning a new sqlite3 connection
+            max_batch_size: Maximum writes per transaction
+            max_batch_delay: Seconds to wait for more writes before committing
+        """
+        self._connect = connect
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.batches = 0
+        self.writes = 0
+
+        self._queue = queue.Queue()
+        self._failed = None  # set if the writer thread dies; fails all writes
+        self._failed_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, write, *args) -> Future:
+        """
+        Queue a write.
+
+        Args:
+            write: Function called as write(cursor, *args) on the writer thread
+            *args: Extra arguments for write
+
+        Returns:
+            Future resolved with write's return value once its batch is committed
+            (or with the writer's error if the writer thread has failed)
+        """
+        future = Future()
+        with self._failed_lock:
+            if self._failed is not None:
+                future.set_exception(self._failed)
+            else:
+                self._queue.put((write, args, future))
+        return future
+
+    def close(self):
+        """Commit queued writes and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _next_batch(self):
+        """Block for a write, then collect more until the batch is full or due."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_batch_delay
+        while batch[-1] is not _STOP and len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Writer thread loop."""
+        conn = None
+        batch = []
+        try:
+            # Autocommit mode: transactions are opened and committed explicitly
+            conn = self._connect()
+            conn.isolation_level = None
+            conn.execute('PRAGMA synchronous = NORMAL')
+            cursor = conn.cursor()
+
+            while True:
+                batch = self._next_batch()
+                stop = batch[-1] is _STOP
+                if stop:
+                    batch.pop()
+                if batch:
+                    self._write_batch(conn, cursor, batch)
+                if stop:
+                    break
+        except Exception as e:
+            logger.error(f"❌ Database writer stopped: {e}")
+            self._fail(e, batch)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _fail(self, error, batch):
+        """Fail the current batch, all queued writes and every later submit."""
+        with self._failed_lock:
+            self._failed = error
+            pending = list(batch)
+            while True:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+        for item in pending:
+            if item is not _STOP and not item[2].done():
+                item[2].set_exception(error)
+
+    def _write_batch(self, conn, cursor, batch):
+        """Run a batch of writes in one transaction and resolve their futures."""
+        results = []
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            for write, args, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                cursor.execute('SAVEPOINT write')
+                try:
+                    results.append((future, write(cursor, *args), None))
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO write')
+                    results.append((future, None, e))
+                cursor.execute('RELEASE write')
+            cursor.execute('COMMIT')
+        except Exception as e:
+            logger.error(f"❌ Write batch of {len(batch)} failed: {e}")
+            if conn.in_transaction:
+                conn.rollback()
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.writes += len(results)
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
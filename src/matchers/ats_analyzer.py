@@ -2,12 +2,105 @@
 ATS (Applicant Tracking System) analyzer.
 """
 
-import re
+import threading
+from collections import OrderedDict
+from matchers.skill_taxonomy import get_taxonomy
+from utils.job_hash import generate_job_hash
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+class RequirementCache:
+    """Thread-safe LRU cache of extracted job requirements, keyed by job hash."""
+    
+    def __init__(self, max_size=50000):
+        """
+        Initialize requirement cache.
+        
+        Args:
+            max_size: Maximum number of jobs kept
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, job_hash):
+        """Get cached requirements for a job, or None."""
+        with self._lock:
+            entry = self._entries.get(job_hash)
+            if entry is not None:
+                self._entries.move_to_end(job_hash)
+            return entry
+    
+    def put(self, job_hash, requirements):
+        """Store requirements for a job."""
+        with self._lock:
+            self._entries[job_hash] = requirements
+            self._entries.move_to_end(job_hash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+# Requirements depend only on the job, so all profiles share one cache
+requirement_cache = RequirementCache()
+
+
+def get_job_skill_ids(taxonomy, job_description, job_hash=None):
+    """
+    Get canonical skill ids mentioned in a job, extracting once per job hash.
+    
+    Args:
+        taxonomy: SkillTaxonomy instance
+        job_description: Job description text
+        job_hash: Job hash used as cache key (no caching if None)
+        
+    Returns:
+        Frozenset of skill ids
+    """
+    if job_hash is not None:
+        skill_ids = requirement_cache.get(job_hash)
+        if skill_ids is not None:
+            return skill_ids
+    
+    skill_ids = taxonomy.extract_ids(job_description)
+    if job_hash is not None:
+        requirement_cache.put(job_hash, skill_ids)
+    return skill_ids
+
+
+def load_stored_requirements(taxonomy, storage, jobs):
+    """
+    Seed the requirement cache with requirements stored for earlier postings.
+    
+    Jobs whose requirements are already cached are skipped; the rest are
+    looked up in one query, so stored postings are not extracted again.
+    
+    Args:
+        taxonomy: SkillTaxonomy instance
+        storage: JobStorage instance
+        jobs: List of job dictionaries (gets 'job_hash' set)
+        
+    Returns:
+        Number of jobs whose requirements were loaded
+    """
+    hashes = []
+    for job in jobs:
+        job['job_hash'] = job.get('job_hash') or generate_job_hash(job)
+        if requirement_cache.get(job['job_hash']) is None:
+            hashes.append(job['job_hash'])
+    if not hashes:
+        return 0
+    
+    stored = storage.get_required_skills(hashes)
+    for job_hash, skills in stored.items():
+        skill_ids = (taxonomy.lookup(skill) for skill in skills)
+        requirement_cache.put(
+            job_hash, frozenset(skill_id for skill_id in skill_ids if skill_id is not None)
+        )
+    return len(stored)
+
+
 class ATSAnalyzer:
     """Analyze ATS compatibility between resume and job description."""
     
@@ -21,33 +114,46 @@ class ATSAnalyzer:
         """
         self.config = config
         self.resume_parser = resume_parser
-        self.min_keyword_match = config['matching']['min_keyword_match']
+        self.min_keyword_match = config['matching'].get('min_keyword_match', 0.75)
+        self.taxonomy = get_taxonomy(config)
     
-    def analyze_compatibility(self, job_description):
+    def _get_resume_skills(self):
+        """Get canonical resume skill ids (computed once per resume)."""
+        return self.resume_parser.get_skill_ids(self.taxonomy)
+    
+    def get_requirements(self, job_description, job_hash=None):
+        """
+        Get required skills for a job, extracting them once per job hash.
+        
+        Args:
+            job_description: Job description text
+            job_hash: Job hash used as cache key (no caching if None)
+            
+        Returns:
+            Frozenset of canonical skill ids
+        """
+        return get_job_skill_ids(self.taxonomy, job_description, job_hash)
+    
+    def analyze_compatibility(self, job_description, job_hash=None):
         """
         Analyze if resume would pass ATS for this job.
         
         Args:
             job_description: Job description text
+            job_hash: Optional job hash to reuse cached requirements
             
         Returns:
             Dict with compatibility analysis
         """
-        # Extract required skills from job description
-        required_skills = self._extract_required_skills(job_description)
-        
-        # Get resume skills
-        resume_skills = set([s.lower() for s in self.resume_parser.get_skills()])
+        resume_ids = self._get_resume_skills()
+        required_ids = self.get_requirements(job_description, job_hash)
         
-        # Check matches
-        matched_skills = []
-        missing_skills = []
+        # Check matches against resume skills
+        matched_ids = resume_ids & required_ids
         
-        for skill in required_skills:
-            if skill.lower() in resume_skills:
-                matched_skills.append(skill)
-            else:
-                missing_skills.append(skill)
+        required_skills = self.taxonomy.to_names(required_ids)
+        matched_skills = self.taxonomy.to_names(matched_ids)
+        missing_skills = self.taxonomy.to_names(required_ids - matched_ids)
         
         # Calculate score
         if required_skills:
@@ -67,39 +173,33 @@ class ATSAnalyzer:
             'match_percentage': f"{score*100:.0f}%"
         }
     
-    def _extract_required_skills(self, job_description):
+    def analyze_job(self, job):
         """
-        Extract required skills from job description.
+        Analyze ATS compatibility for a job and store the results on it.
+        
+        Sets 'job_hash', 'required_skills' and 'ats_score' on the job.
+        Requirements already stored on the job (e.g. loaded from the
+        database) are reused without re-extracting.
         
         Args:
-            job_description: Job description text
+            job: Job dictionary
             
         Returns:
-            List of skills
+            Dict with compatibility analysis
         """
-        skills = set()
-        
-        # Common skill patterns
-        patterns = [
-            r'(?:required|must have|should have|experience with)[\s:]+(.*?)(?:\.|;|\n)',
-            r'(?:skills|qualifications|requirements)[\s:]+.*?([A-Za-z][A-Za-z+#/.]+)',
-            r'\b([A-Z][a-z]+(?:[A-Z][a-z]+)+)\b',  # CamelCase
-            r'\b([A-Z]{2,})\b',  # Acronyms
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, job_description, re.IGNORECASE)
-            for match in matches:
-                if isinstance(match, tuple):
-                    match = match[0]
-                # Clean and split
-                words = re.split(r'[,\s]+', match.strip())
-                for word in words:
-                    word = word.strip('.,;:')
-                    if len(word) > 2 and not word.lower() in ['and', 'or', 'the', 'with']:
-                        skills.add(word)
-        
-        return list(skills)
+        job_hash = job.get('job_hash') or generate_job_hash(job)
+        job['job_hash'] = job_hash
+        
+        if job.get('required_skills') and requirement_cache.get(job_hash) is None:
+            skill_ids = (self.taxonomy.lookup(skill) for skill in job['required_skills'])
+            requirement_cache.put(
+                job_hash, frozenset(skill_id for skill_id in skill_ids if skill_id is not None)
+            )
+        
+        analysis = self.analyze_compatibility(job.get('description') or '', job_hash)
+        job['required_skills'] = analysis['required_skills']
+        job['ats_score'] = round(analysis['score'], 3)
+        return analysis
     
     def generate_recommendations(self, analysis):
         """
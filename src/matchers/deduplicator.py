@@ -0,0 +1,359 @@
+"""
+Near-duplicate job detection across portals using MinHash/LSH.
+"""
+
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+import numpy as np
+from utils.job_hash import generate_job_hash
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+WORD_PATTERN = re.compile(r'\w+')
+LEGAL_SUFFIX_PATTERN = re.compile(
+    r'\b(?:gmbh|mbh|ag|se|kg|kgaa|ohg|ug|e\s?v|co|inc|ltd|llc|plc|corp|holding|group|germany|deutschland)\b'
+)
+
+
+def normalize_company(company):
+    """
+    Normalize a company name for comparison across portals.
+
+    Args:
+        company: Company name as scraped
+
+    Returns:
+        Lowercased name without punctuation and legal suffixes
+    """
+    text = ' '.join(WORD_PATTERN.findall((company or '').lower()))
+    text = LEGAL_SUFFIX_PATTERN.sub(' ', text)
+    return ' '.join(text.split())
+
+
+def normalize_location(location):
+    """Normalize a location for comparison across portals."""
+    return ' '.join(WORD_PATTERN.findall((location or '').lower()))
+
+
+class NearDuplicateIndex:
+    """
+    Cluster near-duplicate postings by company and description similarity.
+
+    Clusters outlive a run: with a path set, save() keeps each cluster's
+    signature and stored job hash, so a copy scraped from another portal
+    in a later run is given the hash of the posting already stored.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.5, shingle_size=3, seed=1,
+                 path=None, max_age_days=30):
+        """
+        Initialize near-duplicate index.
+
+        Args:
+            num_perm: Number of MinHash permutations
+            bands: Number of LSH bands (num_perm must be divisible by bands)
+            threshold: Minimum estimated Jaccard similarity for a duplicate
+            shingle_size: Words per shingle
+            seed: Random seed for the hash family
+            path: File used by save() and load()
+            max_age_days: Days a cluster not seen again is kept by save()
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.path = path
+        self.max_age_days = max_age_days
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._buckets = {}  # (company, band, band signature) -> cluster ids
+        self._clusters = []  # [{'signature', 'company', 'location', 'title_only', 'job_hash', 'seen_at', 'jobs'}]
+        self._touched = []  # ids of clusters with jobs added since the last remember()
+
+    def __len__(self):
+        return len(self._clusters)
+
+    def _title_only(self, job):
+        """Check whether a job's description is too short to shingle on its own."""
+        return len(WORD_PATTERN.findall((job.get('description') or '').lower())) < self.shingle_size
+
+    def _shingles(self, job):
+        """Get hashed word shingles for a job's description (or title)."""
+        words = WORD_PATTERN.findall((job.get('description') or '').lower())
+        if self._title_only(job):
+            words = WORD_PATTERN.findall(f"{job.get('title', '')} {job.get('description') or ''}".lower())
+
+        k = min(self.shingle_size, len(words)) or 1
+        shingles = {' '.join(words[i:i + k]) for i in range(max(len(words) - k + 1, 1))}
+        return np.fromiter(
+            (zlib.crc32(s.encode()) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+
+    def signature(self, job):
+        """
+        Compute MinHash signature for a job.
+
+        Args:
+            job: Job dictionary
+
+        Returns:
+            Numpy array of num_perm hash minimums
+        """
+        hashes = self._shingles(job)
+        permuted = (np.outer(hashes, self._a) % MERSENNE_PRIME + self._b) % MERSENNE_PRIME
+        return (permuted & MAX_HASH).min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, company, signature):
+        """Get the LSH bucket keys of a signature."""
+        return [
+            (company, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, cluster):
+        """Append a cluster and register its band keys."""
+        cluster_id = len(self._clusters)
+        self._clusters.append(cluster)
+        for key in self._band_keys(cluster['company'], cluster['signature']):
+            self._buckets.setdefault(key, []).append(cluster_id)
+        return cluster_id
+
+    def add(self, job):
+        """
+        Add a job to the index.
+
+        Args:
+            job: Job dictionary
+
+        Returns:
+            Cluster id the job was assigned to
+        """
+        company = normalize_company(job.get('company'))
+        location = normalize_location(job.get('location'))
+        title_only = self._title_only(job)
+        signature = self.signature(job)
+
+        # Candidates share at least one band; verify the estimated similarity
+        band_keys = self._band_keys(company, signature)
+        candidates = {cid for key in band_keys for cid in self._buckets.get(key, ())}
+        for cluster_id in sorted(candidates):
+            cluster = self._clusters[cluster_id]
+            # Equal titles alone do not make a duplicate: the location must agree too
+            if (title_only or cluster['title_only']) and (not location or location != cluster['location']):
+                continue
+            similarity = float(np.mean(cluster['signature'] == signature))
+            if similarity >= self.threshold:
+                if not cluster['jobs']:
+                    self._touched.append(cluster_id)
+                cluster['jobs'].append(job)
+                return cluster_id
+
+        cluster_id = self._insert({
+            'signature': signature,
+            'company': company,
+            'location': location,
+            'title_only': title_only,
+            'job_hash': None,
+            'seen_at': time.time(),
+            'jobs': [job]
+        })
+        self._touched.append(cluster_id)
+        return cluster_id
+
+    def representatives(self):
+        """
+        Get one job per cluster that jobs were added to since the last remember().
+
+        The job with the longest description represents its cluster; the
+        other copies are kept as 'alternate_urls' ({source, url} dicts).
+        A cluster already stored keeps its job hash, so the representative
+        is saved as that posting.
+
+        Returns:
+            List of representative job dictionaries
+        """
+        result = []
+        for cluster_id in self._touched:
+            cluster = self._clusters[cluster_id]
+            jobs = cluster['jobs']
+            representative = max(jobs, key=lambda j: len(j.get('description') or ''))
+            representative['alternate_urls'] = [
+                {'source': j['source'], 'url': j['url']}
+                for j in jobs
+                if j is not representative and j['url'] != representative['url']
+            ]
+            if cluster['job_hash']:
+                representative['job_hash'] = cluster['job_hash']
+            result.append(representative)
+        return result
+
+    def remember(self):
+        """
+        Record the job hash of each cluster added to and drop the added jobs.
+
+        Call after representatives(); later adds then match these clusters
+        as stored postings.
+        """
+        now = time.time()
+        for cluster_id in self._touched:
+            cluster = self._clusters[cluster_id]
+            if not cluster['job_hash']:
+                representative = max(cluster['jobs'], key=lambda j: len(j.get('description') or ''))
+                cluster['job_hash'] = representative.get('job_hash') or generate_job_hash(representative)
+            cluster['seen_at'] = now
+            cluster['jobs'] = []
+        self._touched = []
+
+    def prune(self):
+        """
+        Drop clusters not seen for max_age_days (call after remember()).
+
+        Returns:
+            Number of clusters dropped
+        """
+        cutoff = time.time() - self.max_age_days * 86400
+        kept = [cluster for cluster in self._clusters if cluster['seen_at'] >= cutoff]
+        dropped = len(self._clusters) - len(kept)
+        if dropped:
+            self._clusters = []
+            self._buckets = {}
+            for cluster in kept:
+                self._insert(cluster)
+        return dropped
+
+    def save(self, path=None):
+        """
+        Persist the remembered clusters (signatures, keys and job hashes).
+
+        Args:
+            path: Target .npz file path (default: self.path)
+        """
+        clusters = [cluster for cluster in self._clusters if cluster['job_hash']]
+        signatures = np.array([cluster['signature'] for cluster in clusters], dtype=np.uint32) \
+            if clusters else np.empty((0, self.num_perm), dtype=np.uint32)
+
+        path = Path(path or self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                signatures=signatures,
+                companies=np.array([cluster['company'] for cluster in clusters], dtype=str),
+                locations=np.array([cluster['location'] for cluster in clusters], dtype=str),
+                title_only=np.array([cluster['title_only'] for cluster in clusters], dtype=bool),
+                job_hashes=np.array([cluster['job_hash'] for cluster in clusters], dtype=str),
+                seen_at=np.array([cluster['seen_at'] for cluster in clusters], dtype=np.float64)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """
+        Load clusters saved with save().
+
+        Clusters signed with a different num_perm cannot be compared and
+        are dropped.
+
+        Args:
+            path: Saved .npz file path
+            **kwargs: NearDuplicateIndex constructor arguments
+
+        Returns:
+            NearDuplicateIndex instance
+        """
+        index = cls(path=path, **kwargs)
+        with np.load(path) as data:
+            if data['signatures'].shape[1] != index.num_perm:
+                logger.warning(f"⚠️ Ignoring near-duplicate index {path}: built with a different num_perm")
+                return index
+            for signature, company, location, title_only, job_hash, seen_at in zip(
+                    data['signatures'], data['companies'].tolist(), data['locations'].tolist(),
+                    data['title_only'].tolist(), data['job_hashes'].tolist(), data['seen_at'].tolist()):
+                index._insert({
+                    'signature': signature,
+                    'company': company,
+                    'location': location,
+                    'title_only': title_only,
+                    'job_hash': job_hash,
+                    'seen_at': seen_at,
+                    'jobs': []
+                })
+        return index
+
+
+# Persistent indexes shared by all profiles' runs, keyed by path
+_indexes = {}
+_index_lock = threading.Lock()
+
+
+def _get_index(options):
+    """Get the persistent index for the options, loading it on first use."""
+    path = options.get('path', 'data/index/near_duplicates.npz')
+    if path not in _indexes:
+        kwargs = {
+            'num_perm': options.get('num_perm', 64),
+            'bands': options.get('bands', 16),
+            'threshold': options.get('threshold', 0.5),
+            'max_age_days': options.get('max_age_days', 30)
+        }
+        if Path(path).exists():
+            _indexes[path] = NearDuplicateIndex.load(path, **kwargs)
+        else:
+            _indexes[path] = NearDuplicateIndex(path=path, **kwargs)
+    return _indexes[path]
+
+
+def deduplicate_jobs(jobs, config=None):
+    """
+    Collapse near-duplicate postings so each cluster is matched once.
+
+    Copies of a posting stored by an earlier run (of any profile) are
+    given that posting's job hash, so they are saved as the same posting.
+
+    Args:
+        jobs: List of scraped job dictionaries
+        config: Application configuration (uses 'scraping.near_duplicates')
+
+    Returns:
+        List of representative jobs
+    """
+    options = ((config or {}).get('scraping') or {}).get('near_duplicates') or {}
+    if not options.get('enabled', True):
+        return jobs
+
+    with _index_lock:
+        index = _get_index(options)
+        for job in jobs:
+            index.add(job)
+
+        unique_jobs = index.representatives()
+        index.remember()
+        index.prune()
+        try:
+            index.save()
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save near-duplicate index (not critical): {e}")
+
+    if len(unique_jobs) < len(jobs):
+        logger.info(f"🔁 Collapsed {len(jobs) - len(unique_jobs)} near-duplicate postings "
+                   f"({len(jobs)} → {len(unique_jobs)})")
+    return unique_jobs
@@ -0,0 +1,429 @@
+"""
+Asynchronous Google Gemini access with bounded concurrency and rate limits.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import google.generativeai as genai
+import numpy as np
+from google.ai import generativelanguage as glm
+from google.api_core import exceptions as api_exceptions
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Errors worth retrying (rate limits and transient server failures)
+RETRYABLE_ERRORS = (
+    api_exceptions.ResourceExhausted,
+    api_exceptions.TooManyRequests,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.DeadlineExceeded,
+    asyncio.TimeoutError,
+)
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class RateLimiter:
+    """Thread-safe token buckets for requests and tokens per minute."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        """
+        Initialize rate limiter.
+
+        Args:
+            requests_per_minute: Request budget per minute
+            tokens_per_minute: Token budget per minute
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Refill both buckets for the time elapsed."""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def reserve(self, tokens):
+        """
+        Take budget for one request if available.
+
+        Args:
+            tokens: Estimated tokens of the request
+
+        Returns:
+            0 if the request was admitted, else seconds to wait before retrying
+        """
+        # A single request larger than the bucket is admitted when it is full
+        tokens = min(tokens, self.tokens_per_minute)
+        with self._lock:
+            self._refill()
+            if self._requests >= 1 and self._tokens >= tokens:
+                self._requests -= 1
+                self._tokens -= tokens
+                return 0.0
+            request_wait = (1 - self._requests) * 60 / self.requests_per_minute
+            token_wait = (tokens - self._tokens) * 60 / self.tokens_per_minute
+            return max(request_wait, token_wait, 0.01)
+
+    def headroom(self):
+        """Get the fraction of the request budget currently available."""
+        with self._lock:
+            self._refill()
+            return self._requests / self.requests_per_minute
+
+    async def acquire(self, tokens):
+        """Wait until budget for one request is available."""
+        while True:
+            wait = self.reserve(tokens)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class GeminiKeyPool:
+    """
+    Gemini API keys with a service client and quota tracker per key.
+    
+    Requests are routed to whichever key has budget left, so no global
+    genai.configure() state is shared between concurrent runs. Keys added
+    with an owner (a profile id) are only used for, and only reported to,
+    that owner; for_owner() gives the view a run should draw from.
+    """
+
+    def __init__(self, requests_per_minute=1500, tokens_per_minute=1000000, cooldown=60):
+        """
+        Initialize key pool.
+
+        Args:
+            requests_per_minute: Request budget per key
+            tokens_per_minute: Token budget per key
+            cooldown: Seconds a key is skipped after a rate-limit error
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.cooldown = cooldown
+        self._keys = {}  # api key -> state dict
+        self._lock = threading.Lock()
+
+    def add_key(self, api_key, owner=None):
+        """
+        Add a key to the pool.
+
+        Args:
+            api_key: Gemini API key (ignored if empty)
+            owner: Profile id the key belongs to (None = shared by all runs)
+        """
+        if not api_key:
+            return
+        with self._lock:
+            if api_key not in self._keys:
+                self._keys[api_key] = {
+                    'client': glm.GenerativeServiceClient(client_options={'api_key': api_key}),
+                    'limiter': RateLimiter(self.requests_per_minute, self.tokens_per_minute),
+                    'cooldown_until': 0.0,
+                    'requests': 0,
+                    'rate_limited': 0,
+                    'shared': False,
+                    'owners': set()
+                }
+            if owner is None:
+                self._keys[api_key]['shared'] = True
+            else:
+                self._keys[api_key]['owners'].add(owner)
+
+    def remove_owner(self, owner):
+        """Forget an owner's keys (e.g. after its profile changed its key or was deleted)."""
+        with self._lock:
+            for api_key, state in list(self._keys.items()):
+                state['owners'].discard(owner)
+                if not state['shared'] and not state['owners']:
+                    del self._keys[api_key]
+
+    def for_owner(self, owner):
+        """Get a view of the shared keys plus the owner's own keys."""
+        return OwnerKeys(self, owner)
+
+    def _usable(self, owner):
+        """Get (api key, state) pairs usable for an owner (None = shared keys only)."""
+        with self._lock:
+            return [
+                (key, state) for key, state in self._keys.items()
+                if state['shared'] or owner in state['owners']
+            ]
+
+    def __len__(self):
+        return len(self._usable(None))
+
+    def _try_reserve(self, tokens, owner=None):
+        """
+        Reserve budget on the usable key with the most headroom.
+
+        Returns:
+            Tuple of (api key, client, 0) on success, or (None, None, seconds to wait)
+        """
+        now = time.monotonic()
+        states = self._usable(owner)
+
+        waits = []
+        ready = [(key, state) for key, state in states if state['cooldown_until'] <= now]
+        ready.sort(key=lambda item: item[1]['limiter'].headroom(), reverse=True)
+        for key, state in ready:
+            wait = state['limiter'].reserve(tokens)
+            if wait == 0:
+                state['requests'] += 1
+                return key, state['client'], 0.0
+            waits.append(wait)
+
+        waits.extend(state['cooldown_until'] - now for _, state in states if state['cooldown_until'] > now)
+        return None, None, max(min(waits, default=1.0), 0.01)
+
+    async def acquire(self, tokens, owner=None):
+        """
+        Wait for a key with budget for one request.
+
+        Args:
+            tokens: Estimated tokens of the request
+            owner: Profile id whose own keys may be used besides the shared ones
+
+        Returns:
+            Tuple of (api key, service client)
+        """
+        if not self._usable(owner):
+            raise ValueError("No Gemini API keys configured")
+        while True:
+            key, client, wait = self._try_reserve(tokens, owner)
+            if key is not None:
+                return key, client
+            await asyncio.sleep(wait)
+
+    def report_rate_limited(self, api_key):
+        """Take a key out of rotation for the cooldown period after a 429."""
+        with self._lock:
+            state = self._keys.get(api_key)
+            if state:
+                state['cooldown_until'] = time.monotonic() + self.cooldown
+                state['rate_limited'] += 1
+
+    def stats(self, owner=None):
+        """Get quota status of the keys usable for an owner (keys masked)."""
+        now = time.monotonic()
+        states = self._usable(owner)
+        return [
+            {
+                'key': f"...{key[-4:]}",
+                'headroom': round(state['limiter'].headroom(), 3),
+                'cooling_down': state['cooldown_until'] > now,
+                'requests': state['requests'],
+                'rate_limited': state['rate_limited']
+            }
+            for key, state in states
+        ]
+
+
+class OwnerKeys:
+    """The keys of a GeminiKeyPool one profile's runs may use."""
+
+    def __init__(self, pool, owner):
+        """
+        Initialize owner view.
+
+        Args:
+            pool: GeminiKeyPool holding the keys and their budgets
+            owner: Profile id
+        """
+        self.pool = pool
+        self.owner = owner
+
+    def __len__(self):
+        return len(self.pool._usable(self.owner))
+
+    async def acquire(self, tokens):
+        """Wait for a shared or own key with budget for one request."""
+        return await self.pool.acquire(tokens, self.owner)
+
+    def report_rate_limited(self, api_key):
+        """Take a key out of rotation for the cooldown period after a 429."""
+        self.pool.report_rate_limited(api_key)
+
+    def stats(self):
+        """Get quota status of the shared and own keys (keys masked)."""
+        return self.pool.stats(self.owner)
+
+
+# Process-wide pool so every run shares the per-key budgets
+_key_pool = None
+_key_pool_lock = threading.Lock()
+
+
+def get_key_pool(config):
+    """
+    Get the process-wide key pool, seeded from GEMINI_API_KEY/GEMINI_API_KEYS.
+
+    Args:
+        config: Application configuration (uses 'matching.gemini')
+
+    Returns:
+        GeminiKeyPool instance
+    """
+    global _key_pool
+    with _key_pool_lock:
+        if _key_pool is None:
+            options = config['matching'].get('gemini') or {}
+            _key_pool = GeminiKeyPool(
+                requests_per_minute=options.get('requests_per_minute', 1500),
+                tokens_per_minute=options.get('tokens_per_minute', 1000000),
+                cooldown=options.get('rate_limit_cooldown', 60)
+            )
+            _key_pool.add_key(os.getenv('GEMINI_API_KEY'))
+            for key in os.getenv('GEMINI_API_KEYS', '').split(','):
+                _key_pool.add_key(key.strip())
+        return _key_pool
+
+
+class GeminiClient:
+    """Gemini embedding and generation calls with concurrency, quota and retries."""
+
+    def __init__(self, config, key_pool):
+        """
+        Initialize Gemini client.
+
+        Args:
+            config: Application configuration (uses 'matching.gemini')
+            key_pool: GeminiKeyPool (or OwnerKeys view) to route requests through
+        """
+        options = config['matching'].get('gemini') or {}
+        self.max_concurrency = options.get('max_concurrency', 8)
+        self.embed_batch_size = options.get('embed_batch_size', 32)
+        self.max_retries = options.get('max_retries', 5)
+        self.request_timeout = options.get('request_timeout', 60)
+        self.backoff_base = options.get('backoff_base', 1.0)
+        self.backoff_max = options.get('backoff_max', 60.0)
+        self.key_pool = key_pool
+
+    async def _call(self, semaphore, tokens, func, *args, **kwargs):
+        """
+        Run a blocking API call with concurrency bound, quota, deadline and retries.
+
+        func receives the chosen key's service client as its first argument.
+
+        Raises:
+            The last error once retries are exhausted or for non-retryable errors
+        """
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                api_key, client = await self.key_pool.acquire(tokens)
+                try:
+                    return await asyncio.wait_for(
+                        asyncio.to_thread(func, client, *args, **kwargs),
+                        timeout=self.request_timeout
+                    )
+                except RETRYABLE_ERRORS as e:
+                    if isinstance(e, api_exceptions.TooManyRequests):
+                        self.key_pool.report_rate_limited(api_key)
+                    if attempt == self.max_retries:
+                        raise
+                    error = e
+
+            # Exponential backoff with full jitter, outside the semaphore
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            logger.debug(f"Gemini call retry {attempt + 1}/{self.max_retries} in {delay:.1f}s: {error}")
+            await asyncio.sleep(delay)
+
+    def _embed_batch(self, client, model, texts, task_type):
+        """Embed a batch of texts in one request (blocking)."""
+        result = genai.embed_content(model=model, content=texts, task_type=task_type, client=client)
+        return [np.array(embedding) for embedding in result['embedding']]
+
+    async def _embed_all(self, model, texts, task_type):
+        """Embed texts in concurrent batches; failed batches yield None entries."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = [
+            texts[start:start + self.embed_batch_size]
+            for start in range(0, len(texts), self.embed_batch_size)
+        ]
+        results = await asyncio.gather(*[
+            self._call(semaphore, sum(estimate_tokens(t) for t in batch),
+                       self._embed_batch, model, batch, task_type)
+            for batch in batches
+        ], return_exceptions=True)
+
+        embeddings = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Embedding batch of {len(batch)} failed: {result}")
+                embeddings.extend([None] * len(batch))
+            else:
+                embeddings.extend(result)
+        return embeddings
+
+    def embed_many(self, model, texts, task_type="retrieval_document"):
+        """
+        Embed many texts, saturating the configured quota.
+
+        Args:
+            model: Embedding model name
+            texts: List of texts
+            task_type: Gemini embedding task type
+
+        Returns:
+            List of numpy arrays (None where embedding failed after retries)
+        """
+        if not texts:
+            return []
+        return asyncio.run(self._embed_all(model, list(texts), task_type))
+
+    def _generate(self, client, model_name, prompt, generation_config):
+        """Run one generate call on the given key's client (blocking)."""
+        model = genai.GenerativeModel(model_name)
+        # GenerativeModel has no client argument; bind the per-key client directly
+        model._client = client
+        return model.generate_content(prompt, generation_config=generation_config)
+
+    async def _generate_all(self, model_name, prompts, generation_config):
+        """Run generate calls concurrently; failures yield None entries."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        max_output = generation_config.max_output_tokens if generation_config else 0
+        results = await asyncio.gather(*[
+            self._call(semaphore, estimate_tokens(prompt) + (max_output or 0),
+                       self._generate, model_name, prompt, generation_config)
+            for prompt in prompts
+        ], return_exceptions=True)
+
+        texts = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"Gemini generation failed: {result}")
+                texts.append(None)
+            else:
+                texts.append(result.text)
+        return texts
+
+    def generate_many(self, model_name, prompts, generation_config=None):
+        """
+        Run several generate calls concurrently.
+
+        Args:
+            model_name: Chat model name
+            prompts: List of prompts
+            generation_config: Optional genai GenerationConfig
+
+        Returns:
+            List of response texts (None where generation failed after retries)
+        """
+        if not prompts:
+            return []
+        return asyncio.run(self._generate_all(model_name, list(prompts), generation_config))
@@ -2,123 +2,205 @@
 AI-powered job matcher using Google Gemini AI (FREE).
 """
 
-import os
+import hashlib
+import json
 import google.generativeai as genai
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from datetime import datetime, timedelta
+from matchers.ats_analyzer import get_job_skill_ids
+from matchers.skill_taxonomy import get_taxonomy
+from matchers.gemini_client import GeminiClient, get_key_pool
+from utils.job_hash import generate_job_hash
+from utils.posting_parser import parse_posting_fields, filter_reason
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Fixed boost for urgent positions (on top of the configured weights)
+URGENCY_WEIGHT = 0.1
+
+# Weight factors read from config['matching']['weights'] (see combine_scores)
+WEIGHT_NAMES = ('description_match', 'skills', 'experience', 'education')
+
+# Resume vectors scored per job: full text plus the weighted sections
+RESUME_SECTIONS = ('full', 'skills', 'experience', 'education')
+
 
 class JobMatcher:
     """Match jobs with resume using FREE Google Gemini AI."""
     
-    def __init__(self, config, resume_parser):
+    def __init__(self, config, resume_parser, embedding_store=None, key_pool=None,
+                 analysis_cache=None):
         """
         Initialize job matcher.
         
         Args:
             config: Application configuration
             resume_parser: ResumeParser instance
+            embedding_store: Optional EmbeddingStore to reuse and persist embeddings
+            key_pool: Optional GeminiKeyPool or OwnerKeys view (default: process-wide pool from env)
+            analysis_cache: Optional store for LLM analyses (e.g. DatabaseManager)
         """
         self.config = config
         self.resume_parser = resume_parser
+        self.embedding_store = embedding_store
+        self.analysis_cache = analysis_cache
         
         # Initialize Google Gemini (FREE)
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
+        key_pool = key_pool if key_pool is not None else get_key_pool(config)
+        if not len(key_pool):
             raise ValueError("GEMINI_API_KEY not found in environment variables. Get it free from https://makersuite.google.com/app/apikey")
         
-        genai.configure(api_key=api_key)
+        self.gemini = GeminiClient(config, key_pool)
         self.embedding_model = config['matching']['gemini_embedding_model']
         self.use_advanced = config['matching'].get('use_gemini_pro', True)
         self.chat_model = config['matching'].get('gemini_chat_model', 'gemini-1.5-pro')
         self.threshold = config['matching']['threshold']
+        self.taxonomy = get_taxonomy(config)
         
-        # Cache resume embedding
+        # Cache resume embeddings (full text and one per section)
         self.resume_embedding = None
+        self.resume_section_embeddings = None
+    
+    def _get_embeddings(self, texts, cache_keys):
+        """
+        Get embeddings for several texts, reusing stored ones.
+        
+        Missing embeddings are requested concurrently in batches and
+        written back to the embedding store.
+        
+        Args:
+            texts: Texts to embed
+            cache_keys: Embedding store keys (e.g. 'job:<hash>'), one per text
+            
+        Returns:
+            List of numpy arrays (None where embedding failed)
+        """
+        embeddings = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(cache_keys):
+            if self.embedding_store is not None and key in self.embedding_store:
+                embeddings[i] = self.embedding_store.get(key)
+            else:
+                missing.append(i)
+        
+        if missing:
+            fresh = self.gemini.embed_many(self.embedding_model, [texts[i] for i in missing])
+            if self.embedding_store is not None:
+                self.embedding_store.add_many(
+                    (cache_keys[i], embedding) for i, embedding in zip(missing, fresh)
+                )
+            for i, embedding in zip(missing, fresh):
+                # Read back from the store so every vector has its (possibly reduced) dimension
+                if embedding is not None and self.embedding_store is not None:
+                    embedding = self.embedding_store.get(cache_keys[i])
+                embeddings[i] = embedding
+        
+        return embeddings
     
-    def _get_embedding(self, text):
+    def _get_embedding(self, text, cache_key):
         """
         Get embedding for text using Google Gemini (FREE).
         
         Args:
             text: Text to embed
+            cache_key: Embedding store key (e.g. 'resume:<hash>')
             
         Returns:
-            Numpy array of embedding
+            Numpy array of embedding, or None if it failed after retries
         """
-        try:
-            result = genai.embed_content(
-                model=self.embedding_model,
-                content=text,
-                task_type="retrieval_document"
-            )
-            return np.array(result['embedding'])
-        except Exception as e:
-            logger.error(f"Error getting embedding: {e}")
-            return None
+        return self._get_embeddings([text], [cache_key])[0]
     
-    def _get_resume_embedding(self):
-        """Get or cache resume embedding."""
-        if self.resume_embedding is None:
+    def _get_resume_section_texts(self):
+        """Get resume text per section in RESUME_SECTIONS order (None if empty)."""
+        data = self.resume_parser.parsed_data
+        return [
+            self.resume_parser.get_resume_text(),
+            ', '.join(data.get('skills', [])) or None,
+            '\n'.join(data.get('experience', [])) or None,
+            '\n'.join(data.get('education', [])) or None
+        ]
+    
+    def _get_resume_section_embeddings(self):
+        """
+        Get or cache normalized resume vectors, one row per RESUME_SECTIONS entry.
+        
+        Sections are embedded together once per resume; a missing section
+        reuses the full-text vector.
+        """
+        if self.resume_section_embeddings is None:
             resume_text = self.resume_parser.get_resume_text()
             if not resume_text:
                 raise ValueError("Resume not parsed yet")
             
-            logger.info("🧠 Generating resume embedding...")
-            self.resume_embedding = self._get_embedding(resume_text)
+            logger.info("🧠 Generating resume embeddings...")
+            resume_hash = self._get_resume_hash()
+            texts = self._get_resume_section_texts()
+            present = [i for i, text in enumerate(texts) if text]
+            embeddings = self._get_embeddings(
+                [texts[i] for i in present],
+                [f"resume:{resume_hash}" + (f":{RESUME_SECTIONS[i]}" if i else "") for i in present]
+            )
+            
+            vectors = dict(zip(present, embeddings))
+            if vectors.get(0) is None:
+                raise RuntimeError("Could not embed resume (Gemini unavailable or out of quota)")
+            
+            matrix = np.stack([
+                np.asarray(vectors.get(i) if vectors.get(i) is not None else vectors[0], dtype=np.float32)
+                for i in range(len(RESUME_SECTIONS))
+            ])
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self.resume_embedding = vectors[0]
+            self.resume_section_embeddings = matrix / np.where(norms == 0, 1, norms)
         
+        return self.resume_section_embeddings
+    
+    def _get_resume_embedding(self):
+        """Get or cache the full-text resume embedding."""
+        self._get_resume_section_embeddings()
         return self.resume_embedding
     
-    def _calculate_similarity(self, job_description):
+    def _calculate_similarities(self, job_embeddings):
         """
-        Calculate similarity between resume and job description.
+        Calculate cosine similarity between every job and every resume section.
         
         Args:
-            job_description: Job description text
+            job_embeddings: Matrix with one job embedding per row
             
         Returns:
-            Similarity score (0-1)
+            Matrix of similarity scores, one column per RESUME_SECTIONS entry
         """
-        resume_emb = self._get_resume_embedding()
-        if resume_emb is None:
-            return 0.0
-        
-        job_emb = self._get_embedding(job_description)
-        if job_emb is None:
-            return 0.0
+        sections = self._get_resume_section_embeddings()
         
-        # Calculate cosine similarity
-        similarity = cosine_similarity(
-            resume_emb.reshape(1, -1),
-            job_emb.reshape(1, -1)
-        )[0][0]
-        
-        return float(similarity)
+        job_embs = np.asarray(job_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(job_embs, axis=1, keepdims=True)
+        return (job_embs / np.where(norms == 0, 1, norms)) @ sections.T
+    
+    def _get_resume_hash(self):
+        """Get resume content hash (used as a cache key)."""
+        content_hash = getattr(self.resume_parser, 'content_hash', None)
+        return content_hash or hashlib.sha256(self.resume_parser.get_resume_text().encode()).hexdigest()
     
-    def _analyze_with_gemini(self, job_description, resume_text):
+    def _analyze_with_gemini(self, jobs, resume_text):
         """
-        Use Gemini Pro to deeply analyze job fit (FREE, optional for critical matches).
+        Use Gemini Pro to deeply analyze job fit for a batch of jobs (FREE).
         
         Args:
-            job_description: Job description
+            jobs: Job dictionaries to analyze in one request
             resume_text: Resume text
             
         Returns:
-            Analysis score and insights
+            Dict of job hash -> {'score', 'urgency', 'reason'} (parsed jobs only)
         """
-        if not self.use_advanced:
-            return None
-        
-        try:
-            prompt = f"""Analyze this job match for urgency and fit. Rate 0-100.
+        job_sections = "\n\n".join(
+            f"Job {i}: {job['title']} at {job['company']}\n{job['description'][:1000]}"
+            for i, job in enumerate(jobs, 1)
+        )
+        prompt = f"""Analyze these job matches for urgency and fit. Rate each 0-100.
             
 Resume Summary: {resume_text[:1000]}
 
-Job Description: {job_description[:1000]}
+{job_sections}
 
 Consider:
 1. Skills match
@@ -127,45 +209,116 @@ Consider:
 4. Visa sponsorship mentions
 5. Remote work options
 
-Return JSON: {{"score": 0-100, "urgency": "low/medium/high", "reason": "brief explanation"}}"""
-            
-            model = genai.GenerativeModel(self.chat_model)
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.3,
-                    max_output_tokens=200
-                )
+Return only a JSON array with one object per job, in order:
+[{{"job": 1, "score": 0-100, "urgency": "low/medium/high", "reason": "brief explanation"}}]"""
+        
+        response = self.gemini.generate_many(
+            self.chat_model,
+            [prompt],
+            generation_config=genai.types.GenerationConfig(
+                temperature=0.3,
+                max_output_tokens=200 * len(jobs)
             )
-            
-            return response.text
-        except Exception as e:
-            logger.debug(f"Gemini analysis skipped: {e}")
-            return None
+        )[0]
+        if not response:
+            return {}
+        
+        try:
+            text = response.strip().removeprefix('```json').removeprefix('```').removesuffix('```')
+            items = json.loads(text)
+        except ValueError as e:
+            logger.debug(f"Gemini analysis not parseable: {e}")
+            return {}
+        
+        analyses = {}
+        for item in items if isinstance(items, list) else []:
+            try:
+                job = jobs[int(item['job']) - 1]
+                analyses[job['job_hash']] = {
+                    'score': min(100.0, max(0.0, float(item['score']))),
+                    'urgency': str(item.get('urgency', '')),
+                    'reason': str(item.get('reason', ''))
+                }
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue
+        return analyses
+    
+    def _deep_rerank(self, jobs):
+        """
+        Re-rank the top-K jobs with Gemini Pro analysis.
+        
+        Analyses are cached per (job hash, resume hash, model), so a pair
+        is never sent to the LLM twice.
+        
+        Args:
+            jobs: Scored jobs sorted by match score (re-sorted in place)
+        """
+        options = self.config['matching'].get('deep_analysis') or {}
+        top_k = options.get('top_k', 10)
+        batch_size = options.get('batch_size', 5)
+        weight = options.get('weight', 0.3)
+        if not self.use_advanced or top_k <= 0 or not jobs:
+            return
+        
+        candidates = jobs[:top_k]
+        resume_hash = self._get_resume_hash()
+        hashes = [job['job_hash'] for job in candidates]
+        analyses = (
+            self.analysis_cache.get_llm_analyses(resume_hash, self.chat_model, hashes)
+            if self.analysis_cache is not None else {}
+        )
+        
+        pending = [job for job in candidates if job['job_hash'] not in analyses]
+        if pending:
+            logger.info(f"  🤖 Deep analysis of {len(pending)} top job(s) "
+                       f"({len(candidates) - len(pending)} cached)")
+        for start in range(0, len(pending), batch_size):
+            fresh = self._analyze_with_gemini(
+                pending[start:start + batch_size], self.resume_parser.get_resume_text()
+            )
+            analyses.update(fresh)
+            if fresh and self.analysis_cache is not None:
+                self.analysis_cache.save_llm_analyses(resume_hash, self.chat_model, fresh)
+        
+        for job in candidates:
+            analysis = analyses.get(job['job_hash'])
+            if analysis:
+                job['llm_score'] = analysis['score']
+                job['llm_urgency'] = analysis['urgency']
+                job['llm_reason'] = analysis['reason']
+                job['match_score'] = round(float(self.blend_llm_score(
+                    job['match_score'], analysis['score'], weight
+                )), 3)
+        
+        # Blended scores can fall below jobs outside the top-K, so sort them all
+        jobs.sort(key=lambda x: x['match_score'], reverse=True)
     
-    def _calculate_keyword_match(self, job_description):
+    def _calculate_keyword_match(self, job_description, job_hash=None):
         """
         Calculate keyword match score for ATS compatibility.
         
+        Resume and job are compared as canonical skill id sets, so
+        synonyms ("k8s", "Kubernetes") match each other. Resume skills
+        unknown to the taxonomy are looked up in the description too.
+        
         Args:
             job_description: Job description text
+            job_hash: Optional job hash to reuse cached skill ids
             
         Returns:
             Tuple of (score, matched_keywords)
         """
-        resume_keywords = set(self.resume_parser.get_all_keywords())
-        job_text_lower = job_description.lower()
-        
-        matched = []
-        for keyword in resume_keywords:
-            if keyword in job_text_lower:
-                matched.append(keyword)
-        
-        if not resume_keywords:
+        resume_ids = self.resume_parser.get_skill_ids(self.taxonomy)
+        extra_skills = self.resume_parser.get_extra_skills(self.taxonomy)
+        total = len(resume_ids) + len(extra_skills)
+        if not total:
             return 0.0, []
         
-        score = len(matched) / len(resume_keywords)
-        return score, matched
+        matched = resume_ids & get_job_skill_ids(self.taxonomy, job_description, job_hash)
+        extra_matched = extra_skills.extract_ids(job_description) if len(extra_skills) else frozenset()
+        score = (len(matched) + len(extra_matched)) / total
+        names = self.taxonomy.to_names(matched) + extra_skills.to_names(extra_matched)
+        return score, sorted(names, key=str.lower)
     
     def match_jobs(self, jobs):
         """
@@ -179,51 +332,73 @@ Return JSON: {{"score": 0-100, "urgency": "low/medium/high", "reason": "brief ex
             List of matched jobs with scores (TOP 10 only)
         """
         matched_jobs = []
-        max_age_days = self.config['search'].get('max_job_age_days', 14)
-        cutoff_date = datetime.now() - timedelta(days=max_age_days)
+        search_config = dict(self.config['search'])
+        search_config.setdefault('max_job_age_days', 14)
+        
+        # Filter out jobs that cannot or should not be scored (before embedding)
+        candidates = []
+        for job in jobs:
+            description = job.get('description', '')
+            if not description:
+                logger.warning(f"  ⚠️  No description for {job['title']}, skipping")
+                continue
+            
+            # Salary and age filters (fields are normally parsed at scrape time)
+            if 'salary_max' not in job:
+                parse_posting_fields(job)
+            reason = filter_reason(job, search_config)
+            if reason:
+                logger.debug(f"  ✗ Filtered by {reason}: {job['title']}")
+                continue
+            
+            job['job_hash'] = job.get('job_hash') or generate_job_hash(job)
+            candidates.append(job)
+        
+        if not candidates:
+            return []
         
-        for i, job in enumerate(jobs):
+        # Embed all jobs up front (stored embeddings are shared across profiles)
+        logger.info(f"  🧠 Embedding {len(candidates)} jobs...")
+        embeddings = self._get_embeddings(
+            [job['description'] for job in candidates],
+            [f"job:{job['job_hash']}" for job in candidates]
+        )
+        
+        failed = sum(1 for embedding in embeddings if embedding is None)
+        if failed:
+            logger.warning(f"  ⚠️  {failed} job(s) could not be embedded and were not scored")
+        
+        embedded = [(job, emb) for job, emb in zip(candidates, embeddings) if emb is not None]
+        if not embedded:
+            return []
+        
+        # One matrix product scores every job against every resume section
+        similarities = self._calculate_similarities(np.stack([emb for _, emb in embedded]))
+        
+        for i, ((job, _), section_scores) in enumerate(zip(embedded, similarities)):
             try:
-                logger.info(f"  Matching {i+1}/{len(jobs)}: {job['title']} at {job['company']}")
-                
-                # Get job description
-                description = job.get('description', '')
-                if not description:
-                    logger.warning(f"  ⚠️  No description for {job['title']}, skipping")
-                    continue
-                
-                # Check job age (if posted_date available)
-                if job.get('posted_date'):
-                    try:
-                        posted = datetime.fromisoformat(job['posted_date'])
-                        if posted < cutoff_date:
-                            logger.debug(f"  ✗ Job too old: {job['posted_date']}")
-                            continue
-                    except:
-                        pass
-                
-                # Calculate AI similarity
-                ai_score = self._calculate_similarity(description)
+                logger.info(f"  Matching {i+1}/{len(embedded)}: {job['title']} at {job['company']}")
+                description = job['description']
+                ai_score, skills_score, experience_score, education_score = map(float, section_scores)
                 
                 # Calculate keyword match
-                keyword_score, matched_keywords = self._calculate_keyword_match(description)
+                keyword_score, matched_keywords = self._calculate_keyword_match(description, job['job_hash'])
                 
                 # Check for urgency indicators
                 urgency_boost = self._calculate_urgency_score(description)
                 
                 # Weighted score with urgency boost
-                weights = self.config['matching']['weights']
-                final_score = (
-                    ai_score * weights['description_match'] + 
-                    keyword_score * weights['skills'] +
-                    urgency_boost * 0.1  # 10% boost for urgent positions
-                )
-                
-                # Normalize to 0-1 range
-                final_score = min(1.0, max(0.0, final_score))
+                final_score = float(self.combine_scores(
+                    ai_score, keyword_score, urgency_boost,
+                    self.config['matching']['weights'],
+                    skills_score, experience_score, education_score
+                ))
                 
                 job['match_score'] = round(final_score, 3)
                 job['ai_similarity'] = round(ai_score, 3)
+                job['skills_similarity'] = round(skills_score, 3)
+                job['experience_similarity'] = round(experience_score, 3)
+                job['education_similarity'] = round(education_score, 3)
                 job['keyword_match'] = round(keyword_score, 3)
                 job['urgency_score'] = round(urgency_boost, 3)
                 job['keywords_matched'] = matched_keywords[:20]  # Top 20
@@ -239,8 +414,15 @@ Return JSON: {{"score": 0-100, "urgency": "low/medium/high", "reason": "brief ex
                 logger.error(f"  ❌ Error matching job {job.get('title')}: {e}")
                 continue
         
-        # Sort by score and return TOP 10 only
+        # Sort by score, re-rank the best with the LLM and return TOP 10 only
         matched_jobs.sort(key=lambda x: x['match_score'], reverse=True)
+        try:
+            self._deep_rerank(matched_jobs)
+        except Exception as e:
+            logger.warning(f"  ⚠️  Deep analysis skipped: {e}")
+        
+        # The LLM blend can push a job below the threshold
+        matched_jobs = [job for job in matched_jobs if job['match_score'] >= self.threshold]
         top_jobs = matched_jobs[:10]
         
         if len(matched_jobs) > 10:
@@ -248,6 +430,95 @@ Return JSON: {{"score": 0-100, "urgency": "low/medium/high", "reason": "brief ex
         
         return top_jobs
     
+    @staticmethod
+    def combine_scores(ai_similarity, keyword_match, urgency_score, weights,
+                       skills_similarity=None, experience_similarity=None,
+                       education_similarity=None):
+        """
+        Combine component scores into the final match score.
+        
+        Accepts scalars or numpy arrays, so stored jobs can be rescored
+        in one vectorized pass when weights change. The skills factor
+        averages the keyword match and the skills-section similarity; a
+        missing (None/NaN) skills similarity falls back to the keyword
+        match, so the factor is the keyword match alone. Missing
+        experience and education similarities fall back to the full-text
+        similarity.
+        
+        Args:
+            ai_similarity: Full resume similarity score(s)
+            keyword_match: Keyword match score(s)
+            urgency_score: Urgency score(s)
+            weights: Weight factors from config['matching']['weights']
+            skills_similarity: Skills section similarity score(s)
+            experience_similarity: Experience section similarity score(s)
+            education_similarity: Education section similarity score(s)
+            
+        Returns:
+            Match score(s) normalized to the 0-1 range
+        """
+        ai_similarity = np.asarray(ai_similarity, dtype=float)
+        keyword_match = np.asarray(keyword_match, dtype=float)
+        
+        def section(scores, fallback):
+            scores = np.asarray(np.nan if scores is None else scores, dtype=float)
+            return np.where(np.isnan(scores), fallback, scores)
+        
+        skills = (keyword_match + section(skills_similarity, keyword_match)) / 2
+        score = (
+            ai_similarity * weights['description_match'] +
+            skills * weights['skills'] +
+            section(experience_similarity, ai_similarity) * weights.get('experience', 0) +
+            section(education_similarity, ai_similarity) * weights.get('education', 0) +
+            np.asarray(urgency_score, dtype=float) * URGENCY_WEIGHT
+        )
+        return np.clip(score, 0.0, 1.0)
+    
+    @staticmethod
+    def blend_llm_score(match_score, llm_score, weight):
+        """
+        Blend LLM analysis scores (0-100) into match scores.
+        
+        Accepts scalars or numpy arrays; NaN LLM scores leave the match
+        score unchanged.
+        
+        Args:
+            match_score: Vector-based match score(s)
+            llm_score: LLM score(s) on a 0-100 scale
+            weight: Share of the LLM score in the result
+            
+        Returns:
+            Blended score(s)
+        """
+        match_score = np.asarray(match_score, dtype=float)
+        llm_score = np.asarray(llm_score, dtype=float)
+        blended = (1 - weight) * match_score + weight * llm_score / 100.0
+        return np.where(np.isnan(llm_score), match_score, blended)
+    
+    @classmethod
+    def rescore(cls, score_rows, weights, llm_weight=0.3):
+        """
+        Recompute match scores for stored jobs without re-embedding.
+        
+        Args:
+            score_rows: (job_id, ai_similarity, keyword_match, urgency_score,
+                        llm_score, skills_similarity, experience_similarity,
+                        education_similarity) tuples; None for missing scores
+            weights: Weight factors from config['matching']['weights']
+            llm_weight: Share of the LLM score for deep-analyzed jobs
+            
+        Returns:
+            List of (job_id, match_score) tuples
+        """
+        if not score_rows:
+            return []
+        
+        data = np.array(score_rows, dtype=float)
+        scores = cls.combine_scores(data[:, 1], data[:, 2], data[:, 3], weights,
+                                    data[:, 5], data[:, 6], data[:, 7])
+        scores = np.round(cls.blend_llm_score(scores, data[:, 4], llm_weight), 3)
+        return list(zip(data[:, 0].astype(int).tolist(), scores.tolist()))
+    
     def _calculate_urgency_score(self, job_description):
         """
         Calculate urgency score based on job description keywords.
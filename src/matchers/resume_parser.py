@@ -7,6 +7,7 @@ from pathlib import Path
 import re
 import pdfplumber
 from docx import Document
+from matchers.skill_taxonomy import SkillTaxonomy
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -25,6 +26,9 @@ class ResumeParser:
         self.config = config
         self.resume_path = Path(config['resume']['path'])
         self.resume_text = None
+        self.content_hash = None
+        self._skill_ids = None
+        self._extra_skills = None
         self.parsed_data = {
             'skills': [],
             'experience': [],
@@ -39,18 +43,22 @@ class ResumeParser:
         if not self.resume_path.exists():
             raise FileNotFoundError(f"Resume not found at {self.resume_path}")
         
-        # Read resume based on format
-        resume_format = self.config['resume']['format'].lower()
-        
-        if resume_format == 'pdf':
-            self.resume_text = self._read_pdf()
-        elif resume_format == 'docx':
-            self.resume_text = self._read_docx()
-        else:  # txt
-            with open(self.resume_path, 'r', encoding='utf-8') as f:
-                self.resume_text = f.read()
+        return self.parse_text(self._read_resume())
+    
+    def parse_text(self, resume_text):
+        """
+        Extract structured data from already-read resume text.
         
+        Args:
+            resume_text: Full resume text
+            
+        Returns:
+            Parsed resume data
+        """
+        self.resume_text = resume_text
         self.parsed_data['full_text'] = self.resume_text
+        self._skill_ids = None
+        self._extra_skills = None
         
         # Extract sections
         self._extract_skills()
@@ -64,13 +72,31 @@ class ResumeParser:
         
         return self.parsed_data
     
+    def get_format(self):
+        """Get resume format from the file extension, falling back to config."""
+        suffix = self.resume_path.suffix.lower().lstrip('.')
+        if suffix in ('pdf', 'docx', 'txt'):
+            return suffix
+        return self.config['resume']['format'].lower()
+    
+    def _read_resume(self):
+        """Read raw resume text based on format."""
+        resume_format = self.get_format()
+        
+        if resume_format == 'pdf':
+            return self._read_pdf()
+        elif resume_format == 'docx':
+            return self._read_docx()
+        else:  # txt
+            with open(self.resume_path, 'r', encoding='utf-8') as f:
+                return f.read()
+    
     def _read_pdf(self):
         """Read PDF resume."""
-        text = ""
         try:
             with pdfplumber.open(self.resume_path) as pdf:
-                for page in pdf.pages:
-                    text += page.extract_text() + "\n"
+                # Image-only pages return None
+                text = "".join((page.extract_text() or "") + "\n" for page in pdf.pages)
             logger.info("✓ PDF resume parsed successfully")
             return text
         except Exception as e:
@@ -96,8 +122,8 @@ class ResumeParser:
         
         if match:
             skills_text = match.group(1)
-            # Extract individual skills (comma or bullet separated)
-            skills = re.split(r'[,\n•\-\*]', skills_text)
+            # Extract individual skills (comma or bullet separated; "hands-on" stays whole)
+            skills = re.split(r'[,\n•\*]|(?<!\w)-|-(?!\w)', skills_text)
             self.parsed_data['skills'] = [
                 skill.strip() for skill in skills 
                 if skill.strip() and len(skill.strip()) > 2
@@ -156,6 +182,41 @@ class ResumeParser:
         """Get extracted skills."""
         return self.parsed_data['skills']
     
+    def get_skill_ids(self, taxonomy):
+        """
+        Get canonical skill ids from skills and experience (computed once).
+        
+        Args:
+            taxonomy: SkillTaxonomy instance
+            
+        Returns:
+            Frozenset of skill ids
+        """
+        if self._skill_ids is None:
+            text = '\n'.join([*self.parsed_data['skills'], *self.parsed_data['experience']])
+            self._skill_ids = taxonomy.extract_ids(text)
+        return self._skill_ids
+    
+    def get_extra_skills(self, taxonomy):
+        """
+        Get listed skills the shared taxonomy doesn't know, as this resume's own taxonomy.
+        
+        Niche skills still match job descriptions for this resume, without
+        being added to the taxonomy every profile shares.
+        
+        Args:
+            taxonomy: Shared SkillTaxonomy instance
+            
+        Returns:
+            SkillTaxonomy of the resume-only skills (ids are its own)
+        """
+        if self._extra_skills is None:
+            self._extra_skills = SkillTaxonomy({
+                skill: [] for skill in self.parsed_data['skills']
+                if len(skill.split()) <= 3 and not taxonomy.extract_ids(skill)
+            })
+        return self._extra_skills
+    
     def get_all_keywords(self):
         """Get all keywords from resume for ATS matching."""
         keywords = set()
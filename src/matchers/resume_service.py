@@ -0,0 +1,205 @@
+"""
+Resume parsing service with a content-hash cache and parallel PDF extraction.
+"""
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pdfplumber
+from matchers.resume_parser import ResumeParser
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _extract_pdf_pages(path, start, end):
+    """
+    Extract text from a range of PDF pages (runs in a worker process).
+
+    Args:
+        path: PDF file path
+        start: First page index (inclusive)
+        end: Last page index (exclusive)
+
+    Returns:
+        List of page texts
+    """
+    with pdfplumber.open(path) as pdf:
+        # Image-only pages return None
+        return [page.extract_text() or "" for page in pdf.pages[start:end]]
+
+
+class ResumeService:
+    """Parse resumes once per content hash and share results across runs."""
+
+    def __init__(self, max_workers=None, parallel_page_threshold=8,
+                 pages_per_task=4, cache_size=64):
+        """
+        Initialize resume service.
+
+        Args:
+            max_workers: Worker processes for PDF extraction (default: CPU count)
+            parallel_page_threshold: Minimum page count to split a PDF across workers
+            pages_per_task: Pages extracted per worker task
+            cache_size: Maximum number of parsed resumes kept in memory
+        """
+        self.max_workers = max_workers
+        self.parallel_page_threshold = parallel_page_threshold
+        self.pages_per_task = pages_per_task
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()  # content hash -> (resume text, parsed data)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self):
+        """Get (or lazily start) the PDF extraction process pool."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    @staticmethod
+    def hash_file(resume_path):
+        """Get SHA-256 content hash of a resume file."""
+        digest = hashlib.sha256()
+        with open(resume_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _cache_get(self, content_hash):
+        """Look up a cached parse result."""
+        with self._lock:
+            entry = self._cache.get(content_hash)
+            if entry is not None:
+                self._cache.move_to_end(content_hash)
+            return entry
+
+    def _cache_put(self, content_hash, resume_text, parsed_data):
+        """Store a parse result, evicting the least recently used entry."""
+        with self._lock:
+            self._cache[content_hash] = (resume_text, parsed_data)
+            self._cache.move_to_end(content_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _submit_pdf(self, resume_path):
+        """
+        Submit PDF text extraction to the process pool.
+
+        Large PDFs are split into page ranges extracted in parallel.
+
+        Returns:
+            List of futures, each resolving to a list of page texts
+        """
+        with pdfplumber.open(resume_path) as pdf:
+            page_count = len(pdf.pages)
+
+        if page_count >= self.parallel_page_threshold:
+            step = self.pages_per_task
+        else:
+            step = max(page_count, 1)
+
+        pool = self._get_pool()
+        return [
+            pool.submit(_extract_pdf_pages, str(resume_path), start, start + step)
+            for start in range(0, max(page_count, 1), step)
+        ]
+
+    def _new_parser(self, config, resume_path):
+        """Create a ResumeParser pointed at the given file."""
+        parser = ResumeParser(config)
+        parser.resume_path = Path(resume_path)
+        return parser
+
+    def parse_many(self, config, resume_paths):
+        """
+        Parse several resumes up front (e.g. at the start of a cycle).
+
+        Uncached PDFs are all submitted to the process pool before any
+        result is collected, so extraction overlaps across resumes.
+
+        Args:
+            config: Application configuration
+            resume_paths: Resume file paths
+
+        Returns:
+            Number of resumes newly parsed
+        """
+        pending = {}
+        for resume_path in dict.fromkeys(resume_paths):
+            try:
+                content_hash = self.hash_file(resume_path)
+            except OSError as e:
+                logger.warning(f"⚠️ Cannot read resume {resume_path}: {e}")
+                continue
+            if content_hash not in pending.values() and self._cache_get(content_hash) is None:
+                pending[resume_path] = content_hash
+
+        futures = {}
+        for resume_path in pending:
+            if self._new_parser(config, resume_path).get_format() == 'pdf':
+                try:
+                    futures[resume_path] = self._submit_pdf(resume_path)
+                except Exception as e:
+                    logger.error(f"Error reading PDF {resume_path}: {e}")
+
+        parsed = 0
+        for resume_path, content_hash in pending.items():
+            try:
+                parser = self._new_parser(config, resume_path)
+                if resume_path in futures:
+                    pages = [text for future in futures[resume_path] for text in future.result()]
+                    resume_text = "".join(text + "\n" for text in pages)
+                else:
+                    resume_text = parser._read_resume()
+                parser.parse_text(resume_text)
+                self._cache_put(content_hash, resume_text, parser.parsed_data)
+                parsed += 1
+            except Exception as e:
+                logger.error(f"Error parsing resume {resume_path}: {e}")
+
+        if pending:
+            logger.info(f"✓ Parsed {parsed}/{len(pending)} resume(s) in bulk")
+        return parsed
+
+    def get_parser(self, config, resume_path):
+        """
+        Get a ResumeParser populated from the cache, parsing on a miss.
+
+        Args:
+            config: Application configuration
+            resume_path: Resume file path
+
+        Returns:
+            Parsed ResumeParser instance
+        """
+        resume_path = Path(resume_path)
+        if not resume_path.exists():
+            raise FileNotFoundError(f"Resume not found at {resume_path}")
+
+        content_hash = self.hash_file(resume_path)
+        if self._cache_get(content_hash) is None:
+            self.parse_many(config, [resume_path])
+
+        entry = self._cache_get(content_hash)
+        if entry is None:
+            raise ValueError(f"Failed to parse resume {resume_path}")
+
+        resume_text, parsed_data = entry
+        parser = self._new_parser(config, resume_path)
+        parser.resume_text = resume_text
+        parser.parsed_data = copy.deepcopy(parsed_data)
+        parser.content_hash = content_hash
+        return parser
+
+    def shutdown(self):
+        """Stop the process pool."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
@@ -0,0 +1,169 @@
+"""
+Skill taxonomy compiled into a token trie mapping surface forms to skill IDs.
+"""
+
+import re
+import threading
+from pathlib import Path
+import yaml
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Keeps symbols that are part of skill names (c++, c#, node.js, .net)
+TOKEN_PATTERN = re.compile(r'\.?[a-z0-9][a-z0-9+#.]*')
+TERMINAL = None  # trie key holding the skill id of a complete surface form
+
+
+def tokenize(text):
+    """
+    Split text into lowercase skill tokens.
+
+    Args:
+        text: Free text
+
+    Returns:
+        List of tokens (trailing dots removed)
+    """
+    return [token.rstrip('.') for token in TOKEN_PATTERN.findall((text or '').lower())]
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills with synonyms, matched in one pass over the tokens.
+
+    Every canonical skill gets an integer ID; its name and aliases
+    ("k8s" -> Kubernetes, "js" -> JavaScript) are compiled into a trie of
+    token sequences, so extracting skills is a single longest-match scan
+    and comparing skill sets is an integer set intersection.
+    """
+
+    def __init__(self, skills=None):
+        """
+        Initialize skill taxonomy.
+
+        Args:
+            skills: Dict of canonical skill name -> list of aliases
+        """
+        self.names = []  # skill id -> canonical name
+        self._trie = {}
+
+        for name, aliases in (skills or {}).items():
+            self._add(name, aliases or [])
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Compile a taxonomy from a YAML file of `Canonical: [alias, ...]` entries.
+
+        Args:
+            path: YAML file path (missing file = empty taxonomy)
+
+        Returns:
+            SkillTaxonomy instance
+        """
+        path = Path(path)
+        if not path.exists():
+            logger.warning(f"⚠️ Skill taxonomy not found at {path}, starting empty")
+            return cls()
+
+        with open(path, 'r', encoding='utf-8') as f:
+            taxonomy = cls(yaml.safe_load(f) or {})
+        logger.info(f"✓ Skill taxonomy compiled: {len(taxonomy)} skills")
+        return taxonomy
+
+    def __len__(self):
+        return len(self.names)
+
+    def _insert(self, tokens, skill_id):
+        """Insert a surface form; the first skill to claim a form keeps it."""
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(TERMINAL, skill_id)
+
+    def _add(self, name, aliases):
+        """Register a canonical skill with its aliases and return its id."""
+        skill_id = len(self.names)
+        self.names.append(str(name))
+        for form in [name, *aliases]:
+            tokens = tokenize(str(form))
+            if tokens:
+                self._insert(tokens, skill_id)
+        return skill_id
+
+    def lookup(self, name):
+        """
+        Get the skill id for an exact surface form.
+
+        Args:
+            name: Skill name or alias
+
+        Returns:
+            Skill id, or None if unknown
+        """
+        node = self._trie
+        for token in tokenize(name):
+            node = node.get(token)
+            if node is None:
+                return None
+        return node.get(TERMINAL)
+
+    def extract_ids(self, text):
+        """
+        Find all skills mentioned in text (longest match wins).
+
+        Args:
+            text: Free text (resume section, job description)
+
+        Returns:
+            Frozenset of skill ids
+        """
+        tokens = tokenize(text)
+        trie = self._trie
+        found = set()
+
+        i = 0
+        while i < len(tokens):
+            node = trie.get(tokens[i])
+            match_id, match_end = None, i + 1
+            j = i + 1
+            while node is not None:
+                if TERMINAL in node:
+                    match_id, match_end = node[TERMINAL], j
+                if j == len(tokens):
+                    break
+                node = node.get(tokens[j])
+                j += 1
+            if match_id is not None:
+                found.add(match_id)
+            i = match_end
+
+        return frozenset(found)
+
+    def to_names(self, skill_ids):
+        """Get sorted canonical names for skill ids."""
+        return sorted((self.names[skill_id] for skill_id in skill_ids), key=str.lower)
+
+
+# Compiled once per process and shared by every profile
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_taxonomy(config):
+    """
+    Get the process-wide skill taxonomy.
+
+    Args:
+        config: Application configuration (uses 'matching.skill_taxonomy')
+
+    Returns:
+        SkillTaxonomy instance
+    """
+    global _taxonomy
+    with _taxonomy_lock:
+        if _taxonomy is None:
+            path = config['matching'].get('skill_taxonomy', 'config/skills.yaml')
+            _taxonomy = SkillTaxonomy.from_file(path)
+        return _taxonomy
@@ -0,0 +1,298 @@
+"""
+Approximate nearest-neighbour index (IVF-flat) over embeddings.
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+import numpy as np
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class VectorIndex:
+    """
+    Inverted-file index with exact (flat) scoring inside probed lists.
+
+    Vectors are L2-normalized so scores are cosine similarities. Until
+    train_size vectors have been added the index is a single flat list
+    (exact search); after that it clusters vectors with spherical k-means
+    and each query only scans the nprobe closest lists. Each list keeps
+    its vectors contiguous, so a probe is one matrix-vector product.
+    """
+
+    def __init__(self, nprobe=8, train_size=2048, retrain_factor=4, seed=1, path=None):
+        """
+        Initialize vector index.
+
+        Args:
+            nprobe: Number of lists scanned per query
+            train_size: Vector count at which clustering starts
+            retrain_factor: Re-cluster when the index grows by this factor
+            seed: Random seed for k-means
+            path: Default file path for save()
+        """
+        self.path = path
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.retrain_factor = retrain_factor
+        self.seed = seed
+
+        self.dim = None
+        self._centroids = None  # (nlist, dim) or None while untrained
+        self._trained_count = 0
+        self._list_vectors = []  # per list: (capacity, dim) float32 buffer
+        self._list_keys = []  # per list: keys in buffer order
+        self._locations = {}  # key -> (list id, position)
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # saves write the newest snapshot last
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, key):
+        return key in self._locations
+
+    @staticmethod
+    def _normalize(vectors):
+        """L2-normalize rows."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _reset_lists(self, nlist):
+        """Create empty inverted lists."""
+        self._list_vectors = [np.empty((16, self.dim), dtype=np.float32) for _ in range(nlist)]
+        self._list_keys = [[] for _ in range(nlist)]
+        self._locations = {}
+
+    def _assign(self, vectors):
+        """Get the list id for each (normalized) vector."""
+        if self._centroids is None:
+            return np.zeros(len(vectors), dtype=np.int64)
+        # Chunked so large rebuilds don't materialize an (n, nlist) matrix
+        return np.concatenate([
+            np.argmax(vectors[start:start + 16384] @ self._centroids.T, axis=1)
+            for start in range(0, len(vectors), 16384)
+        ])
+
+    def _append(self, list_id, key, vector):
+        """Append a vector to an inverted list, growing its buffer if needed."""
+        keys = self._list_keys[list_id]
+        buffer = self._list_vectors[list_id]
+        if len(keys) == len(buffer):
+            grown = np.empty((len(buffer) * 2, self.dim), dtype=np.float32)
+            grown[:len(keys)] = buffer[:len(keys)]
+            self._list_vectors[list_id] = buffer = grown
+        buffer[len(keys)] = vector
+        self._locations[key] = (list_id, len(keys))
+        keys.append(key)
+
+    def _remove(self, key):
+        """Remove a key by moving the list's last entry into its slot."""
+        list_id, position = self._locations.pop(key)
+        keys = self._list_keys[list_id]
+        buffer = self._list_vectors[list_id]
+        last = len(keys) - 1
+        if position != last:
+            buffer[position] = buffer[last]
+            keys[position] = keys[last]
+            self._locations[keys[position]] = (list_id, position)
+        keys.pop()
+
+    def _all_vectors(self):
+        """Get (keys, vectors) for every indexed entry."""
+        keys = [key for list_keys in self._list_keys for key in list_keys]
+        vectors = [buffer[:len(list_keys)] for buffer, list_keys in zip(self._list_vectors, self._list_keys)]
+        if not keys:
+            return keys, np.empty((0, self.dim or 0), dtype=np.float32)
+        return keys, np.concatenate(vectors)
+
+    def add_many(self, keys, vectors):
+        """
+        Insert or replace vectors.
+
+        Args:
+            keys: Keys (strings)
+            vectors: Matrix with one row per key
+        """
+        if len(keys) == 0:
+            return
+
+        vectors = self._normalize(vectors)
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._reset_lists(1)
+
+            list_ids = self._assign(vectors)
+            for key, vector, list_id in zip(keys, vectors, list_ids):
+                if key in self._locations:
+                    self._remove(key)
+                self._append(int(list_id), key, vector)
+
+            count = len(self._locations)
+            if count >= self.train_size and count >= self._trained_count * self.retrain_factor:
+                self.train()
+
+    def add(self, key, vector):
+        """Insert or replace a single vector."""
+        self.add_many([key], [vector])
+
+    def train(self, iterations=10):
+        """
+        Cluster all vectors with spherical k-means and rebuild the lists.
+
+        Args:
+            iterations: k-means iterations
+        """
+        with self._lock:
+            keys, vectors = self._all_vectors()
+            if len(keys) == 0:
+                return
+
+            nlist = int(np.clip(np.sqrt(len(keys)), 1, 4096))
+            rng = np.random.RandomState(self.seed)
+            sample = vectors[rng.choice(len(vectors), min(len(vectors), nlist * 64), replace=False)]
+            centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                counts = np.bincount(assignment, minlength=nlist)
+                # Re-seed empty clusters from random samples
+                empty = counts == 0
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+                centroids = self._normalize(sums)
+
+            self._centroids = centroids
+            self._trained_count = len(keys)
+            self._reset_lists(nlist)
+            for key, vector, list_id in zip(keys, vectors, self._assign(vectors)):
+                self._append(int(list_id), key, vector)
+
+            logger.info(f"✓ Vector index trained: {len(keys)} vectors in {nlist} lists")
+
+    def search(self, vector, k=10, exclude=None):
+        """
+        Find the k most similar vectors.
+
+        Args:
+            vector: Query vector
+            k: Number of results
+            exclude: Optional set of keys to leave out
+
+        Returns:
+            List of (key, cosine similarity) tuples, best first
+        """
+        query = self._normalize(vector)[0]
+        exclude = exclude or set()
+
+        with self._lock:
+            if not self._locations:
+                return []
+
+            if self._centroids is None:
+                probe = [0]
+            else:
+                centroid_scores = self._centroids @ query
+                nprobe = min(self.nprobe, len(centroid_scores))
+                probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+            keys = []
+            scores = []
+            for list_id in probe:
+                list_keys = self._list_keys[list_id]
+                if list_keys:
+                    keys.extend(list_keys)
+                    scores.append(self._list_vectors[list_id][:len(list_keys)] @ query)
+
+        if not keys:
+            return []
+
+        scores = np.concatenate(scores)
+        wanted = min(k + len(exclude), len(keys))
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        top = top[np.argsort(-scores[top])]
+
+        results = [(keys[i], float(scores[i])) for i in top if keys[i] not in exclude]
+        return results[:k]
+
+    def save(self, path=None):
+        """
+        Persist the index structure (keys, list assignment, centroids).
+
+        Vectors are not written; they live in the EmbeddingStore and are
+        reloaded from it by load().
+
+        Args:
+            path: Target .npz file path (default: self.path)
+        """
+        path = Path(path or self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Searches only wait for the snapshot, not for the write
+        with self._save_lock:
+            with self._lock:
+                keys = [key for list_keys in self._list_keys for key in list_keys]
+                assignment = np.concatenate([
+                    np.full(len(list_keys), list_id, dtype=np.int32)
+                    for list_id, list_keys in enumerate(self._list_keys)
+                ]) if keys else np.empty(0, dtype=np.int32)
+                centroids = self._centroids if self._centroids is not None else np.empty((0, 0), np.float32)
+                trained_count = self._trained_count
+
+            # A unique temp file keeps saves from other processes apart too
+            tmp = tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix='.tmp',
+                                              delete=False)
+            try:
+                with tmp:
+                    np.savez(tmp, keys=np.array(keys, dtype='S'), assignment=assignment,
+                             centroids=centroids, trained_count=trained_count)
+                os.replace(tmp.name, path)
+            except BaseException:
+                Path(tmp.name).unlink(missing_ok=True)
+                raise
+
+    @classmethod
+    def load(cls, path, embedding_store, **kwargs):
+        """
+        Load an index saved with save(), taking vectors from an EmbeddingStore.
+
+        Keys missing from the store are dropped.
+
+        Args:
+            path: Saved .npz file path
+            embedding_store: EmbeddingStore holding the vectors
+            **kwargs: VectorIndex constructor arguments
+
+        Returns:
+            VectorIndex instance
+        """
+        index = cls(path=path, **kwargs)
+        with np.load(path) as data:
+            keys = data['keys'].astype(str).tolist()
+            assignment = data['assignment']
+            centroids = data['centroids']
+            trained_count = int(data['trained_count'])
+
+        present = [i for i, key in enumerate(keys) if key in embedding_store]
+        if not present:
+            return index
+
+        vectors = index._normalize(embedding_store.get_many([keys[i] for i in present]))
+        index.dim = vectors.shape[1]
+        if centroids.size and centroids.shape[1] == index.dim:
+            index._centroids = centroids.astype(np.float32)
+            index._trained_count = trained_count
+            index._reset_lists(len(centroids))
+        else:
+            index._reset_lists(1)
+            assignment = np.zeros(len(keys), dtype=np.int32)
+
+        for vector, i in zip(vectors, present):
+            index._append(int(assignment[i]), keys[i], vector)
+        return index
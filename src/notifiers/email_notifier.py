@@ -189,6 +189,12 @@ class EmailNotifier:
                 keywords = ', '.join(job['keywords_matched'][:10])
                 html += f'<div class="job-keywords">🔑 Matched Keywords: {keywords}</div>'
             
+            if job.get('alternate_urls'):
+                links = ' · '.join(
+                    f'<a href="{alt["url"]}">{alt["source"]}</a>' for alt in job['alternate_urls']
+                )
+                html += f'<div class="job-location">🔁 Also posted on: {links}</div>'
+            
             html += f"""
                     <a href="{job['url']}" class="apply-button">View Job →</a>
                 </div>
@@ -5,11 +5,15 @@ Base scraper class for job portals.
 import time
 import random
 from abc import ABC, abstractmethod
+from collections import Counter
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
+from scrapers.card_screener import CardScreener
 from utils.logger import setup_logger
+from utils.posting_parser import parse_posting_fields, filter_reason
 
 logger = setup_logger(__name__)
 
@@ -17,6 +21,9 @@ logger = setup_logger(__name__)
 class BaseScraper(ABC):
     """Base class for all job scrapers."""
     
+    # Whether each kept card costs a detail page navigation
+    fetches_details = False
+    
     def __init__(self, config, name):
         """
         Initialize base scraper.
@@ -32,6 +39,15 @@ class BaseScraper(ABC):
         self.max_pages = self.scraping_config['max_pages']
         self.request_delay = self.scraping_config['request_delay']
         
+        # Postings dropped from card data before any detail fetch, by reason
+        self.screener = CardScreener(self.search_config)
+        self.filtered = Counter()
+        self.fetches_saved = 0
+        
+        # Optional callback(scraper name, job title, location, jobs found so far),
+        # called after each results page
+        self.on_progress = None
+        
     def _get_driver(self):
         """
         Get Selenium WebDriver with options.
@@ -97,6 +113,59 @@ class BaseScraper(ABC):
         """
         pass
     
+    def _report_progress(self, job_title, location, jobs_found):
+        """Pass scraping progress to on_progress, if set."""
+        if self.on_progress is None:
+            return
+        try:
+            self.on_progress(self.name, job_title, location, jobs_found)
+        except Exception as e:
+            logger.debug(f"Progress callback failed: {e}")
+    
+    def _prefilter(self, job, date_text=None, fetched=False):
+        """
+        Screen card data and apply the search filters before any detail fetch.
+        
+        Checks exclusion keywords, blocked companies and title similarity
+        first, then parses salary/posting date for the salary and age filters.
+        
+        Args:
+            job: Job dictionary built from a search result card
+            date_text: Posting date text from the card, if any
+            fetched: Whether the detail page was already loaded
+            
+        Returns:
+            True if the job should be fetched and kept
+        """
+        reason = self.screener.reason(job)
+        if reason is None:
+            parse_posting_fields(job, date_text=date_text)
+            reason = filter_reason(job, self.search_config)
+        if reason:
+            self.filtered[reason] += 1
+            if self.fetches_details and not fetched:
+                self.fetches_saved += 1
+            logger.debug(f"    ✗ Skipped ({reason}): {job['title']}")
+            return False
+        return True
+    
+    def _card_text(self, card, selectors):
+        """
+        Get text (or datetime attribute) of the first matching card element.
+        
+        Args:
+            card: Card WebElement
+            selectors: CSS selectors to try in order
+            
+        Returns:
+            Text, or None if no selector matches
+        """
+        for selector in selectors:
+            elements = card.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                return elements[0].get_attribute('datetime') or self._clean_text(elements[0].text)
+        return None
+    
     def _clean_text(self, text):
         """
         Clean scraped text.
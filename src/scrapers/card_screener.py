@@ -0,0 +1,99 @@
+"""
+Card-level screening of search results before detail pages are fetched.
+"""
+
+import re
+from matchers.deduplicator import normalize_company
+
+# Gender tags and German title words mapped so titles compare across languages
+GENDER_TAG_PATTERN = re.compile(r'\(\s*[mwfdx]\s*(?:/\s*[mwfdx]\s*)+\)|\b[mwfd]/[mwfd](?:/[mwfd])?\b')
+TITLE_TRANSLATIONS = {
+    'entwickler': 'developer',
+    'ingenieur': 'engineer',
+    'softwareentwicklung': 'software development',
+    'datenwissenschaftler': 'data scientist',
+}
+TITLE_WORD_PATTERN = re.compile(r'[a-z0-9+#]+')
+
+
+def _title_trigrams(title):
+    """Get character trigrams of a normalized title (spaces removed for compounds)."""
+    text = GENDER_TAG_PATTERN.sub(' ', (title or '').lower())
+    for german, english in TITLE_TRANSLATIONS.items():
+        text = text.replace(german, english)
+    text = ''.join(TITLE_WORD_PATTERN.findall(text))
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CardScreener:
+    """
+    Discard postings from title, company and location alone.
+
+    Covers search.exclude_keywords (whole words in title, company or
+    location), search.blocked_companies (compared after normalizing legal
+    suffixes) and similarity of the title to search.job_titles.
+    """
+
+    def __init__(self, search_config):
+        """
+        Initialize card screener.
+
+        Args:
+            search_config: config['search']
+        """
+        keywords = [k for k in search_config.get('exclude_keywords') or [] if k]
+        self._exclude_pattern = re.compile(
+            r'\b(?:' + '|'.join(re.escape(k.lower()) for k in keywords) + r')\b'
+        ) if keywords else None
+
+        self._blocked_companies = {
+            normalize_company(company) for company in search_config.get('blocked_companies') or []
+        }
+        self._blocked_companies.discard('')
+
+        # Fraction of a searched title's trigrams the card title must contain
+        self.title_similarity = search_config.get('title_similarity', 0.3)
+        self._title_trigrams = [
+            trigrams for trigrams in map(_title_trigrams, search_config.get('job_titles') or [])
+            if trigrams
+        ]
+
+    def title_score(self, title):
+        """
+        Get the best similarity of a title to the searched job titles.
+
+        Args:
+            title: Posting title
+
+        Returns:
+            Score between 0 and 1 (1.0 if no job titles are configured)
+        """
+        if not self._title_trigrams:
+            return 1.0
+        trigrams = _title_trigrams(title)
+        return max(len(wanted & trigrams) / len(wanted) for wanted in self._title_trigrams)
+
+    def reason(self, job):
+        """
+        Check a card-level job.
+
+        Args:
+            job: Job dictionary with at least title (company/location optional)
+
+        Returns:
+            'excluded_keyword', 'blocked_company' or 'title' if the job is
+            discarded, else None
+        """
+        if self._exclude_pattern is not None:
+            text = ' '.join(job.get(field) or '' for field in ('title', 'company', 'location'))
+            if self._exclude_pattern.search(text.lower()):
+                return 'excluded_keyword'
+
+        if self._blocked_companies and normalize_company(job.get('company')) in self._blocked_companies:
+            return 'blocked_company'
+
+        if self.title_similarity and job.get('title') and \
+                self.title_score(job['title']) < self.title_similarity:
+            return 'title'
+
+        return None
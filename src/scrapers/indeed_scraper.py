@@ -16,6 +16,8 @@ logger = setup_logger(__name__)
 class IndeedScraper(BaseScraper):
     """Scraper for Indeed.de (Germany)."""
     
+    fetches_details = True
+    
     def __init__(self, config):
         """Initialize Indeed scraper."""
         super().__init__(config, "Indeed.de")
@@ -73,6 +75,8 @@ class IndeedScraper(BaseScraper):
                                     logger.debug(f"    Error extracting job: {e}")
                                     continue
                             
+                            self._report_progress(job_title, location, len(all_jobs))
+                            
                         except TimeoutException:
                             logger.warning(f"    Timeout on page {page+1}")
                             break
@@ -126,20 +130,25 @@ class IndeedScraper(BaseScraper):
             except NoSuchElementException:
                 pass
             
-            # Get full description (requires clicking)
-            description = self._get_job_description(job_url, driver)
-            
             job = {
                 'title': title,
                 'company': company,
                 'location': location,
                 'url': job_url,
-                'description': description,
+                'description': '',
                 'salary': salary,
                 'posted_date': None,  # Indeed doesn't always show date
                 'source': self.name
             }
             
+            # Screen the card before paying for the detail page
+            date_text = self._card_text(card, ["span[data-testid='myJobsStateDate']", "span.date"])
+            if not self._prefilter(job, date_text):
+                return None
+            
+            # Get full description (requires clicking)
+            job['description'] = self._get_job_description(job_url, driver)
+            
             return job
             
         except Exception as e:
@@ -16,6 +16,8 @@ logger = setup_logger(__name__)
 class LinkedInScraper(BaseScraper):
     """Scraper for LinkedIn Jobs (Germany)."""
     
+    fetches_details = True
+    
     def __init__(self, config):
         """Initialize LinkedIn scraper."""
         super().__init__(config, "LinkedIn")
@@ -119,6 +121,8 @@ class LinkedInScraper(BaseScraper):
                                     logger.debug(f"    Error extracting job: {e}")
                                     continue
                             
+                            self._report_progress(job_title, location, len(all_jobs))
+                            
                         except TimeoutException:
                             logger.warning(f"    Timeout on page {page+1}")
                             break
@@ -137,6 +141,17 @@ class LinkedInScraper(BaseScraper):
     def _extract_job_data(self, card, driver):
         """Extract job data from a job card."""
         try:
+            # Screen title, company, location and date on the card before clicking
+            date_text = self._card_text(card, ["time"])
+            card_job = {
+                'title': self._card_text(card, [".job-card-list__title", "h3"]) or '',
+                'company': self._card_text(card, [".job-card-container__primary-description", "h4"]),
+                'location': self._card_text(card, [".job-card-container__metadata-item"]),
+                'posted_date': None
+            }
+            if not self._prefilter(card_job, date_text):
+                return None
+            
             # Click on job card to load details
             card.click()
             self._delay()
@@ -190,6 +205,10 @@ class LinkedInScraper(BaseScraper):
                 'source': self.name
             }
             
+            # Salary is only shown on the detail pane
+            if not self._prefilter(job, date_text, fetched=True):
+                return None
+            
             return job
             
         except Exception as e:
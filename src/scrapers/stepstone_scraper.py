@@ -78,6 +78,8 @@ class StepStoneScraper(BaseScraper):
                                     logger.debug(f"    Error extracting job: {e}")
                                     continue
                             
+                            self._report_progress(job_title, location, len(all_jobs))
+                            
                         except TimeoutException:
                             logger.warning(f"    Timeout on page {page}")
                             break
@@ -143,6 +145,10 @@ class StepStoneScraper(BaseScraper):
                 'source': self.name
             }
             
+            date_text = self._card_text(card, ["time", "span[data-at='job-item-timeago']"])
+            if not self._prefilter(job, date_text):
+                return None
+            
             return job
             
         except Exception as e:
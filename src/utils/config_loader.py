@@ -2,8 +2,33 @@
 Configuration loader utility.
 """
 
+import copy
 import yaml
 from pathlib import Path
+from utils.lru_cache import LRUCache
+
+# Parsed YAML files keyed by (path, mtime, size), so an edited file is parsed again
+config_cache = LRUCache(max_size=16)
+
+
+def load_yaml(path):
+    """
+    Load a YAML file, parsing it only when it changed since the last load.
+    
+    Args:
+        path: YAML file path
+        
+    Returns:
+        Parsed content (a private copy the caller may modify)
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    
+    def load():
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
+    
+    return copy.deepcopy(config_cache.get_or_load((path, stat.st_mtime_ns, stat.st_size), load))
 
 
 class ConfigLoader:
@@ -13,8 +38,4 @@ class ConfigLoader:
     def load_config():
         """Load configuration from YAML file."""
         config_path = Path(__file__).parent.parent.parent / 'config' / 'config.yaml'
-        
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        
-        return config
+        return load_yaml(config_path)
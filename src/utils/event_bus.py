@@ -0,0 +1,145 @@
+"""
+In-process publish/subscribe for job search progress events.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+# Events buffered per subscriber before the oldest are dropped (slow clients)
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Recent events kept for clients that reconnect with the last id they saw
+REPLAY_SIZE = 256
+
+
+class Subscription:
+    """Events delivered to one subscriber, read with get()."""
+
+    def __init__(self, bus, profile_id=None, max_size=SUBSCRIBER_QUEUE_SIZE):
+        """
+        Initialize subscription.
+
+        Args:
+            bus: EventBus delivering the events
+            profile_id: Only receive this profile's events (None = all events)
+            max_size: Events buffered before the oldest are dropped
+        """
+        self.profile_id = profile_id
+        self.dropped = 0
+        self._bus = bus
+        self._queue = queue.Queue(max_size)
+
+    def wants(self, event):
+        """Check whether an event is for this subscriber."""
+        return self.profile_id is None or event['profile_id'] == self.profile_id
+
+    def get(self, timeout=None):
+        """Wait for the next event; returns None after timeout seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stop receiving events."""
+        self._bus.unsubscribe(self)
+
+    def _deliver(self, event):
+        """Queue an event, dropping the oldest one if the subscriber fell behind."""
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class EventBus:
+    """
+    Fan out events from pipeline threads to subscribers (e.g. SSE streams).
+
+    Publishing never blocks: each subscriber has a bounded queue, and a
+    subscriber that stops reading loses its oldest events rather than
+    slowing the job search down.
+    """
+
+    def __init__(self, replay_size=REPLAY_SIZE):
+        """
+        Initialize event bus.
+
+        Args:
+            replay_size: Recent events kept for subscribe(after_id=...)
+        """
+        self._subscribers = set()
+        self._recent = deque(maxlen=replay_size)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, profile_id=None, **data):
+        """
+        Publish an event.
+
+        Args:
+            event_type: Event name (e.g. 'run', 'scrape_progress', 'matches')
+            profile_id: Profile the event belongs to
+            **data: JSON-serializable event fields
+
+        Returns:
+            Event dictionary with its id and timestamp
+        """
+        with self._lock:
+            self._last_id += 1
+            event = {
+                'id': self._last_id,
+                'type': event_type,
+                'profile_id': profile_id,
+                'time': time.time(),
+                **data
+            }
+            self._recent.append(event)
+            subscribers = [s for s in self._subscribers if s.wants(event)]
+
+        for subscription in subscribers:
+            subscription._deliver(event)
+        return event
+
+    def subscribe(self, profile_id=None, after_id=None):
+        """
+        Subscribe to events.
+
+        Args:
+            profile_id: Only receive this profile's events (None = all events)
+            after_id: Replay buffered events newer than this id (e.g. an SSE Last-Event-ID)
+
+        Returns:
+            Subscription (call close() when done)
+        """
+        subscription = Subscription(self, profile_id)
+        with self._lock:
+            if after_id is not None:
+                for event in self._recent:
+                    if event['id'] > after_id and subscription.wants(event):
+                        subscription._deliver(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription."""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        """Number of open subscriptions."""
+        with self._lock:
+            return len(self._subscribers)
+
+
+# Job search threads and web requests share one bus per process
+event_bus = EventBus()
@@ -0,0 +1,19 @@
+"""
+Job identity hashing shared by storage and matching.
+"""
+
+import hashlib
+
+
+def generate_job_hash(job):
+    """
+    Generate unique hash for a job.
+    
+    Args:
+        job: Job dictionary
+        
+    Returns:
+        Hash string
+    """
+    unique_string = f"{job['title']}|{job['company']}|{job.get('location', '')}"
+    return hashlib.md5(unique_string.encode()).hexdigest()
@@ -0,0 +1,111 @@
+"""
+Thread-safe LRU cache with hit/miss counters.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with an optional entry max age.
+
+    invalidate() also voids values that get_or_load() is loading at that
+    moment, so a read that raced a write never caches what it read before
+    the write.
+    """
+
+    def __init__(self, max_size=128, max_age=None):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Maximum number of entries kept
+            max_age: Seconds an entry stays valid (None = until evicted or invalidated)
+        """
+        self.max_size = max_size
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, time stored)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a cached value, or default."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.max_age is not None \
+                    and time.monotonic() - entry[1] > self.max_age:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store a value."""
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_load(self, key, load):
+        """
+        Get a cached value, calling load() on a miss.
+
+        Args:
+            key: Cache key
+            load: Function returning the value (None results are not cached)
+
+        Returns:
+            Cached or loaded value
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            generation = self._generation
+        value = load()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._store(key, value)
+        return value
+
+    def invalidate(self, *keys):
+        """Drop entries (and any value being loaded concurrently)."""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Get size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None
+            }
+
+    def _store(self, key, value):
+        """Store a value (lock held)."""
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
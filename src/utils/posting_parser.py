@@ -0,0 +1,178 @@
+"""
+Parse salary and posting-date strings scraped from job cards.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+# Annualization factors for salary periods (default: per year)
+HOURS_PER_YEAR = 2080
+MONTHS_PER_YEAR = 12
+
+SALARY_NUMBER_PATTERN = re.compile(r'(\d{1,3}(?:[.,\s]\d{3})+|\d+(?:[.,]\d+)?)\s*(k|tsd|tausend)?\b')
+YEARLY_PATTERN = re.compile(r'jahr|year|annual|p\.\s?a\.|jährlich')
+HOURLY_PATTERN = re.compile(r'stunde|std\b|hour|/\s*h\b|hourly')
+MONTHLY_PATTERN = re.compile(r'monat|month|/\s*mo\b|mtl|monthly')
+EURO_PATTERN = re.compile(r'€|\beur\b|\beuro\b')
+FOREIGN_CURRENCY_PATTERN = re.compile(r'\$|£|\busd\b|\bgbp\b|\bchf\b')
+
+RELATIVE_DATE_PATTERN = re.compile(
+    r'(\d+|\beine[mnr]?\b|\ban?\b|\bone\b)\+?\s*'
+    r'(min|stunde|std|hour|hr|tag|day|woche|week|monat|month)'
+)
+TODAY_PATTERN = re.compile(r'heute|today|just posted|gerade|soeben|\bneu\b|\bnew\b')
+YESTERDAY_PATTERN = re.compile(r'gestern|yesterday')
+ISO_DATE_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+GERMAN_DATE_PATTERN = re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})')
+
+DATE_UNITS = {
+    'min': timedelta(minutes=1),
+    'stunde': timedelta(hours=1),
+    'std': timedelta(hours=1),
+    'hour': timedelta(hours=1),
+    'hr': timedelta(hours=1),
+    'tag': timedelta(days=1),
+    'day': timedelta(days=1),
+    'woche': timedelta(weeks=1),
+    'week': timedelta(weeks=1),
+    'monat': timedelta(days=30),
+    'month': timedelta(days=30),
+}
+
+
+def _to_number(digits, suffix):
+    """Convert a matched salary number ('60.000', '4,5', '70' + 'k') to a float."""
+    if re.search(r'[.,\s]\d{3}$', digits) and len(digits) > 4:
+        value = float(re.sub(r'[.,\s]', '', digits))
+    else:
+        value = float(digits.replace(',', '.'))
+    return value * 1000 if suffix else value
+
+
+def parse_salary(text):
+    """
+    Parse a salary string into an annual EUR range.
+
+    Handles ranges and single values, thousands separators, "k"/"Tsd."
+    suffixes and hourly/monthly amounts ("4.500 € pro Monat",
+    "€60,000 - €75,000 a year", "55k-70k €").
+
+    Args:
+        text: Salary text as scraped
+
+    Returns:
+        Tuple of (min, max) annual EUR, or (None, None) if not a EUR salary
+    """
+    text = (text or '').lower()
+    if not text or FOREIGN_CURRENCY_PATTERN.search(text):
+        return None, None
+
+    matches = SALARY_NUMBER_PATTERN.findall(text)
+    # Bare numbers without currency or "k" are usually hours, counts or dates
+    if not matches or not (EURO_PATTERN.search(text) or any(suffix for _, suffix in matches)):
+        return None, None
+
+    # A suffix on the upper bound applies to the whole range ("55-70k")
+    shared_suffix = matches[-1][1]
+    values = [_to_number(digits, suffix or shared_suffix) for digits, suffix in matches[:2]]
+
+    # Only annualize amounts plausible for the period ("40 Stunden" is not a wage)
+    if not YEARLY_PATTERN.search(text):
+        if HOURLY_PATTERN.search(text) and max(values) < 500:
+            values = [value * HOURS_PER_YEAR for value in values]
+        elif MONTHLY_PATTERN.search(text) and max(values) < 30000:
+            values = [value * MONTHS_PER_YEAR for value in values]
+
+    values = [value for value in values if value >= 1000]
+    if not values:
+        return None, None
+    return min(values), max(values)
+
+
+def parse_posted_date(text, now=None):
+    """
+    Parse a relative or absolute posting date into an ISO timestamp.
+
+    Handles German and English relative dates ("vor 3 Tagen", "2 days ago",
+    "30+ days ago", "Heute", "Gestern") and absolute dates
+    ("2024-03-12", "12.03.2024").
+
+    Args:
+        text: Date text as scraped
+        now: Reference time (default: now)
+
+    Returns:
+        ISO timestamp string, or None if not recognized
+    """
+    text = (text or '').lower().strip()
+    if not text:
+        return None
+    now = now or datetime.now()
+
+    match = ISO_DATE_PATTERN.search(text) or GERMAN_DATE_PATTERN.search(text)
+    if match:
+        parts = [int(part) for part in match.groups()]
+        year, month, day = parts if match.re is ISO_DATE_PATTERN else parts[::-1]
+        try:
+            return datetime(year, month, day).isoformat(timespec='seconds')
+        except ValueError:
+            return None
+
+    match = RELATIVE_DATE_PATTERN.search(text)
+    if match:
+        count = int(match.group(1)) if match.group(1).isdigit() else 1
+        return (now - count * DATE_UNITS[match.group(2)]).isoformat(timespec='seconds')
+
+    if YESTERDAY_PATTERN.search(text):
+        return (now - timedelta(days=1)).isoformat(timespec='seconds')
+    if TODAY_PATTERN.search(text):
+        return now.isoformat(timespec='seconds')
+    return None
+
+
+def parse_posting_fields(job, salary_text=None, date_text=None, now=None):
+    """
+    Set numeric 'salary_min'/'salary_max' and ISO 'posted_date' on a job.
+
+    Args:
+        job: Job dictionary (modified in place)
+        salary_text: Salary text (default: job['salary'])
+        date_text: Posting date text (keeps job['posted_date'] if None)
+        now: Reference time for relative dates
+
+    Returns:
+        The job dictionary
+    """
+    job['salary_min'], job['salary_max'] = parse_salary(salary_text or job.get('salary'))
+    if date_text:
+        job['posted_date'] = parse_posted_date(date_text, now)
+    return job
+
+
+def filter_reason(job, search_config, now=None):
+    """
+    Check a job against the salary and age filters from the search config.
+
+    Jobs without a parsed salary or date are kept.
+
+    Args:
+        job: Job dictionary with parsed posting fields
+        search_config: config['search']
+        now: Reference time
+
+    Returns:
+        'salary' or 'age' if the job is filtered out, else None
+    """
+    min_salary = search_config.get('min_salary')
+    if min_salary and job.get('salary_max') is not None and job['salary_max'] < min_salary:
+        return 'salary'
+
+    max_age_days = search_config.get('max_job_age_days')
+    if max_age_days and job.get('posted_date'):
+        try:
+            posted = datetime.fromisoformat(job['posted_date'])
+        except (TypeError, ValueError):
+            return None
+        if posted < (now or datetime.now()) - timedelta(days=max_age_days):
+            return 'age'
+    return None
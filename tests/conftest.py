@@ -0,0 +1,72 @@
+"""
+Shared fixtures: every storage test runs against SQLite and, when
+TEST_DATABASE_URL points at a PostgreSQL server, against PostgreSQL too.
+"""
+
+import os
+import sys
+import uuid
+from pathlib import Path
+import pytest
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from database.storage import create_storage
+
+
+def _postgres_storage():
+    """Open a PostgreSQL backend in a throwaway schema (skips without a server)"""
+    url = os.getenv('TEST_DATABASE_URL')
+    if not url:
+        pytest.skip('TEST_DATABASE_URL not set')
+    psycopg2 = pytest.importorskip('psycopg2')
+
+    schema = f'test_{uuid.uuid4().hex[:12]}'
+    conn = psycopg2.connect(url)
+    conn.autocommit = True
+    conn.cursor().execute(f'CREATE SCHEMA {schema}')
+    separator = '&' if '?' in url else '?'
+    storage = create_storage(f'{url}{separator}options=-csearch_path%3D{schema}')
+    return storage, lambda: conn.cursor().execute(f'DROP SCHEMA {schema} CASCADE') or conn.close()
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def storage(request, tmp_path):
+    """A fresh JobStorage of each backend"""
+    if request.param == 'sqlite':
+        storage, drop = create_storage(str(tmp_path / 'jobs.db')), lambda: None
+    else:
+        storage, drop = _postgres_storage()
+    yield storage
+    storage.close()
+    drop()
+
+
+@pytest.fixture
+def profile_id(storage):
+    """A profile to save jobs for"""
+    return storage.create_profile('Test', 'test@example.com', job_preferences={'keywords': ['python']})
+
+
+def make_job(i, **fields):
+    """A matched job as produced by the pipeline"""
+    job = {
+        'job_hash': f'{i:032x}',
+        'title': f'Data Engineer {i}',
+        'company': f'Company {i}',
+        'location': 'Berlin',
+        'url': f'https://example.com/jobs/{i}',
+        'description': f'We build data pipelines with Python and Kafka. Posting {i}.',
+        'salary_max': 60000 + i * 1000,
+        'posted_date': '2026-10-01T09:00:00',
+        'source': 'indeed',
+        'required_skills': ['Python'],
+        'match_score': 0.5,
+        'ai_similarity': 0.6,
+        'keyword_match': 0.4,
+        'urgency_score': 0.0,
+        'keywords_matched': ['Python']
+    }
+    job.update(fields)
+    return job
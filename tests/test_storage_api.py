@@ -0,0 +1,242 @@
+"""
+JobStorage behaviour shared by the SQLite and PostgreSQL backends.
+"""
+
+import gzip
+import json
+from collections.abc import Mapping
+import pytest
+from conftest import make_job
+from database.rows import rows_to_json
+from database.storage import JOB_LIST_COLUMNS
+
+
+def _all_pages(storage, profile_id, limit):
+    """Walk a profile's job list page by page"""
+    jobs, after = [], None
+    while True:
+        page = storage.get_profile_jobs(profile_id, limit=limit, after=after)
+        if not page:
+            return jobs
+        jobs.extend(page)
+        after = storage.decode_cursor(storage.encode_cursor(page[-1]))
+
+
+def test_profile_lifecycle(storage, profile_id):
+    profile = storage.get_profile(profile_id)
+    assert profile['name'] == 'Test'
+    assert profile['job_preferences'] == {'keywords': ['python']}
+
+    storage.update_profile(profile_id, name='Renamed', gemini_key='key')
+    storage.toggle_profile(profile_id, False)
+    profile = storage.get_profile(profile_id)
+    assert (profile['name'], profile['gemini_key'], bool(profile['enabled'])) == ('Renamed', 'key', False)
+    assert [p['id'] for p in storage.get_all_profiles()] == [profile_id]
+
+    storage.delete_profile(profile_id)
+    assert storage.get_profile(profile_id) is None
+
+
+def test_save_jobs_counts_new_matches_per_profile(storage, profile_id):
+    jobs = [make_job(i) for i in range(3)]
+    assert storage.save_jobs(profile_id, jobs) == 3
+    assert storage.save_jobs(profile_id, jobs) == 0
+
+    # Another profile gets its own matches of the same postings
+    other_id = storage.create_profile('Other', 'other@example.com')
+    assert storage.save_jobs(other_id, jobs[:1]) == 1
+    assert set(storage.get_jobs_by_hashes([jobs[0]['job_hash']])) == {jobs[0]['job_hash']}
+
+
+def test_required_skills_are_kept_once_stored(storage, profile_id):
+    storage.save_jobs(profile_id, [make_job(1, required_skills=[]), make_job(2)])
+    hashes = [make_job(i)['job_hash'] for i in (1, 2, 3)]
+    assert storage.get_required_skills(hashes) == {hashes[1]: ['Python']}
+
+    # Empty requirements are filled in later, stored ones are not overwritten
+    storage.save_jobs(profile_id, [
+        make_job(1, required_skills=['Kafka']), make_job(2, required_skills=['Java'])
+    ])
+    assert storage.get_required_skills(hashes) == {hashes[0]: ['Kafka'], hashes[1]: ['Python']}
+
+
+def test_keyset_pages_cover_ties_from_one_save(storage, profile_id):
+    # Equal scores and one created_at: only the id breaks the tie
+    storage.save_jobs(profile_id, [make_job(i) for i in range(7)])
+
+    ids = [job['id'] for job in _all_pages(storage, profile_id, limit=2)]
+    assert len(ids) == 7
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_keyset_pages_include_jobs_without_scores(storage, profile_id):
+    storage.save_jobs(profile_id, [
+        make_job(i, match_score=None if i % 2 else 0.7, urgency_score=None) for i in range(5)
+    ])
+
+    jobs = _all_pages(storage, profile_id, limit=2)
+    assert len(jobs) == 5
+    assert [job['match_score'] for job in jobs] == [0.7, 0.7, 0.7, 0, 0]
+
+
+def test_listing_filters_and_order(storage, profile_id):
+    storage.save_jobs(profile_id, [
+        make_job(1, match_score=0.9), make_job(2, match_score=0.3), make_job(3, match_score=0.6)
+    ])
+
+    jobs = storage.get_profile_jobs(profile_id)
+    assert [job['title'] for job in jobs] == ['Data Engineer 1', 'Data Engineer 3', 'Data Engineer 2']
+    assert 'description' not in jobs[0]
+    assert jobs[0]['keywords_matched'] == ['Python']
+    assert len(storage.get_profile_jobs(profile_id, min_score=0.5)) == 2
+    assert len(storage.get_profile_jobs(profile_id, min_salary=62500)) == 1
+
+
+def test_get_job_returns_full_description(storage, profile_id):
+    job = make_job(1, description='Kafka ' * 500)
+    storage.save_jobs(profile_id, [job])
+    job_id = storage.get_profile_jobs(profile_id)[0]['id']
+
+    stored = storage.get_job(job_id)
+    assert stored['description'] == job['description']
+    assert stored['alternate_urls'] == []
+    assert storage.get_job(job_id + 1000) is None
+
+
+def test_search(storage, profile_id):
+    storage.save_jobs(profile_id, [
+        make_job(1, title='Kubernetes Platform Engineer'),
+        make_job(2, description='Frontend work with React and TypeScript.')
+    ])
+
+    results = storage.search_profile_jobs(profile_id, 'kubernetes')
+    assert [job['title'] for job in results] == ['Kubernetes Platform Engineer']
+    assert 'rank' in results[0] and 'snippet' in results[0]
+
+    results = storage.search_profile_jobs(profile_id, 'react', fields={'company': 'company'})
+    assert [job['title'] for job in results] == ['Data Engineer 2']
+    assert not storage.search_profile_jobs(profile_id, fields={'company': 'kubernetes'})
+    assert storage.search_profile_jobs(profile_id, 'kube*')
+
+    with pytest.raises(ValueError):
+        storage.search_profile_jobs(profile_id, '  ')
+
+
+def test_notifications(storage, profile_id):
+    storage.save_jobs(profile_id, [make_job(i, match_score=0.5 + i / 10) for i in range(3)])
+
+    unnotified = storage.get_unnotified_jobs(profile_id, limit=2)
+    assert [job['title'] for job in unnotified] == ['Data Engineer 2', 'Data Engineer 1']
+    assert unnotified[0]['description']
+
+    other_id = storage.create_profile('Other', 'other@example.com')
+    version, other_version = storage.versions.get(profile_id)[0], storage.versions.get(other_id)[0]
+    storage.mark_jobs_notified([job['id'] for job in unnotified])
+    assert storage.versions.get(profile_id)[0] != version
+    assert storage.versions.get(other_id)[0] == other_version
+    assert [job['title'] for job in storage.get_unnotified_jobs(profile_id)] == ['Data Engineer 0']
+
+
+def test_rescoring(storage, profile_id):
+    storage.save_jobs(profile_id, [make_job(1, match_score=0.9), make_job(2, match_score=0.1)])
+
+    scores = storage.get_job_scores(profile_id)
+    assert len(scores) == 2
+    other_id = storage.create_profile('Other', 'other@example.com')
+    other_version = storage.versions.get(other_id)[0]
+    assert storage.update_match_scores(profile_id, [(row[0], 1.0 - i) for i, row in enumerate(
+        sorted(scores, key=lambda row: row[0], reverse=True))]) == 2
+    assert storage.get_profile_jobs(profile_id)[0]['title'] == 'Data Engineer 2'
+
+    # Only the rescored profile's data version changes, and only its jobs are updated
+    assert storage.versions.get(other_id)[0] == other_version
+    assert storage.update_match_scores(other_id, [(scores[0][0], 0.0)]) == 0
+
+
+def test_llm_analysis_cache(storage):
+    analyses = {'a' * 32: {'score': 80.0, 'urgency': 'high', 'reason': 'Good fit'}}
+    storage.save_llm_analyses('resume', 'model', analyses)
+
+    assert storage.get_llm_analyses('resume', 'model', ['a' * 32, 'b' * 32]) == analyses
+    assert storage.get_llm_analyses('resume', 'other-model', ['a' * 32]) == {}
+
+
+def test_run_history_and_stats(storage, profile_id):
+    run_id = storage.create_run_record(profile_id)
+    storage.save_jobs(profile_id, [make_job(i) for i in range(4)])
+    storage.update_run_record(run_id, status='success', jobs_found=4, jobs_scraped=10)
+
+    history = storage.get_run_history(profile_id)
+    assert [(run['status'], run['jobs_found']) for run in history] == [('success', 4)]
+
+    stats = storage.get_dashboard_stats(profile_id)
+    assert stats['jobs_last_7_days'] == 4
+    assert stats['by_source'] == {'indeed': 4}
+    assert stats['success_rate'] == 100.0
+
+
+def test_delete_profile_removes_its_jobs(storage, profile_id):
+    storage.save_jobs(profile_id, [make_job(1)])
+    job_id = storage.get_profile_jobs(profile_id)[0]['id']
+
+    storage.delete_profile(profile_id)
+    assert storage.get_job(job_id) is None
+
+
+def test_delete_profile_removes_its_stats(storage, profile_id):
+    other_id = storage.create_profile('Other', 'other@example.com')
+    storage.save_jobs(profile_id, [make_job(i) for i in range(3)])
+    storage.save_jobs(other_id, [make_job(1)])
+    run_id = storage.create_run_record(profile_id)
+    storage.update_run_record(run_id, status='success', jobs_found=3)
+
+    storage.delete_profile(profile_id)
+    assert storage.get_dashboard_stats(profile_id)['jobs_last_7_days'] == 0
+    stats = storage.get_dashboard_stats()
+    assert (stats['total_profiles'], stats['jobs_last_7_days'], stats['by_source']) == (1, 1, {'indeed': 1})
+    assert stats['success_rate'] == 0
+
+
+def test_maintenance_archives_exactly_the_expired_rows(storage, profile_id, tmp_path):
+    jobs = [make_job(i) for i in range(3)]
+    storage.save_jobs(profile_id, jobs)
+    assert not any(storage.run_maintenance(retention_days=30)['expired'].values())
+
+    # A negative retention expires everything saved so far
+    result = storage.run_maintenance(retention_days=-1, archive_dir=str(tmp_path), batch_size=2)
+    assert result['expired']['profile_matches'] == result['expired']['postings'] == 3
+    assert storage.get_profile_jobs(profile_id) == []
+
+    archived = {}
+    for path in tmp_path.glob('*.jsonl.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            archived[path.name.split('-')[0]] = [json.loads(line) for line in f]
+    assert {table: len(records) for table, records in archived.items()} == {
+        table: count for table, count in result['expired'].items() if count
+    }
+    assert sorted(record['description'] for record in archived['postings']) == \
+        sorted(job['description'] for job in jobs)
+
+
+def test_row_shapes(storage, profile_id):
+    # Backends may return their own row types; callers only rely on this shape
+    storage.save_jobs(profile_id, [make_job(1, alternate_urls=[{'source': 'stepstone', 'url': 'u'}])])
+
+    profile = storage.get_profile(profile_id)
+    jobs = storage.get_profile_jobs(profile_id)
+    results = storage.search_profile_jobs(profile_id, 'python')
+    job = storage.get_job(jobs[0]['id'])
+    for row in [profile, *storage.get_all_profiles(), *jobs, *results, job, *storage.get_unnotified_jobs(profile_id)]:
+        assert isinstance(row, Mapping)
+
+    assert set(jobs[0]) == set(JOB_LIST_COLUMNS)
+    assert set(results[0]) == set(JOB_LIST_COLUMNS) | {'rank', 'snippet'}
+    assert set(JOB_LIST_COLUMNS) | {'description', 'job_hash', 'notified'} <= set(job)
+    assert isinstance(profile['job_preferences'], dict)
+    assert job['alternate_urls'] == [{'source': 'stepstone', 'url': 'u'}]
+    assert isinstance(job['keywords_matched'], list) and isinstance(job['required_skills'], list)
+    assert isinstance(jobs[0]['created_at'], str)
+
+    # Rows serialize to the same JSON as their dict form
+    for rows in ([profile], jobs, results, [job]):
+        assert json.loads(rows_to_json(rows)) == [json.loads(json.dumps(dict(row), default=str)) for row in rows]
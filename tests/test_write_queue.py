@@ -0,0 +1,52 @@
+"""
+WriteQueue batching and failure handling.
+"""
+
+import sqlite3
+import pytest
+from database.write_queue import WriteQueue
+
+
+def _create_table(cursor):
+    cursor.execute('CREATE TABLE IF NOT EXISTS items (value INTEGER)')
+
+
+def _insert(cursor, value):
+    cursor.execute('INSERT INTO items (value) VALUES (?)', (value,))
+    return cursor.lastrowid
+
+
+def _fail(cursor):
+    cursor.execute('INSERT INTO items (value) VALUES (?)', (-1,))
+    raise ValueError('bad write')
+
+
+def test_failing_write_is_rolled_back_alone(tmp_path):
+    path = tmp_path / 'queue.db'
+    writer = WriteQueue(lambda: sqlite3.connect(path))
+    writer.submit(_create_table).result()
+
+    futures = [writer.submit(_insert, 1), writer.submit(_fail), writer.submit(_insert, 2)]
+    assert futures[0].result(timeout=5) and futures[2].result(timeout=5)
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    writer.close()
+
+    conn = sqlite3.connect(path)
+    assert [value for value, in conn.execute('SELECT value FROM items ORDER BY value')] == [1, 2]
+    conn.close()
+
+
+def test_writer_failure_fails_queued_and_later_writes(tmp_path):
+    def connect():
+        raise sqlite3.OperationalError('unable to open database file')
+
+    writer = WriteQueue(connect)
+    queued = writer.submit(_create_table)
+    with pytest.raises(sqlite3.OperationalError):
+        queued.result(timeout=5)
+
+    # The writer thread is gone, so later writes fail instead of hanging
+    with pytest.raises(sqlite3.OperationalError):
+        writer.submit(_insert, 1).result(timeout=5)
+    writer.close()
@@ -3,35 +3,59 @@ Multi-Profile Job Matcher Web Application
 Flask-based web UI for managing multiple resume profiles
 """
 
+import json
+import math
 import os
 import sys
-import yaml
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import wraps
 from pathlib import Path
 from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
 import threading
 import time
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 import pytz
+import numpy as np
 
 # Add src directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from database.multi_profile_db import DatabaseManager
-from matchers.resume_parser import ResumeParser
-from matchers.job_matcher import JobMatcher
+from database.storage import create_storage, SEARCH_FIELDS, ALL_PROFILES
+from database.rows import Row, rows_to_json
+from database.embedding_store import EmbeddingStore
+from matchers.resume_service import ResumeService
+from matchers.job_matcher import JobMatcher, WEIGHT_NAMES
+from matchers.ats_analyzer import ATSAnalyzer, load_stored_requirements
+from matchers.deduplicator import deduplicate_jobs
+from matchers.vector_index import VectorIndex
+from matchers.gemini_client import get_key_pool
 from scrapers.indeed_scraper import IndeedScraper
 from scrapers.stepstone_scraper import StepStoneScraper
 from scrapers.linkedin_scraper import LinkedInScraper
 from notifiers.email_notifier import EmailNotifier
+from utils.config_loader import load_yaml, config_cache
+from utils.event_bus import event_bus
 from utils.logger import setup_logger
+from utils.lru_cache import LRUCache
 
 logger = setup_logger(__name__)
 
+class RowJSONProvider(DefaultJSONProvider):
+    """JSON provider that also serializes database row objects"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, Row):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = RowJSONProvider(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['UPLOAD_FOLDER'] = 'data/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -39,8 +63,28 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 # Ensure upload folder exists
 Path(app.config['UPLOAD_FOLDER']).mkdir(parents=True, exist_ok=True)
 
-# Initialize database
-db_manager = DatabaseManager()
+# Initialize database (PostgreSQL if DATABASE_URL is set, else SQLite)
+db_manager = create_storage(os.getenv('DATABASE_URL'))
+
+# Resume parsing service (shared parse cache + PDF process pool)
+resume_service = ResumeService(max_workers=int(os.getenv('RESUME_PARSE_WORKERS', 0)) or None)
+
+# Shared embedding store (created on first use from config)
+embedding_store = None
+embedding_store_lock = threading.Lock()
+
+# ANN indexes over job and profile embeddings (loaded on first use)
+vector_indexes = {}
+vector_index_lock = threading.Lock()
+
+# Upper bound for ?k= on nearest-neighbour endpoints
+MAX_NEIGHBOURS = 100
+
+# Recent GET responses per URL, reused while their data version is unchanged
+response_cache = LRUCache(max_size=256, max_age=30)
+
+# Seconds between keep-alive comments on idle event streams
+EVENT_STREAM_HEARTBEAT = 15
 
 # Store running jobs
 active_jobs = {}
@@ -56,15 +100,63 @@ def index():
     return render_template('dashboard.html')
 
 
+def rows_response(key, rows, **fields):
+    """JSON success response with a list of rows under key, serialized without re-encoding their JSON columns"""
+    envelope = json.dumps({'success': True, **fields}, default=str, separators=(',', ':'))
+    return app.response_class(f'{envelope[:-1]},"{key}":{rows_to_json(rows)}}}',
+                              mimetype='application/json')
+
+
+def versioned(version_key):
+    """
+    Serve a GET endpoint with an ETag and Last-Modified from its data version.
+    
+    Revalidations that still match get a 304 without touching the database;
+    other requests reuse a cached response for the same URL and version
+    before falling back to the view. Versions change on writes and daily,
+    since lists and stats are relative to today.
+    
+    Args:
+        version_key: Function of the view arguments returning the version key
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            token, changed_at = db_manager.versions.get(version_key(**kwargs))
+            today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+            etag = f"{token}.{today:%Y%m%d}"
+            last_modified = max(changed_at, today)
+            
+            if request.if_none_match.contains(etag) or (
+                    not request.if_none_match and request.if_modified_since
+                    and last_modified <= request.if_modified_since):
+                response = app.response_class(status=304)
+            else:
+                cached = response_cache.get(request.full_path)
+                if cached is not None and cached[0] == etag:
+                    response = app.response_class(cached[1], mimetype='application/json')
+                else:
+                    response = app.make_response(view(**kwargs))
+                    if response.status_code == 200:
+                        response_cache.put(request.full_path, (etag, response.get_data()))
+            
+            if response.status_code in (200, 304):
+                response.set_etag(etag)
+                response.last_modified = last_modified
+                # Browsers store the response but revalidate it on every poll
+                response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+
 @app.route('/api/profiles', methods=['GET'])
+@versioned(lambda: ALL_PROFILES)
 def get_profiles():
     """Get all job search profiles"""
     try:
         profiles = db_manager.get_all_profiles()
-        return jsonify({
-            'success': True,
-            'profiles': profiles
-        })
+        return rows_response('profiles', profiles)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -107,6 +199,9 @@ def update_profile(profile_id):
             gemini_key=data.get('gemini_key'),
             job_preferences=data.get('job_preferences')
         )
+        if data.get('gemini_key') is not None:
+            # The next run adds the new key
+            get_key_pool(load_config()).remove_owner(profile_id)
         return jsonify({
             'success': True,
             'message': 'Profile updated successfully'
@@ -123,6 +218,7 @@ def delete_profile(profile_id):
     """Delete a profile"""
     try:
         db_manager.delete_profile(profile_id)
+        get_key_pool(load_config()).remove_owner(profile_id)
         return jsonify({
             'success': True,
             'message': 'Profile deleted successfully'
@@ -216,15 +312,121 @@ def trigger_job_search(profile_id):
 
 
 @app.route('/api/profiles/<int:profile_id>/jobs', methods=['GET'])
+@versioned(lambda profile_id: profile_id)
 def get_profile_jobs(profile_id):
     """Get jobs found for a profile"""
     try:
         limit = request.args.get('limit', 50, type=int)
-        jobs = db_manager.get_profile_jobs(profile_id, limit=limit)
+        min_score = request.args.get('min_score', type=float)
+        min_salary = request.args.get('min_salary', type=float)
+        max_age_days = request.args.get('max_age_days', type=int)
+        
+        # Keyset pagination: pass back next_cursor to get the following page
+        cursor = request.args.get('cursor')
+        try:
+            after = db_manager.decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        jobs = db_manager.get_profile_jobs(profile_id, limit=limit, min_score=min_score,
+                                           min_salary=min_salary, max_age_days=max_age_days,
+                                           after=after)
+        next_cursor = db_manager.encode_cursor(jobs[-1]) if len(jobs) == limit else None
+        return rows_response('jobs', jobs, count=len(jobs), next_cursor=next_cursor)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/profiles/<int:profile_id>/jobs/search', methods=['GET'])
+@versioned(lambda profile_id: profile_id)
+def search_profile_jobs(profile_id):
+    """Full-text search over a profile's stored jobs (e.g. ?q=kafka&location=munich)"""
+    try:
+        limit = request.args.get('limit', 20, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        try:
+            # Free text searches all fields; field parameters restrict terms to one field
+            jobs = db_manager.search_profile_jobs(
+                profile_id,
+                text=request.args.get('q'),
+                fields={field: request.args[field] for field in SEARCH_FIELDS if request.args.get(field)},
+                limit=limit,
+                offset=offset,
+                min_score=request.args.get('min_score', type=float),
+                min_salary=request.args.get('min_salary', type=float),
+                max_age_days=request.args.get('max_age_days', type=int),
+                source=request.args.get('source')
+            )
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Search terms required (q, title, company or location)'
+            }), 400
+        return rows_response('jobs', jobs, count=len(jobs),
+                             next_offset=offset + limit if len(jobs) == limit else None)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def is_number(value):
+    """Check for a finite JSON number (bools are not weights or thresholds)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+@app.route('/api/profiles/<int:profile_id>/rescore', methods=['POST'])
+def rescore_profile_jobs(profile_id):
+    """
+    Recompute match scores of stored jobs with current (or given) weights.
+    
+    Only jobs that passed the threshold when they were matched are stored,
+    so the threshold here cannot bring back jobs it dropped then and does
+    not delete any: 'matches' counts the stored jobs at or above it, and
+    listings hide the rest with ?min_score=<threshold>.
+    """
+    try:
+        profile = db_manager.get_profile(profile_id)
+        if not profile:
+            return jsonify({
+                'success': False,
+                'error': 'Profile not found'
+            }), 404
+        
+        data = request.get_json(silent=True) or {}
+        overrides = data.get('weights', {}) if isinstance(data, dict) else None
+        if not isinstance(overrides, dict) or not all(
+                name in WEIGHT_NAMES and is_number(value) for name, value in overrides.items()):
+            return jsonify({
+                'success': False,
+                'error': f"weights must map {', '.join(WEIGHT_NAMES)} to numbers"
+            }), 400
+        matching = load_profile_config(profile)['matching']
+        weights = {**matching['weights'], **{name: float(value) for name, value in overrides.items()}}
+        threshold = data.get('threshold', matching['threshold'])
+        if not is_number(threshold):
+            return jsonify({
+                'success': False,
+                'error': 'threshold must be a number'
+            }), 400
+        
+        # Stored component scores make this one vectorized pass, no API calls
+        llm_weight = (matching.get('deep_analysis') or {}).get('weight', 0.3)
+        scores = JobMatcher.rescore(db_manager.get_job_scores(profile_id), weights, llm_weight)
+        db_manager.update_match_scores(profile_id, scores)
+        
         return jsonify({
             'success': True,
-            'jobs': jobs,
-            'count': len(jobs)
+            'rescored': len(scores),
+            'matches': sum(1 for _, score in scores if score >= threshold),
+            'threshold': threshold
         })
     except Exception as e:
         return jsonify({
@@ -234,6 +436,7 @@ def get_profile_jobs(profile_id):
 
 
 @app.route('/api/profiles/<int:profile_id>/history', methods=['GET'])
+@versioned(lambda profile_id: profile_id)
 def get_profile_history(profile_id):
     """Get run history for a profile"""
     try:
@@ -250,11 +453,114 @@ def get_profile_history(profile_id):
         }), 500
 
 
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a stored job with its full description (lists leave it out)"""
+    try:
+        job = db_manager.get_job(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/jobs/<int:job_id>/similar', methods=['GET'])
+def get_similar_jobs(job_id):
+    """Get stored jobs most similar to a job"""
+    try:
+        k = min(max(request.args.get('k', 10, type=int), 1), MAX_NEIGHBOURS)
+        job = db_manager.get_job(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
+        
+        config = load_config()
+        key = f"job:{job['job_hash']}"
+        vector = get_embedding_store(config).get(key)
+        if vector is None:
+            return jsonify({
+                'success': False,
+                'error': 'No embedding stored for this job'
+            }), 404
+        
+        results = get_vector_index('jobs', config).search(vector, k=k, exclude={key})
+        stored = db_manager.get_jobs_by_hashes([key[len('job:'):] for key, _ in results])
+        
+        similar = []
+        for key, score in results:
+            row = stored.get(key[len('job:'):])
+            if row:
+                similar.append({**row, 'similarity': round(score, 3)})
+        
+        return jsonify({
+            'success': True,
+            'jobs': similar,
+            'count': len(similar)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/jobs/<int:job_id>/profiles', methods=['GET'])
+def get_matching_profiles(job_id):
+    """Get profiles whose resumes best fit a job"""
+    try:
+        k = min(max(request.args.get('k', 5, type=int), 1), MAX_NEIGHBOURS)
+        job = db_manager.get_job(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
+        
+        config = load_config()
+        vector = get_embedding_store(config).get(f"job:{job['job_hash']}")
+        if vector is None:
+            return jsonify({
+                'success': False,
+                'error': 'No embedding stored for this job'
+            }), 404
+        
+        profiles = {f"profile:{p['id']}": p for p in db_manager.get_all_profiles()}
+        matches = [
+            {'profile_id': profiles[key]['id'], 'name': profiles[key]['name'], 'similarity': round(score, 3)}
+            for key, score in get_vector_index('profiles', config).search(vector, k=k)
+            if key in profiles
+        ]
+        
+        return jsonify({
+            'success': True,
+            'profiles': matches
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/dashboard/stats', methods=['GET'])
+@versioned(lambda: request.args.get('profile_id', type=int))
 def get_dashboard_stats():
-    """Get overall dashboard statistics"""
+    """Get dashboard statistics (overall, or for one profile with ?profile_id=)"""
     try:
-        stats = db_manager.get_dashboard_stats()
+        stats = db_manager.get_dashboard_stats(request.args.get('profile_id', type=int))
         return jsonify({
             'success': True,
             'stats': stats
@@ -266,6 +572,68 @@ def get_dashboard_stats():
         }), 500
 
 
+@app.route('/api/gemini/quota', methods=['GET'])
+def get_gemini_quota():
+    """Get per-key Gemini quota status (shared keys, plus a profile's own with ?profile_id=)"""
+    try:
+        return jsonify({
+            'success': True,
+            'keys': get_key_pool(load_config()).stats(request.args.get('profile_id', type=int))
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get hit/miss counters of the in-process caches"""
+    return jsonify({
+        'success': True,
+        'caches': {
+            'profiles': db_manager.profile_cache.stats(),
+            'config': config_cache.stats(),
+            'responses': response_cache.stats()
+        }
+    })
+
+
+def event_stream(profile_id=None):
+    """Server-sent event response relaying event bus events (all profiles if profile_id is None)"""
+    # Browsers reconnect with the last id they saw; missed buffered events are replayed
+    subscription = event_bus.subscribe(profile_id, request.headers.get('Last-Event-ID', type=int))
+    
+    def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                event = subscription.get(timeout=EVENT_STREAM_HEARTBEAT)
+                if event is None:
+                    # Also detects closed connections, which end the subscription
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            subscription.close()
+    
+    return app.response_class(stream(), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Live job search events of all profiles (server-sent events)"""
+    return event_stream()
+
+
+@app.route('/api/profiles/<int:profile_id>/events', methods=['GET'])
+def stream_profile_events(profile_id):
+    """Live job search events of one profile (server-sent events)"""
+    return event_stream(profile_id)
+
+
 @app.route('/api/config', methods=['GET'])
 def get_config():
     """Get global configuration"""
@@ -305,11 +673,18 @@ def allowed_file(filename):
 
 def run_job_search_for_profile(profile_id, profile):
     """Run job search for a specific profile (background task)"""
+    run_id = None
+    
+    def publish(event_type, **data):
+        """Publish a progress event of this run"""
+        event_bus.publish(event_type, profile_id, run_id=run_id, profile_name=profile['name'], **data)
+    
     try:
         logger.info(f"🚀 Starting job search for profile: {profile['name']}")
         
         # Record run start
         run_id = db_manager.create_run_record(profile_id, 'running')
+        publish('run', stage='started')
         
         # Load configuration
         config = load_config()
@@ -320,21 +695,21 @@ def run_job_search_for_profile(profile_id, profile):
             if prefs:
                 config['search'].update(prefs)
         
-        # Initialize resume parser
-        resume_parser = ResumeParser(config)
-        resume_parser.resume_path = Path(profile['resume_path'])
-        resume_text = resume_parser.parse_resume()
+        # Get parsed resume (cached by content hash)
+        resume_parser = resume_service.get_parser(config, profile['resume_path'])
+        resume_text = resume_parser.get_resume_text()
         
         if not resume_text:
             raise ValueError("Failed to parse resume")
         
-        # Set Gemini API key (profile-specific or global)
-        gemini_key = profile.get('gemini_key') or os.getenv('GEMINI_API_KEY')
-        if gemini_key:
-            os.environ['GEMINI_API_KEY'] = gemini_key
+        # The profile's own Gemini key is only drawn on by its own runs
+        key_pool = get_key_pool(config)
+        key_pool.add_key(profile.get('gemini_key'), owner=profile_id)
+        key_pool = key_pool.for_owner(profile_id)
         
         # Initialize job matcher
-        job_matcher = JobMatcher(config, resume_parser)
+        job_matcher = JobMatcher(config, resume_parser, get_embedding_store(config), key_pool,
+                                 analysis_cache=db_manager)
         
         # Scrape jobs from all sources
         scrapers = [
@@ -351,28 +726,59 @@ def run_job_search_for_profile(profile_id, profile):
         
         all_jobs = []
         jobs_scraped = 0
+        publish('run', stage='scraping', scrapers=[scraper.name for scraper in scrapers])
+        
+        def scrape_progress(scraper_name, job_title, location, jobs_found):
+            publish('scrape_progress', scraper=scraper_name, job_title=job_title, location=location,
+                    jobs_found=jobs_found, jobs_scraped=jobs_scraped + jobs_found)
         
         for scraper in scrapers:
+            scraper.on_progress = scrape_progress
             try:
                 jobs = scraper.scrape_jobs()
                 all_jobs.extend(jobs)
                 jobs_scraped += len(jobs)
                 logger.info(f"✓ Scraped {len(jobs)} jobs from {scraper.__class__.__name__}")
+                if scraper.filtered:
+                    logger.info(f"  ⏭️ Screened out {sum(scraper.filtered.values())} postings "
+                               f"({', '.join(f'{n} by {r}' for r, n in scraper.filtered.items())}), "
+                               f"saved {scraper.fetches_saved} detail page fetches")
             except Exception as e:
                 logger.error(f"✗ {scraper.__class__.__name__} failed: {e}")
         
+        # Collapse the same posting seen on several portals
+        all_jobs = deduplicate_jobs(all_jobs, config)
+        
+        # Postings seen in earlier runs keep the requirements extracted back then
+        load_stored_requirements(job_matcher.taxonomy, db_manager, all_jobs)
+        
         # Match jobs
+        publish('run', stage='matching', jobs_scraped=jobs_scraped, jobs_unique=len(all_jobs))
         matched_jobs = job_matcher.match_jobs(all_jobs)
         logger.info(f"🎯 Matched {len(matched_jobs)} jobs")
         
+        # Make this run's embeddings searchable
+        update_vector_indexes(profile_id, all_jobs, job_matcher, config)
+        
+        # ATS check (job requirements are cached per job hash across profiles)
+        ats_analyzer = ATSAnalyzer(config, resume_parser)
+        for job in matched_jobs:
+            ats_analyzer.analyze_job(job)
+        
         # Save to database
         saved = db_manager.save_jobs(profile_id, matched_jobs)
         logger.info(f"💾 Saved {saved} new jobs")
+        best = sorted(matched_jobs, key=lambda job: job.get('match_score') or 0, reverse=True)[:5]
+        publish('matches', saved=saved, matched=len(matched_jobs), best=[
+            {key: job.get(key) for key in ('title', 'company', 'location', 'url', 'match_score')}
+            for job in best
+        ])
         
         # Send email notification if matches found and email configured
         if matched_jobs and os.getenv('EMAIL_SENDER') and os.getenv('EMAIL_PASSWORD'):
             unnotified = db_manager.get_unnotified_jobs(profile_id, limit=10)
             if unnotified:
+                publish('run', stage='notifying', jobs=len(unnotified))
                 try:
                     notifier = EmailNotifier(config)
                     notifier.config['notifications']['email'] = profile['email']
@@ -394,6 +800,7 @@ def run_job_search_for_profile(profile_id, profile):
             jobs_found=len(matched_jobs),
             jobs_scraped=jobs_scraped
         )
+        publish('run', stage='completed', jobs_found=len(matched_jobs), jobs_scraped=jobs_scraped, saved=saved)
         
         logger.info(f"✅ Job search completed for {profile['name']}")
         
@@ -404,6 +811,7 @@ def run_job_search_for_profile(profile_id, profile):
             status='failed',
             error_message=str(e)
         )
+        publish('run', stage='failed', error=str(e))
     finally:
         # Remove from active jobs
         if profile_id in active_jobs:
@@ -414,8 +822,7 @@ def load_config():
     """Load configuration from config.yaml"""
     config_path = Path('config/config.yaml')
     if config_path.exists():
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        return load_yaml(config_path)
     
     # Return default config if file doesn't exist
     return {
@@ -453,6 +860,75 @@ def load_config():
     }
 
 
+def get_embedding_store(config):
+    """Get the shared embedding store, opening it on first use"""
+    global embedding_store
+    with embedding_store_lock:
+        if embedding_store is None:
+            store_config = config['matching'].get('embedding_store') or {}
+            embedding_store = EmbeddingStore(
+                path=store_config.get('path', 'data/embeddings'),
+                dtype=store_config.get('dtype', 'float16'),
+                dim=store_config.get('dim')
+            )
+        return embedding_store
+
+
+def get_vector_index(name, config):
+    """Get an ANN index ('jobs' or 'profiles'), loading or building it on first use"""
+    with vector_index_lock:
+        if name not in vector_indexes:
+            index_config = config['matching'].get('vector_index') or {}
+            path = Path(index_config.get('path', 'data/index')) / f'{name}.npz'
+            store = get_embedding_store(config)
+            nprobe = index_config.get('nprobe', 8)
+            
+            if path.exists():
+                index = VectorIndex.load(path, store, nprobe=nprobe)
+            else:
+                # First start: index everything already in the embedding store
+                index = VectorIndex(nprobe=nprobe, path=path)
+                prefix = 'job:' if name == 'jobs' else 'profile:'
+                keys = [key for key in store.keys() if key.startswith(prefix)]
+                for start in range(0, len(keys), 50000):
+                    chunk = keys[start:start + 50000]
+                    index.add_many(chunk, store.get_many(chunk))
+                if len(index):
+                    index.save()
+            
+            vector_indexes[name] = index
+        return vector_indexes[name]
+
+
+def update_vector_indexes(profile_id, jobs, job_matcher, config):
+    """Add a run's job and resume embeddings to the ANN indexes"""
+    try:
+        store = get_embedding_store(config)
+        
+        # The store is append-only: only write the profile vector when the resume changed
+        profile_key = f'profile:{profile_id}'
+        stored = store.get(profile_key)
+        if job_matcher.resume_embedding is not None and (
+                stored is None or not np.array_equal(stored, job_matcher.resume_embedding)):
+            store.add(profile_key, job_matcher.resume_embedding)
+            profile_index = get_vector_index('profiles', config)
+            profile_index.add(profile_key, store.get(profile_key))
+            profile_index.save()
+        
+        # Vectors come from the store so they match its (possibly reduced) dimension
+        job_index = get_vector_index('jobs', config)
+        keys = list(dict.fromkeys(
+            f"job:{job['job_hash']}" for job in jobs
+            if job.get('job_hash') and f"job:{job['job_hash']}" in store
+            and f"job:{job['job_hash']}" not in job_index
+        ))
+        if keys:
+            job_index.add_many(keys, store.get_many(keys))
+            job_index.save()
+    except Exception as e:
+        logger.warning(f"⚠️ Vector index update failed (not critical): {e}")
+
+
 def run_scheduled_job_search():
     """Run job search for all enabled profiles (scheduled task)"""
     try:
@@ -467,6 +943,9 @@ def run_scheduled_job_search():
         
         logger.info(f"Found {len(enabled_profiles)} enabled profile(s)")
         
+        # Parse all resumes in bulk before the per-profile threads start
+        resume_service.parse_many(load_config(), [p['resume_path'] for p in enabled_profiles])
+        
         for profile in enabled_profiles:
             if profile['id'] not in active_jobs:
                 logger.info(f"Starting job search for: {profile['name']}")
@@ -485,6 +964,19 @@ def run_scheduled_job_search():
         logger.error(f"Error in scheduled job search: {e}", exc_info=True)
 
 
+def run_database_maintenance():
+    """Enforce retention, archive expired rows and reclaim space (scheduled task)"""
+    try:
+        database = load_config().get('database', {})
+        db_manager.run_maintenance(
+            retention_days=database.get('retention_days', 30),
+            retention=database.get('retention'),
+            archive_dir=database.get('archive_dir')
+        )
+    except Exception as e:
+        logger.error(f"Error in database maintenance: {e}", exc_info=True)
+
+
 def load_profile_config(profile):
     """Load configuration for a profile"""
     base_config = load_config()
@@ -512,6 +1004,18 @@ if __name__ == '__main__':
     )
     
     logger.info("✅ Scheduler configured - will run every 30 minutes")
+    
+    # Background database maintenance (retention, orphan purge, incremental vacuum)
+    database_config = load_config().get('database', {})
+    if database_config.get('auto_cleanup', True):
+        scheduler.add_job(
+            func=run_database_maintenance,
+            trigger=IntervalTrigger(hours=database_config.get('maintenance_interval_hours', 24)),
+            id='database_maintenance',
+            name='Database retention and vacuum',
+            replace_existing=True,
+            timezone=pytz.UTC
+        )
     logger.info(f"🌐 Starting web server on port {os.getenv('PORT', 5000)}")
     
     # Run initial job search on startup (optional - uncomment if desired)